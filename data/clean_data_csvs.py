@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy as np
 import csv
 import glob
 import os
@@ -60,86 +61,142 @@ datasets = {
     }
 }
 
-# Folder containing the files
-input_folder = r"C:\Users\jacqueline.pielli\Downloads\crash data"
+# Folder containing the files (override with FARS_RAW_DIR on the batch host)
+input_folder = os.environ.get("FARS_RAW_DIR", r"C:\Users\jacqueline.pielli\Downloads\crash data")
+
+# -----------------------------
+# Bulk repair reader for ragged rows
+# -----------------------------
+# Some yearly extracts have rows with too few or too many fields. Rows are
+# padded/truncated to the header's field count by pandas' C parser
+# (usecols within the header width), read in large blocks, and a vectorised
+# byte scan counts the ragged rows for the data-quality report.
+BLOCK_ROWS = 500_000
+SCAN_BYTES = 1 << 24
+
+
+def read_header(file_path):
+    with open(file_path, 'r', encoding='utf-8', errors='ignore', newline='') as f:
+        header = next(csv.reader(f))
+    return [h.strip().lstrip('\ufeff') for h in header]
+
+
+def _line_fields(buf, sep):
+    """(fields per line, end offset of the last complete line) for a block starting outside quotes."""
+    newlines = np.flatnonzero(buf == ord('\n'))
+    delims = np.flatnonzero(buf == ord(sep))
+    quotes = np.flatnonzero(buf == ord('"'))
+    if len(quotes):
+        # Delimiters/newlines after an odd number of quotes are inside "..." and do not count
+        newlines = newlines[np.searchsorted(quotes, newlines) % 2 == 0]
+        delims = delims[np.searchsorted(quotes, delims) % 2 == 0]
+    if not len(newlines):
+        return np.empty(0, dtype=np.int64), 0
+    fields = np.bincount(np.searchsorted(newlines, delims[delims < newlines[-1]]), minlength=len(newlines)) + 1
+    starts = np.r_[0, newlines[:-1] + 1]
+    length = newlines - starts - (buf[newlines - 1] == ord('\r')) * (newlines > starts)
+    return fields[length > 0], int(newlines[-1]) + 1   # blank lines are skipped by the parser too
+
+
+def field_counts(file_path, sep=','):
+    """Number of fields on every data row of a CSV, scanned in blocks."""
+    counts, carry = [], b''
+    with open(file_path, 'rb') as f:
+        f.readline()  # header
+        while True:
+            block = f.read(SCAN_BYTES)
+            data = carry + block
+            if not block:
+                data += b'\n' if data.strip() else b''
+            fields, end = _line_fields(np.frombuffer(data, dtype=np.uint8), sep)
+            counts.append(fields)
+            carry = data[end:]
+            if not block:
+                break
+    return np.concatenate(counts)
+
+
+def _code_columns(df):
+    """Columns where every value in the file is a plain integer code (so Int64 writes the same text back)."""
+    codes = df.apply(lambda col: col.notna().any() and col.dropna().str.fullmatch(r'0|-?[1-9]\d{0,17}').all())
+    return [c for c, is_code in codes.items() if is_code]
+
+
+def read_repaired(file_path, keep=None):
+    """(frame with the header's columns, or just `keep`; repair counts) for one raw FARS CSV."""
+    header = read_header(file_path)
+    width = len(header)
+    fields = field_counts(file_path)
+    usecols = [i for i, h in enumerate(header) if keep is None or h in keep] or list(range(width))
+    chunks = pd.read_csv(file_path, header=0, names=header, usecols=usecols, dtype=str,
+                         keep_default_na=False, na_values=[''], encoding='utf-8',
+                         encoding_errors='ignore', engine='c', chunksize=BLOCK_ROWS)
+    df = pd.concat(chunks, ignore_index=True)
+    # Integer code columns become nullable Int64 only when every value round-trips;
+    # anything else (e.g. a zero-padded DR_ZIP anywhere in the file) stays text
+    for c in _code_columns(df):
+        df[c] = pd.to_numeric(df[c]).astype('Int64')
+    report = {'file': os.path.basename(file_path), 'rows': len(df), 'fields': width,
+              'padded': int((fields < width).sum()), 'truncated': int((fields > width).sum())}
+    return df, report
+
 
 # -----------------------------
 # Function to process one dataset
 # -----------------------------
-def process_dataset(name, config):
+def process_dataset(name, config, input_folder=input_folder, output_folder=None):
     print(f"\n🔍 Processing dataset: {name}")
+    output_folder = output_folder or input_folder
     file_pattern = os.path.join(input_folder, config["pattern"])
     files = glob.glob(file_pattern)
 
     if not files:
         print(f"⚠ No files found for pattern: {file_pattern}")
-        return
+        return None
 
-    combined_df = pd.DataFrame()
+    frames, reports = [], []
+    # Determine columns to keep (base + YEAR); person files may use PER_TYP
+    cols_to_keep = config["base_columns"] + ["YEAR"]
+    read_cols = set(cols_to_keep) | ({"PER_TYP"} if name == "person" else set())
 
     for file_path in files:
         print(f"Processing: {file_path}")
         match = re.search(r'_(\d{4})', os.path.basename(file_path))  # Extract year from filename
         year = match.group(1) if match else None
 
-        # Read header
-        with open(file_path, 'r', encoding='utf-8', errors='ignore', newline='') as f:
-            reader = csv.reader(f)
-            header = next(reader)
-            header = [h.strip().lstrip('\ufeff') for h in header]
-            expected_cols = len(header)
-
-        # Fix malformed rows
-        fixed_rows = []
-        with open(file_path, 'r', encoding='utf-8', errors='ignore', newline='') as f:
-            reader = csv.reader(f)
-            next(reader)  # skip header
-            for row in reader:
-                if len(row) < expected_cols:
-                    row += [''] * (expected_cols - len(row))
-                elif len(row) > expected_cols:
-                    row = row[:expected_cols]
-                fixed_rows.append(row)
-
-        # Create DataFrame
-        df = pd.DataFrame(fixed_rows, columns=header)
-        df.replace('', pd.NA, inplace=True)
-
-        # Apply dataset-specific filter
-        # df = config"filter"
+        # Read with ragged rows padded/truncated to the header width
+        df, report = read_repaired(file_path, keep=read_cols)
+        print(f"  {report['rows']:,} rows, {report['padded']:,} padded, {report['truncated']:,} truncated")
+        reports.append(report)
 
         # Add YEAR column
         df["YEAR"] = year
 
-        
         # Normalize PER_TYPE name for person files
         if name == "person":
             if "PER_TYPE" not in df.columns and "PER_TYP" in df.columns:
                 df.rename(columns={"PER_TYP": "PER_TYPE"}, inplace=True)
 
-        # Determine columns to keep (base + YEAR)
-        cols_to_keep = config["base_columns"] + ["YEAR"]
         existing_cols = [c for c in cols_to_keep if c in df.columns]
-        df = df[existing_cols]
-
-        # Append to combined DataFrame
-        combined_df = pd.concat([combined_df, df], ignore_index=True)
-
-        
-        # Apply export filter if provided
-        export_filter = config.get("filter", lambda d: d)
-        final_df = export_filter(combined_df)
+        frames.append(df[existing_cols])
 
+    # One concat for all files, then apply export filter if provided
+    combined_df = pd.concat(frames, ignore_index=True)
+    export_filter = config.get("filter", lambda d: d)
+    final_df = export_filter(combined_df)
 
-    # Export combined file
-    output_path = os.path.join(input_folder, config["output"])
+    # Export combined file, plus the per-file repair counts as data-quality metrics
+    output_path = os.path.join(output_folder, config["output"])
     final_df.to_csv(output_path, sep='|', index=False, encoding='utf-8', na_rep='', quoting=csv.QUOTE_MINIMAL)
+    pd.DataFrame(reports).to_csv(re.sub(r'\.csv$', '_repairs.csv', output_path), index=False)
 
     print(f"✅ Exported {name} dataset to: {output_path}")
     print(f"Total rows: {len(final_df)}")
+    return output_path
 
 # -----------------------------
 # Run for all datasets
 # -----------------------------
-for dataset_name, config in datasets.items():
-    process_dataset(dataset_name, config)
+if __name__ == "__main__":
+    for dataset_name, config in datasets.items():
+        process_dataset(dataset_name, config)
@@ -2,21 +2,32 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from sklearn.cluster import KMeans
-from sklearn.ensemble import RandomForestClassifier
 import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+from app.warmup import Warmup, load_summary, preload_imports, save_summary
 
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(page_title="Austin Crash Intelligence", layout="wide")
 
 # --- DATA LOADING ---
-@st.cache_data # This keeps the app fast by "remembering" the data
+# Use absolute path or relative path
+file_name = 'atx_crash_2025.csv'
+
+# Counts per (hour, day, speed limit): enough to draw the BI page before the full data is in
+SUMMARY_DIMS = ['HOUR', 'DAY_NAME', 'crash_speed_limit']
+SUMMARY_MEASURES = ['death_cnt', 'sus_serious_injry_cnt', 'tot_injry_cnt']
+
+def summarize(df):
+    return df.groupby(SUMMARY_DIMS)[SUMMARY_MEASURES].agg('sum').assign(
+        n=df.groupby(SUMMARY_DIMS).size()).reset_index()
+
 def load_data():
-    # Use absolute path or relative path
-    file_name = 'atx_crash_2025.csv'
     if not os.path.exists(file_name):
-        return None
+        return None, None
     
     df = pd.read_csv(file_name, low_memory=False)
     
@@ -25,11 +36,29 @@ def load_data():
     df['HOUR'] = df['Crash timestamp'].dt.hour
     df['DAY_NAME'] = df['Crash timestamp'].dt.day_name()
     df['high_severity'] = ((df['death_cnt'] > 0) | (df['sus_serious_injry_cnt'] > 0)).astype(int)
-    return df
-
-df_raw = load_data()
-
-if df_raw is None:
+    summary = summarize(df)
+    save_summary(file_name, summary)
+    return df, summary
+
+# Starts with the server (first session) and is shared by all later sessions:
+# the data loads first, then sklearn is imported so the AI page opens quickly.
+@st.cache_resource
+def warmup():
+    return (Warmup()
+            .submit("data", load_data)
+            .submit("ml", preload_imports, "sklearn.cluster", "sklearn.ensemble"))
+
+if warmup().ready("data") or not os.path.exists(file_name):
+    df_raw, summary = warmup().get("data")
+else:
+    # Cold start: draw from the cached summary while the full data loads
+    df_raw = None
+    summary = load_summary(file_name)
+    if summary is None:
+        with st.spinner("Loading crash data..."):
+            df_raw, summary = warmup().get("data")
+
+if summary is None:
     st.error("Could not find 'atx_crash_2025.csv'. Please ensure it's in the same folder.")
     st.stop()
 
@@ -45,37 +74,41 @@ st.sidebar.subheader("Filter Data")
 hour_range = st.sidebar.slider("Select Hour Range:", 0, 23, (0, 23))
 
 # Filter 2: Day of Week
-days = df_raw['DAY_NAME'].dropna().unique().tolist()
+days = summary['DAY_NAME'].dropna().unique().tolist()
 selected_days = st.sidebar.multiselect("Select Days:", days, default=days)
 
 # Filter 3: Speed Limit
-min_speed = int(df_raw['crash_speed_limit'].min())
-max_speed = int(df_raw['crash_speed_limit'].max())
+min_speed = int(summary['crash_speed_limit'].min())
+max_speed = int(summary['crash_speed_limit'].max())
 speed_limit = st.sidebar.slider("Minimum Speed Limit:", min_speed, max_speed, min_speed)
 
 # Apply Filters
-df = df_raw[
-    (df_raw['HOUR'].between(hour_range[0], hour_range[1])) &
-    (df_raw['DAY_NAME'].isin(selected_days)) &
-    (df_raw['crash_speed_limit'] >= speed_limit)
-]
+def apply_filters(frame):
+    return frame[
+        (frame['HOUR'].between(hour_range[0], hour_range[1])) &
+        (frame['DAY_NAME'].isin(selected_days)) &
+        (frame['crash_speed_limit'] >= speed_limit)
+    ]
+
+summary_f = apply_filters(summary)
+df = apply_filters(df_raw) if df_raw is not None else None
 
 # --- MAIN PAGE ---
 st.title(f"🚀 {page}")
-st.write(f"Showing **{len(df):,}** crashes based on current filters.")
+st.write(f"Showing **{int(summary_f['n'].sum()):,}** crashes based on current filters.")
 
 if page == "Business Intelligence":
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("Hourly Distribution")
-        fig_hour = px.histogram(df, x="HOUR", nbins=24, color_discrete_sequence=['#636EFA'])
+        fig_hour = px.histogram(summary_f, x="HOUR", y="n", histfunc="sum", nbins=24, color_discrete_sequence=['#636EFA'])
         fig_hour.update_layout(xaxis_title="Hour (0-23)", yaxis_title="Incident Count")
         st.plotly_chart(fig_hour, use_container_width=True)
 
     with col2:
         st.subheader("Severity Breakdown")
-        severity_sums = df[['death_cnt', 'sus_serious_injry_cnt', 'tot_injry_cnt']].sum()
+        severity_sums = summary_f[SUMMARY_MEASURES].sum()
         fig_pie = px.pie(
             values=severity_sums, 
             names=['Deaths', 'Serious Injuries', 'Other Injuries'],
@@ -84,9 +117,22 @@ if page == "Business Intelligence":
         st.plotly_chart(fig_pie, use_container_width=True)
 
     st.subheader("Interactive Map (General Density)")
-    st.map(df[['latitude', 'longitude']].dropna())
+    if df is not None:
+        st.map(df[['latitude', 'longitude']].dropna())
+    else:
+        with st.spinner("Loading crash locations..."):
+            warmup().get("data")
+        st.rerun()
 
 elif page == "AI Deep Dive":
+    if df is None:
+        with st.spinner("Loading crash data..."):
+            warmup().get("data")
+        st.rerun()
+    # Only imported here; the warm-up thread has usually done it already
+    from sklearn.cluster import KMeans
+    from sklearn.ensemble import RandomForestClassifier
+
     st.subheader("🤖 Machine Learning Insights")
     
     col_ai1, col_ai2 = st.columns([2, 1])
@@ -3,8 +3,11 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.cluster import KMeans
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+from ml.backends import make_model, feature_importance
 
 
 # 1. LOAD DATA (Handling potential FileNotFoundError)
@@ -66,10 +69,11 @@ model_df = df_atx[features + ['high_severity']].dropna()
 X = model_df[features]
 y = model_df['high_severity']
 
-rf = RandomForestClassifier(n_estimators=100, random_state=42)
+# Engine is RandomForest unless PNBI_MODEL_ENGINE=hgb
+rf = make_model("classifier", random_state=42)
 rf.fit(X, y)
 
-importance = pd.DataFrame({'Factor': features, 'Weight': rf.feature_importances_}).sort_values(by='Weight', ascending=False)
+importance = pd.DataFrame({'Factor': features, 'Weight': feature_importance(rf, X, y).values}).sort_values(by='Weight', ascending=False)
 
 plt.figure(figsize=(10, 5))
 sns.barplot(data=importance, x='Weight', y='Factor', palette='magma')
@@ -2,11 +2,14 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.cluster import KMeans
-from sklearn.ensemble import RandomForestClassifier
-import numpy as np
+import sys
+from pathlib import Path
 
 import os
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+from ml.backends import make_model, feature_importance
+
 print(os.getcwd())
 # Load the Austin dataset
 df = pd.read_csv('atx_crash_2025.csv', low_memory=False)
@@ -72,12 +75,13 @@ model_df = df[features + ['high_severity']].dropna()
 X = model_df[features]
 y = model_df['high_severity']
 
-rf = RandomForestClassifier(n_estimators=100, random_state=42)
+# Engine is RandomForest unless PNBI_MODEL_ENGINE=hgb
+rf = make_model("classifier", random_state=42)
 rf.fit(X, y)
 
 importance_df = pd.DataFrame({
     'Feature': ['Speed Limit', 'Hour', 'Day of Week', 'On-System Road', 'Private Drive'],
-    'Importance': rf.feature_importances_
+    'Importance': feature_importance(rf, X, y).values
 }).sort_values(by='Importance', ascending=False)
 
 plt.figure(figsize=(10, 6))
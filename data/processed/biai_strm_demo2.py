@@ -3,10 +3,20 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+from app.instrument import admin_panel, plotly_chart, recorder, start_profiling
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(page_title="Austin Vision Zero Command Center", layout="wide")
 
+# Stage timings for the hidden admin panel (?admin=1)
+rec = recorder()
+rec.begin_rerun(Path(__file__).stem)
+start_profiling()
+
 # --- DATA LOADING ---
 @st.cache_data
 def load_data():
@@ -33,7 +43,8 @@ def load_data():
     
     return df
 
-df_raw = load_data()
+with rec.span("load_data"):
+    df_raw = load_data()
 
 if df_raw is None:
     st.error("🛑 File not found. Please check your file path.")
@@ -54,15 +65,16 @@ selected_days = st.sidebar.multiselect("Days of Week:", ["Monday", "Tuesday", "W
 selected_sev = st.sidebar.multiselect("Severity:", df_raw['Severity_Label'].unique(), default=df_raw['Severity_Label'].unique())
 
 # --- FILTER LOGIC ---
-df = df_raw.copy()
-if selected_street != "All Streets":
-    df = df[df['rpt_street_name'] == selected_street]
+with rec.span("filter"):
+    df = df_raw.copy()
+    if selected_street != "All Streets":
+        df = df[df['rpt_street_name'] == selected_street]
 
-df = df[
-    (df['Severity_Label'].isin(selected_sev)) &
-    (df['DAY_NAME'].isin(selected_days)) &
-    (df['HOUR'].between(hour_range[0], hour_range[1]))
-]
+    df = df[
+        (df['Severity_Label'].isin(selected_sev)) &
+        (df['DAY_NAME'].isin(selected_days)) &
+        (df['HOUR'].between(hour_range[0], hour_range[1]))
+    ]
 
 # --- MAIN DASHBOARD HEADER ---
 st.title("🏙️ Austin Vision Zero Command Center")
@@ -97,7 +109,7 @@ with tab1:
                      labels={'Estimated Total Comprehensive Cost': 'Cumulative Cost ($)'},
                      color_discrete_sequence=['#ff4b4b'])
     fig_ts.update_layout(hovermode="x unified")
-    st.plotly_chart(fig_ts, use_container_width=True)
+    plotly_chart(fig_ts, "render:ts", use_container_width=True)
     
     st.info("💡 **Discussion Point:** This chart shows the 'Burn Rate' of city resources. Each jump represents a high-cost major incident.")
 
@@ -110,7 +122,7 @@ with tab2:
         fig_speed = px.bar(speed_data, x='crash_speed_limit', y='count', 
                            title="Incident Volume by Speed Limit",
                            color='count', color_continuous_scale='YlOrRd')
-        st.plotly_chart(fig_speed, use_container_width=True)
+        plotly_chart(fig_speed, "render:speed", use_container_width=True)
     
     with c2:
         st.subheader("Top High-Strain Corridors")
@@ -120,7 +132,7 @@ with tab2:
                            orientation='h', title="Top 10 Streets by Economic Drain",
                            color='Estimated Total Comprehensive Cost', color_continuous_scale='Purples')
         fig_drain.update_layout(yaxis={'categoryorder':'total ascending'})
-        st.plotly_chart(fig_drain, use_container_width=True)
+        plotly_chart(fig_drain, "render:drain", use_container_width=True)
 
 with tab3:
     st.subheader("Vulnerable User Vulnerability Split")
@@ -130,14 +142,14 @@ with tab3:
     fig_vru_pie = px.pie(values=vru_sums.values, names=['Pedestrian', 'Bicycle', 'Motorcycle', 'Motor Vehicle'],
                          title="Fatality Distribution by User Type",
                          hole=0.5, color_discrete_sequence=px.colors.sequential.RdBu)
-    st.plotly_chart(fig_vru_pie, use_container_width=True)
+    plotly_chart(fig_vru_pie, "render:vru_pie", use_container_width=True)
 
     # Comparison Scatter
     st.subheader("Crash Severity vs. Economic Cost")
     fig_scatter = px.scatter(df, x="crash_speed_limit", y="Estimated Total Comprehensive Cost",
                              color="Severity_Label", size="tot_injry_cnt", hover_data=['rpt_street_name'],
                              title="High Speed vs. High Cost Correlation")
-    st.plotly_chart(fig_scatter, use_container_width=True)
+    plotly_chart(fig_scatter, "render:scatter", use_container_width=True)
 
 # --- MAP VIEW ---
 st.subheader("🗺️ Geographic Incident Distribution")
@@ -145,4 +157,7 @@ st.map(df[['latitude', 'longitude']].dropna())
 
 # --- RAW DATA VIEW ---
 with st.expander("🔍 Detailed Records"):
-    st.write(df[['Crash timestamp', 'rpt_street_name', 'crash_speed_limit', 'Severity_Label', 'Estimated Total Comprehensive Cost']].sort_values(by='Estimated Total Comprehensive Cost', ascending=False))
\ No newline at end of file
+    st.write(df[['Crash timestamp', 'rpt_street_name', 'crash_speed_limit', 'Severity_Label', 'Estimated Total Comprehensive Cost']].sort_values(by='Estimated Total Comprehensive Cost', ascending=False))
+
+admin_panel()
+rec.end_rerun()
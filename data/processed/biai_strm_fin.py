@@ -2,10 +2,21 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+from app.figures import chart, scatter
+from app.instrument import admin_panel, plotly_chart, recorder, start_profiling
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(page_title="Austin Crash Command Center 2025", layout="wide")
 
+# Stage timings for the hidden admin panel (?admin=1)
+rec = recorder()
+rec.begin_rerun(Path(__file__).stem)
+start_profiling()
+
 # --- DATA LOADING ---
 @st.cache_data
 def load_data():
@@ -16,7 +27,8 @@ def load_data():
     if not os.path.exists(file_path):
         return None
     
-    df = pd.read_csv(file_path, low_memory=False)
+    with rec.span("load:read_csv"):
+        df = pd.read_csv(file_path, low_memory=False)
     
     # Preprocessing
     df['Crash timestamp'] = pd.to_datetime(df['Crash timestamp (US/Central)'], errors='coerce')
@@ -35,7 +47,8 @@ def load_data():
     
     return df
 
-df_raw = load_data()
+with rec.span("load_data"):
+    df_raw = load_data()
 
 # --- SAFETY GATE ---
 if df_raw is None:
@@ -64,13 +77,14 @@ selected_days = st.sidebar.multiselect("Days of Week:", day_list, default=day_li
 hour_range = st.sidebar.slider("Hour of Day:", 0, 23, (0, 23))
 
 # APPLY ALL FILTERS
-df = df_raw[
-    (df_raw['Estimated Total Comprehensive Cost'].between(selected_cost[0], selected_cost[1])) &
-    (df_raw['Severity_Label'].isin(selected_sev)) &
-    (df_raw['Road_Type'].isin(selected_roads)) &
-    (df_raw['DAY_NAME'].isin(selected_days)) &
-    (df_raw['HOUR'].between(hour_range[0], hour_range[1]))
-]
+with rec.span("filter"):
+    df = df_raw[
+        (df_raw['Estimated Total Comprehensive Cost'].between(selected_cost[0], selected_cost[1])) &
+        (df_raw['Severity_Label'].isin(selected_sev)) &
+        (df_raw['Road_Type'].isin(selected_roads)) &
+        (df_raw['DAY_NAME'].isin(selected_days)) &
+        (df_raw['HOUR'].between(hour_range[0], hour_range[1]))
+    ]
 
 # --- MAIN DASHBOARD ---
 st.title("🚔 Austin Traffic Safety & Economic Command Center")
@@ -100,30 +114,34 @@ with tab1:
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("Hourly Peak Analysis")
-        fig_hour = px.area(df.groupby('HOUR').size().reset_index(name='count'), 
-                           x='HOUR', y='count', title="Crash Volume by Hour",
-                           color_discrete_sequence=['#ef233c'])
-        st.plotly_chart(fig_hour, use_container_width=True)
+        with rec.span("build:hourly"):
+            fig_hour = px.area(df.groupby('HOUR').size().reset_index(name='count'), 
+                               x='HOUR', y='count', title="Crash Volume by Hour",
+                               color_discrete_sequence=['#ef233c'])
+        plotly_chart(fig_hour, "render:hourly", use_container_width=True)
 
     with col2:
         st.subheader("Volume by Injury Severity")
-        fig_sev = px.bar(df['Severity_Label'].value_counts().reset_index(), 
-                         x='count', y='Severity_Label', orientation='h', 
-                         color='Severity_Label', color_discrete_sequence=px.colors.qualitative.Safe)
-        st.plotly_chart(fig_sev, use_container_width=True)
+        with rec.span("build:severity"):
+            fig_sev = px.bar(df['Severity_Label'].value_counts().reset_index(), 
+                             x='count', y='Severity_Label', orientation='h', 
+                             color='Severity_Label', color_discrete_sequence=px.colors.qualitative.Safe)
+        plotly_chart(fig_sev, "render:severity", use_container_width=True)
 
 with tab2:
     col_map, col_street = st.columns([2, 1])
     with col_map:
         st.subheader("Collision Heatmap")
-        st.map(df[['latitude', 'longitude']].dropna())
+        with rec.span("render:map"):
+            st.map(df[['latitude', 'longitude']].dropna())
     with col_street:
         st.subheader("Top High-Risk Streets")
-        top_streets = df['rpt_street_name'].value_counts().head(10).reset_index()
-        fig_top = px.bar(top_streets, x='count', y='rpt_street_name', orientation='h',
-                         title="Highest Frequency", color='count', color_continuous_scale='Reds')
-        fig_top.update_layout(yaxis={'categoryorder':'total ascending'})
-        st.plotly_chart(fig_top, use_container_width=True)
+        with rec.span("build:top_streets"):
+            top_streets = df['rpt_street_name'].value_counts().head(10).reset_index()
+            fig_top = px.bar(top_streets, x='count', y='rpt_street_name', orientation='h',
+                             title="Highest Frequency", color='count', color_continuous_scale='Reds')
+            fig_top.update_layout(yaxis={'categoryorder':'total ascending'})
+        plotly_chart(fig_top, "render:top_streets", use_container_width=True)
 
 with tab3:
     st.subheader("Economic Impact & Vulnerable Road Users")
@@ -131,11 +149,12 @@ with tab3:
     
     with col_f1:
         # Cost by Street Treemap
-        street_cost = df.groupby('rpt_street_name')['Estimated Total Comprehensive Cost'].sum().nlargest(10).reset_index()
-        fig_tree = px.treemap(street_cost, path=['rpt_street_name'], values='Estimated Total Comprehensive Cost',
-                              title="Economic Drain by Street (Top 10)",
-                              color='Estimated Total Comprehensive Cost', color_continuous_scale='RdBu_r')
-        st.plotly_chart(fig_tree, use_container_width=True)
+        with rec.span("build:street_treemap"):
+            street_cost = df.groupby('rpt_street_name')['Estimated Total Comprehensive Cost'].sum().nlargest(10).reset_index()
+            fig_tree = px.treemap(street_cost, path=['rpt_street_name'], values='Estimated Total Comprehensive Cost',
+                                  title="Economic Drain by Street (Top 10)",
+                                  color='Estimated Total Comprehensive Cost', color_continuous_scale='RdBu_r')
+        plotly_chart(fig_tree, "render:street_treemap", use_container_width=True)
         
     with col_f2:
         # Pedestrian/Bike Fatality counts
@@ -147,16 +166,23 @@ with tab3:
         })
         fig_vru = px.pie(vru_stats, values='Count', names='Type', title="Vulnerable User Fatality Split",
                          hole=0.4, color_discrete_sequence=px.colors.sequential.OrRd_r)
-        st.plotly_chart(fig_vru, use_container_width=True)
+        plotly_chart(fig_vru, "render:vru_pie", use_container_width=True)
 
     # Max vs Total Cost comparison
     st.subheader("Max vs. Total Comprehensive Cost Comparison")
-    fig_comp = px.scatter(df, x='Estimated Total Comprehensive Cost', y='Estimated Maximum Comprehensive Cost',
-                          color='Severity_Label', size='death_cnt', hover_data=['rpt_street_name'],
-                          title="Cost Variance Analysis (Bubble size = Death Count)")
-    st.plotly_chart(fig_comp, use_container_width=True)
+    # WebGL trace; large selections are sampled per severity with every fatal crash kept
+    filter_key = (Path(__file__).stem, len(df_raw), selected_cost, tuple(selected_sev), tuple(selected_roads),
+                  tuple(selected_days), hour_range)
+    chart(filter_key, lambda: scatter(df, x='Estimated Total Comprehensive Cost', y='Estimated Maximum Comprehensive Cost',
+                                      color='Severity_Label', size='death_cnt', hover_data=['rpt_street_name'],
+                                      title="Cost Variance Analysis (Bubble size = Death Count)"),
+          "cost_scatter", use_container_width=True)
 
 # --- RAW DATA ---
 with st.expander("📝 View Detailed Records"):
-    st.dataframe(df[['Crash timestamp', 'rpt_street_name', 'Severity_Label', 
-                     'Estimated Total Comprehensive Cost', 'pedestrian_death_count', 'bicycle_death_count']])
\ No newline at end of file
+    with rec.span("render:records"):
+        st.dataframe(df[['Crash timestamp', 'rpt_street_name', 'Severity_Label', 
+                         'Estimated Total Comprehensive Cost', 'pedestrian_death_count', 'bicycle_death_count']])
+
+admin_panel()
+rec.end_rerun()
@@ -3,6 +3,22 @@ import pandas as pd
 import plotly.express as px
 import os
 import glob
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+from app.crash_data import derive_columns
+from app.figures import chart
+from app.instrument import admin_panel, recorder, start_profiling
+from app.live_feed import LiveFeed
+from app.queries import dashboard_state, filter_crashes, map_figure
+from app.render_cache import RenderCache, filter_signature
+from app.workers import QueryPool
+from ml.countermeasures import COST_MODEL_PATH, COUNTERMEASURES_PATH
+from ml.explain import Explainer
+from ml.features import cost_xy
+from pipeline.validate import ensure_report, failed_rows, issues
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
@@ -11,12 +27,22 @@ st.set_page_config(
     page_icon="🛣️"
 )
 
+# Stage timings for the hidden admin panel (?admin=1)
+rec = recorder()
+rec.begin_rerun("viz01")
+start_profiling()
+
 # --- PATH CONFIGURATION ---
 # Updated to the new GitHub/Local Repo directory
-DATA_DIR = r'C:\Users\itai.makubise\code_nova\pn-bi-to-ai\data'
+DATA_DIR = os.environ.get("PNBI_DATA_DIR", r'C:\Users\itai.makubise\code_nova\pn-bi-to-ai\data')
 # Updated to the 2018-2026 cleansed filename
 CSV_FILENAME = 'atx_crash_data_2018-2026_cleansed.csv'
 CSV_PATH = os.path.join(DATA_DIR, CSV_FILENAME)
+# New crash records dropped here as CSV files are picked up in live mode
+LIVE_DROP_DIR = os.environ.get("PNBI_LIVE_DIR", os.path.join(DATA_DIR, 'incoming'))
+LIVE_REFRESH_SECONDS = 10
+# Worker processes for filtering/aggregation (0 = compute in the server process)
+QUERY_WORKERS = int(os.environ.get("PNBI_WORKERS", "0"))
 
 # --- SMART LOGO LOADER ---
 def get_txdot_logo():
@@ -31,58 +57,53 @@ def get_txdot_logo():
 LOGO_PATH = get_txdot_logo()
 
 # --- DATA LOADING ---
+# Data-quality report written at ingest (`run_pipeline.py austin_validate`);
+# rebuilt here only when the CSV is newer than the stored report
+@st.cache_data
+def load_validation(stamp):
+    return ensure_report(CSV_PATH)
+
 @st.cache_data
 def load_data():
     if not os.path.exists(CSV_PATH):
         return None
     
-    # Reading the new cleansed file
-    df = pd.read_csv(CSV_PATH, low_memory=False)
-    
     # --- FIELD VALIDATION ---
-    # We check for the 5 critical groups of fields required for your dashboard
-    required_cols = [
-        'Crash timestamp (US/Central)', 'crash_sev_id', 'latitude', 'longitude', 
-        'rpt_street_name', 'pedestrian_death_count', 'bicycle_death_count', 
-        'motorcycle_death_count', 'Estimated Total Comprehensive Cost'
-    ]
-    missing = [col for col in required_cols if col not in df.columns]
+    # Schema, types and ranges were checked once at ingest; only the stored result is read
+    with rec.span("load:validation"):
+        report = load_validation(os.stat(CSV_PATH).st_mtime_ns)
+    missing = report['missing']
     
     if missing:
         st.error(f"⚠️ The new file is missing these fields: {', '.join(missing)}")
         st.info("Please verify if the 'cleansed' file renamed these headers.")
         st.stop()
 
+    # Reading the new cleansed file
+    with rec.span("load:read_csv"):
+        df = pd.read_csv(CSV_PATH, low_memory=False)
+
+    # Crashes geocoded outside the Austin area would land off the map
+    df = df[~failed_rows(CSV_PATH, report, ['austin_bounds'])]
+
     # Preprocessing
-    df['Crash timestamp'] = pd.to_datetime(df['Crash timestamp (US/Central)'], errors='coerce')
-    df['Year'] = df['Crash timestamp'].dt.year
-    df['Date'] = df['Crash timestamp'].dt.date
-    df['HOUR'] = df['Crash timestamp'].dt.hour
-    df['DAY_NAME'] = df['Crash timestamp'].dt.day_name()
-    
-    sev_map = {1: "Fatal", 2: "Serious Injury", 3: "Minor Injury", 4: "Possible Injury", 0: "No Injury", 5: "Unknown"}
-    df['Severity_Label'] = df['crash_sev_id'].map(sev_map)
-    
-    df['latitude'] = pd.to_numeric(df['latitude'], errors='coerce')
-    df['longitude'] = pd.to_numeric(df['longitude'], errors='coerce')
-    
-    # Handle Speed Limits (default to 0 if missing)
-    if 'crash_speed_limit' in df.columns:
-        df['crash_speed_limit'] = pd.to_numeric(df['crash_speed_limit'], errors='coerce').fillna(0)
-        df['map_size'] = df['crash_speed_limit'].apply(lambda x: x if x > 0 else 5)
-    else:
-        df['map_size'] = 5 # Default marker size if speed is missing
-        
-    df['Estimated Total Comprehensive Cost'] = pd.to_numeric(df['Estimated Total Comprehensive Cost'], errors='coerce').fillna(0)
+    df = derive_columns(df)
     
     return df.dropna(subset=['latitude', 'longitude'])
 
-df_raw = load_data()
+with rec.span("load_data"):
+    df_raw = load_data()
 
 if df_raw is None:
     st.error(f"🛑 CSV file not found at: {CSV_PATH}")
     st.stop()
 
+# --- LIVE FEED ---
+# One watcher per server process, shared by every session
+@st.cache_resource
+def get_live_feed():
+    return LiveFeed(load_data(), LIVE_DROP_DIR).start()
+
 # --- SIDEBAR: BRANDING & FILTERS ---
 with st.sidebar:
     if LOGO_PATH:
@@ -103,14 +124,42 @@ with st.sidebar:
     hour_range = st.slider("Hour of Day:", 0, 23, (0, 23))
     selected_sev = st.multiselect("Severity Level:", df_raw['Severity_Label'].unique().tolist(), default=df_raw['Severity_Label'].unique().tolist())
 
+    report = load_validation(os.stat(CSV_PATH).st_mtime_ns)
+    if report['errors'] or report['warnings']:
+        with st.expander(f"🧪 Data quality: {report['errors']} error(s), {report['warnings']} warning(s)"):
+            st.dataframe(issues(report)[['check', 'column', 'failed']], hide_index=True, use_container_width=True)
+
+    st.divider()
+    live_mode = st.toggle("🔴 Live feed", value=False, help=f"Watch {LIVE_DROP_DIR} for new crash records")
+
 # --- FILTER LOGIC ---
-df = df_raw.copy()
-df = df[df['Year'].isin(selected_years)]
+filters = {'years': selected_years, 'street': selected_street, 'hour_range': hour_range, 'severities': selected_sev}
 
-if selected_street != "All Streets":
-    df = df[df['rpt_street_name'] == selected_street]
-    
-df = df[(df['Severity_Label'].isin(selected_sev)) & (df['HOUR'].between(hour_range[0], hour_range[1]))]
+def apply_filters(frame):
+    return filter_crashes(frame, **filters)
+
+# --- RENDER STATE ---
+# One cache per data source, shared by every session on this server
+@st.cache_resource
+def get_render_cache(source):
+    return RenderCache()
+
+# Ranking written by `run_pipeline.py countermeasures`; re-read when the file changes
+@st.cache_data
+def load_countermeasures(stamp):
+    return pd.read_csv(COUNTERMEASURES_PATH)
+
+# Cost model explanations, cached on disk per model version; reloaded when the pickle changes
+@st.cache_resource
+def get_explainer(stamp):
+    return Explainer.from_path(COST_MODEL_PATH)
+
+# With PNBI_WORKERS=N the CSV's state and maps are computed on N worker processes
+@st.cache_resource
+def get_query_pool():
+    pool = QueryPool(CSV_PATH, frame=load_data(), processes=QUERY_WORKERS)
+    pool.warm()
+    return pool
 
 # --- MAIN DASHBOARD HEADER ---
 head_col1, head_col2 = st.columns([1, 5])
@@ -121,75 +170,157 @@ with head_col2:
     st.title("Vision Zero Intelligence Portal")
     st.subheader(f"Historical Analysis: {min(selected_years)} - {max(selected_years)}")
 
-# --- ROW 1: KPI METRICS ---
-m1, m2, m3, m4, m5 = st.columns(5)
-with m1: st.metric("Total Crashes", f"{len(df):,}")
-with m2: st.metric("🚶 Pedestrian Deaths", int(df['pedestrian_death_count'].sum()))
-with m3: st.metric("🚲 Bicycle Deaths", int(df['bicycle_death_count'].sum()))
-with m4: st.metric("🏍️ Motorcycle Deaths", int(df['motorcycle_death_count'].sum()))
-with m5:
-    total_cost = df['Estimated Total Comprehensive Cost'].sum()
-    st.metric("Economic Impact", f"${total_cost/1e6:.1f}M")
-
-st.markdown("---")
-
-# --- TABS ---
-tab1, tab2, tab3, tab4 = st.tabs(["💸 Financial Burden", "🗺️ GIS Mapping", "🛣️ Street Intelligence", "🚲 VRU Analysis"])
-
-# TAB 1: FINANCIAL BURDEN
-with tab1:
-    st.subheader("Economic Burden Analysis")
-    cost_sev = df.groupby('Severity_Label')['Estimated Total Comprehensive Cost'].sum().reset_index()
-    fig_donut = px.pie(cost_sev, values='Estimated Total Comprehensive Cost', names='Severity_Label', 
-                       hole=0.4, title="Comprehensive Cost by Severity",
-                       color_discrete_sequence=px.colors.qualitative.Prism)
-    st.plotly_chart(fig_donut, use_container_width=True)
-
-# TAB 2: GIS MAPPING
-with tab2:
-    st.subheader("Geospatial Incident Intelligence")
-    view_mode = st.radio("Overlay Type:", ["Heatmap", "Incident Markers"], horizontal=True)
-    
-    if view_mode == "Heatmap":
-        fig_map = px.density_mapbox(df, lat='latitude', lon='longitude', z='Estimated Total Comprehensive Cost',
-                                    radius=10, center=dict(lat=30.2672, lon=-97.7431), zoom=10,
-                                    mapbox_style="carto-darkmatter")
+# --- LIVE-REFRESHING BODY ---
+# In live mode only this fragment reruns on a timer; KPIs and charts are
+# recomputed when the feed has folded in new records since the last run.
+@st.fragment(run_every=LIVE_REFRESH_SECONDS if live_mode else None)
+def render_dashboard():
+    if live_mode:
+        with rec.span("live_snapshot"):
+            feed = get_live_feed()
+            version, frame = feed.snapshot()
+        if version:
+            st.caption(f"🔴 Live: {version} update(s), last {time.strftime('%H:%M:%S', time.localtime(feed.last_update))} "
+                       f"({feed.recent[-1][1]}, {feed.recent[-1][2]:,} rows)")
+        else:
+            st.caption(f"🔴 Live: watching {LIVE_DROP_DIR}")
     else:
-        fig_map = px.scatter_mapbox(df, lat='latitude', lon='longitude', color='Severity_Label', 
-                                    size='map_size', size_max=12, center=dict(lat=30.2672, lon=-97.7431), zoom=10,
-                                    mapbox_style="carto-positron")
-    
-    fig_map.update_layout(margin={"r":0,"t":0,"l":0,"b":0}, height=600)
-    st.plotly_chart(fig_map, use_container_width=True)
+        version, frame = None, df_raw
 
-# TAB 3: STREET INTELLIGENCE
-with tab3:
-    st.subheader("📍 High-Risk Street Intelligence Index")
-    street_df = df[~df['rpt_street_name'].str.contains("NOT REPORTED|UNKNOWN", case=False, na=True)]
-    
-    # Dynamic check for ID field (common change in cleansed files)
-    id_col = 'ID' if 'ID' in street_df.columns else street_df.columns[0]
-    
-    risk_index = street_df.groupby('rpt_street_name').agg({
-        id_col: 'count', 'death_cnt': 'sum', 'sus_serious_injry_cnt': 'sum', 'Estimated Total Comprehensive Cost': 'sum'
-    }).reset_index()
+    # Render state (KPIs, aggregates, figure specs) is shared by every session that
+    # picks the same filters, until the data version changes
+    cache = get_render_cache('live' if live_mode else 'csv').at_version(version)
+    signature = filter_signature(selected_years, selected_street, hour_range, selected_sev)
+
+    def filtered():
+        # Re-filter only when the data or the filters changed since this session's last run
+        filter_key = (version, signature)
+        if st.session_state.get('filter_key') != filter_key:
+            with rec.span("filter"):
+                st.session_state['filtered'] = apply_filters(frame)
+            st.session_state['filter_key'] = filter_key
+        return st.session_state['filtered']
+
+    use_pool = QUERY_WORKERS > 0 and not live_mode
+    with rec.span("state"):
+        if use_pool:
+            state = cache.get_or_build(("state", signature), lambda: get_query_pool().query("state", filters))
+        else:
+            state = cache.get_or_build(("state", signature), lambda: dashboard_state(filtered()))
+
+    # --- ROW 1: KPI METRICS ---
+    kpis = state['kpis']
+    m1, m2, m3, m4, m5 = st.columns(5)
+    with m1: st.metric("Total Crashes", f"{kpis['crashes']:,}")
+    with m2: st.metric("🚶 Pedestrian Deaths", kpis['pedestrian'])
+    with m3: st.metric("🚲 Bicycle Deaths", kpis['bicycle'])
+    with m4: st.metric("🏍️ Motorcycle Deaths", kpis['motorcycle'])
+    with m5: st.metric("Economic Impact", f"${kpis['cost']/1e6:.1f}M")
+
+    st.markdown("---")
+
+    # --- TABS ---
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["💸 Financial Burden", "🗺️ GIS Mapping", "🛣️ Street Intelligence",
+                                                  "🚲 VRU Analysis", "🛠️ Countermeasures", "🧠 Cost Drivers"])
+
+    # TAB 1: FINANCIAL BURDEN
+    with tab1:
+        st.subheader("Economic Burden Analysis")
+        chart(signature, lambda: px.pie(state['cost_sev'], values='Estimated Total Comprehensive Cost', names='Severity_Label', 
+                                        hole=0.4, title="Comprehensive Cost by Severity",
+                                        color_discrete_sequence=px.colors.qualitative.Prism),
+              "cost_donut", cache=cache, use_container_width=True)
+
+    # TAB 2: GIS MAPPING
+    with tab2:
+        st.subheader("Geospatial Incident Intelligence")
+        view_mode = st.radio("Overlay Type:", ["Heatmap", "Incident Markers"], horizontal=True)
     
-    risk_index.columns = ['Street Name', 'Total Incidents', 'Death Count', 'Serious Injuries', 'Total Comprehensive Cost']
-    risk_index = risk_index.nlargest(10, 'Total Incidents')
-
-    st.dataframe(risk_index.style.format({
-        'Total Comprehensive Cost': '${:,.0f}', 'Total Incidents': '{:,}', 
-        'Death Count': '{:,}', 'Serious Injuries': '{:,}'
-    }).background_gradient(subset=['Total Comprehensive Cost'], cmap='YlOrRd'), use_container_width=True, hide_index=True)
-
-# TAB 4: VRU ANALYSIS
-with tab4:
-    st.subheader("Vulnerable Road User (VRU) Safety")
-    vru_counts = pd.DataFrame({
-        'User Type': ['Pedestrian', 'Bicycle', 'Motorcycle'],
-        'Fatalities': [df['pedestrian_death_count'].sum(), df['bicycle_death_count'].sum(), df['motorcycle_death_count'].sum()]
-    })
-    fig_vru = px.bar(vru_counts, x='User Type', y='Fatalities', color='User Type', 
-                     title="Fatality Breakdown by Mode",
-                     color_discrete_map={'Pedestrian':'#E63946', 'Bicycle':'#457B9D', 'Motorcycle':'#A8DADC'})
-    st.plotly_chart(fig_vru, use_container_width=True)
\ No newline at end of file
+        # Heatmap is binned on a ~200 m grid and markers are sampled (fatal crashes always kept)
+        def build_map():
+            if use_pool:
+                return get_query_pool().query("map", filters, view_mode=view_mode)
+            return map_figure(filtered(), view_mode)
+
+        map_stage = "heatmap" if view_mode == "Heatmap" else "markers"
+        chart(signature, build_map, map_stage, cache=cache, use_container_width=True)
+
+    # TAB 3: STREET INTELLIGENCE
+    with tab3:
+        st.subheader("📍 High-Risk Street Intelligence Index")
+        with rec.span("render:street_table"):
+            st.dataframe(state['risk_index'].style.format({
+                'Total Comprehensive Cost': '${:,.0f}', 'Total Incidents': '{:,}', 
+                'Death Count': '{:,}', 'Serious Injuries': '{:,}'
+            }).background_gradient(subset=['Total Comprehensive Cost'], cmap='YlOrRd'), use_container_width=True, hide_index=True)
+
+    # TAB 4: VRU ANALYSIS
+    with tab4:
+        st.subheader("Vulnerable Road User (VRU) Safety")
+        chart(signature, lambda: px.bar(state['vru_counts'], x='User Type', y='Fatalities', color='User Type', 
+                                        title="Fatality Breakdown by Mode",
+                                        color_discrete_map={'Pedestrian':'#E63946', 'Bicycle':'#457B9D', 'Motorcycle':'#A8DADC'}),
+              "vru_bar", cache=cache, use_container_width=True)
+
+    # TAB 5: COUNTERMEASURES
+    with tab5:
+        st.subheader("Prescriptive Countermeasure Ranking")
+        if not COUNTERMEASURES_PATH.exists():
+            st.info("No ranking yet. Run `python src/pipeline/run_pipeline.py countermeasures`.")
+        else:
+            ranking = load_countermeasures(COUNTERMEASURES_PATH.stat().st_mtime_ns)
+            if selected_street != "All Streets":
+                ranking = ranking[ranking['unit'] == selected_street]
+            st.caption("Predicted comprehensive cost saved if the intervention had been in place for past crashes "
+                       "(cost-model counterfactuals, best first per corridor/hotspot).")
+            st.dataframe(ranking[['unit_type', 'unit', 'rank', 'intervention', 'affected_crashes',
+                                  'expected_reduction', 'reduction_pct']].style.format({
+                'expected_reduction': '${:,.0f}', 'reduction_pct': '{:.1f}%', 'affected_crashes': '{:,}'
+            }), use_container_width=True, hide_index=True)
+
+    # TAB 6: COST DRIVERS
+    with tab6:
+        st.subheader("What Drives Predicted Crash Cost")
+        if not COST_MODEL_PATH.exists():
+            st.info("No cost model yet. Run `python src/pipeline/run_pipeline.py cost_model`.")
+        else:
+            explainer = get_explainer(COST_MODEL_PATH.stat().st_mtime_ns)
+            sel = filtered()
+            X, y = cost_xy(sel)
+            if len(X) < 50:
+                st.info("Too few crashes in this selection to explain.")
+            else:
+                with rec.span("explain:importance"):
+                    importance = explainer.importance(X, y)
+                st.caption("Permutation importance: drop in R² when a feature is shuffled "
+                           f"(sample of up to {min(len(X), 5000):,} crashes across the cost range).")
+                chart(("importance", signature), lambda: px.bar(importance.head(12), x='importance', y='feature',
+                                                                error_x='std', orientation='h'),
+                      "explain:importance", cache=cache, use_container_width=True)
+
+                if not explainer.has_attributions:
+                    st.info(f"Per-crash attributions need a random-forest cost model; the current model is a "
+                            f"{type(explainer.model).__name__}, so only permutation importance is shown.")
+                else:
+                    with rec.span("explain:corridors"):
+                        corridors = explainer.drivers(X, sel.loc[X.index, 'rpt_street_name'])
+                    top = sel.loc[X.index, 'rpt_street_name'].value_counts().index[:10]
+                    st.markdown("**Corridor drivers** — mean contribution to predicted cost ($) per crash")
+                    st.dataframe(corridors.reindex(top).dropna(how='all').style.format('{:,.0f}')
+                                 .background_gradient(cmap='RdYlGn_r', axis=None), use_container_width=True)
+
+                    costly = y.nlargest(200).index
+                    crash = st.selectbox("Explain a crash (200 most costly in selection):", costly,
+                                         format_func=lambda i: f"{sel.at[i, 'rpt_street_name']} — ${y[i]:,.0f}")
+                    with rec.span("explain:crash"):
+                        bias, contrib = explainer.attributions(X.loc[costly])
+                    row = contrib.loc[crash].sort_values(key=abs, ascending=False).head(10)
+                    st.caption(f"Predicted ${bias + contrib.loc[crash].sum():,.0f} = average crash ${bias:,.0f} "
+                               "plus the contributions below.")
+                    st.plotly_chart(px.bar(row[::-1], orientation='h', labels={'value': 'Contribution ($)', 'index': ''}),
+                                    use_container_width=True)
+
+
+render_dashboard()
+admin_panel({"Render cache": get_render_cache('live' if live_mode else 'csv').stats()})
+rec.end_rerun()
@@ -3,6 +3,12 @@ import pandas as pd
 import plotly.express as px
 import os
 import glob
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+from app.instrument import admin_panel, plotly_chart, recorder, start_profiling
+from pipeline.validate import ensure_report
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
@@ -11,6 +17,11 @@ st.set_page_config(
     page_icon="🛣️"
 )
 
+# Stage timings for the hidden admin panel (?admin=1)
+rec = recorder()
+rec.begin_rerun(Path(__file__).stem)
+start_profiling()
+
 # --- PATH CONFIGURATION ---
 DATA_DIR = r'C:\Users\itai.makubise\code_nova\pn-bi-to-ai\data'
 CSV_FILENAME = 'atx_crash_data_2018-2026_cleansed.csv'
@@ -52,21 +63,31 @@ def load_data():
     df['longitude'] = pd.to_numeric(df['longitude'], errors='coerce')
     
     # --- DATA SANITIZATION (The Fix for your Error) ---
-    # Convert 'N/A' strings to NaN, then fill NaN with 0
+    # 'N/A' counts and speeds stay missing rather than becoming 0; how many there
+    # are is reported by the ingest validation (pipeline/validate.py)
     if 'tot_injry_cnt' in df.columns:
-        df['tot_injry_cnt'] = pd.to_numeric(df['tot_injry_cnt'], errors='coerce').fillna(0)
+        df['tot_injry_cnt'] = pd.to_numeric(df['tot_injry_cnt'], errors='coerce')
     
-    df['crash_speed_limit'] = pd.to_numeric(df['crash_speed_limit'], errors='coerce').fillna(0)
+    df['crash_speed_limit'] = pd.to_numeric(df['crash_speed_limit'], errors='coerce')
     df['Estimated Total Comprehensive Cost'] = pd.to_numeric(df['Estimated Total Comprehensive Cost'], errors='coerce').fillna(0)
     
     return df.dropna(subset=['latitude', 'longitude'])
 
-df_raw = load_data()
+with rec.span("load_data"):
+    df_raw = load_data()
 
 if df_raw is None:
     st.error(f"🛑 Dataset not found: {CSV_PATH}")
     st.stop()
 
+# Data-quality report stored at ingest; rebuilt only if the CSV changed, once per
+# file version rather than inside every rerun
+@st.cache_data
+def load_validation(stamp):
+    return ensure_report(CSV_PATH)
+
+report = load_validation(os.stat(CSV_PATH).st_mtime_ns)
+
 # --- SIDEBAR: CONTROLS ---
 with st.sidebar:
     if LOGO_PATH:
@@ -84,11 +105,12 @@ with st.sidebar:
                                    default=["Fatal", "Serious Injury", "Minor Injury"])
 
 # --- FILTER LOGIC ---
-df = df_raw.copy()
-df = df[df['Year'].isin(selected_years)]
-if selected_street != "All Corridors":
-    df = df[df['rpt_street_name'] == selected_street]
-df = df[df['Severity_Label'].isin(selected_sev)]
+with rec.span("filter"):
+    df = df_raw.copy()
+    df = df[df['Year'].isin(selected_years)]
+    if selected_street != "All Corridors":
+        df = df[df['rpt_street_name'] == selected_street]
+    df = df[df['Severity_Label'].isin(selected_sev)]
 
 # --- HEADER ---
 h1, h2 = st.columns([1, 5])
@@ -107,7 +129,9 @@ with m2:
 with m3: 
     # Safe calculation after sanitization
     total_injuries = int(df['tot_injry_cnt'].sum()) if 'tot_injry_cnt' in df.columns else 0
-    st.metric("Total Injuries", f"{total_injuries:,}")
+    unreadable = sum(c['failed'] for c in report['checks'] if c['column'] == 'tot_injry_cnt' and c['check'].startswith('dtype'))
+    st.metric("Total Injuries", f"{total_injuries:,}",
+              help=f"{unreadable:,} crash(es) have a non-numeric injury count and are not included" if unreadable else None)
 with m4:
     avg_speed = df['crash_speed_limit'].mean()
     st.metric("Avg Speed Limit", f"{avg_speed:.0f} MPH")
@@ -127,7 +151,7 @@ with tab1:
     month_order = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']
     fig_trend = px.line(trend_df, x='Month', y='Count', color='Year', 
                         category_orders={'Month': month_order}, markers=True)
-    st.plotly_chart(fig_trend, use_container_width=True)
+    plotly_chart(fig_trend, "render:trend", use_container_width=True)
 
 with tab2:
     st.subheader("Geospatial High-Injury Network")
@@ -135,17 +159,20 @@ with tab2:
                                 radius=10, center=dict(lat=30.2672, lon=-97.7431), zoom=10,
                                 mapbox_style="carto-darkmatter")
     fig_map.update_layout(margin={"r":0,"t":0,"l":0,"b":0}, height=550)
-    st.plotly_chart(fig_map, use_container_width=True)
+    plotly_chart(fig_map, "render:map", use_container_width=True)
 
 with tab3:
     st.subheader("Top 10 High-Risk Corridors")
     street_risk = df.groupby('rpt_street_name')['Estimated Total Comprehensive Cost'].sum().nlargest(10).reset_index()
     fig_risk = px.bar(street_risk, x='Estimated Total Comprehensive Cost', y='rpt_street_name', orientation='h', color_continuous_scale='Reds')
-    st.plotly_chart(fig_risk, use_container_width=True)
+    plotly_chart(fig_risk, "render:risk", use_container_width=True)
 
 with tab4:
     st.subheader("Peak Risk Windows (Hour vs Day)")
     heat_df = df.groupby(['DAY_NAME', 'HOUR']).size().reset_index(name='Count')
     day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
     fig_heat = px.density_heatmap(heat_df, x='HOUR', y='DAY_NAME', z='Count', category_orders={'DAY_NAME': day_order})
-    st.plotly_chart(fig_heat, use_container_width=True)
\ No newline at end of file
+    plotly_chart(fig_heat, "render:heat", use_container_width=True)
+
+admin_panel()
+rec.end_rerun()
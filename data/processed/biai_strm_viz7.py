@@ -3,6 +3,11 @@ import pandas as pd
 import plotly.express as px
 import os
 import glob
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+from app.instrument import admin_panel, plotly_chart, recorder, start_profiling
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
@@ -11,6 +16,11 @@ st.set_page_config(
     page_icon="🛣️"
 )
 
+# Stage timings for the hidden admin panel (?admin=1)
+rec = recorder()
+rec.begin_rerun(Path(__file__).stem)
+start_profiling()
+
 # --- PATH CONFIGURATION ---
 DATA_DIR = r'C:\Users\itai.makubise\code_nova\pn-bi-to-ai\data'
 CSV_PATH = os.path.join(DATA_DIR, 'atx_crash_2025.csv')
@@ -51,7 +61,8 @@ def load_data():
     
     return df.dropna(subset=['latitude', 'longitude'])
 
-df_raw = load_data()
+with rec.span("load_data"):
+    df_raw = load_data()
 
 if df_raw is None:
     st.error(f"🛑 CSV file not found at: {CSV_PATH}")
@@ -73,10 +84,11 @@ with st.sidebar:
     selected_sev = st.multiselect("Severity Level:", df_raw['Severity_Label'].unique().tolist(), default=df_raw['Severity_Label'].unique().tolist())
 
 # --- FILTER LOGIC ---
-df = df_raw.copy()
-if selected_street != "All Streets":
-    df = df[df['rpt_street_name'] == selected_street]
-df = df[(df['Severity_Label'].isin(selected_sev)) & (df['HOUR'].between(hour_range[0], hour_range[1]))]
+with rec.span("filter"):
+    df = df_raw.copy()
+    if selected_street != "All Streets":
+        df = df[df['rpt_street_name'] == selected_street]
+    df = df[(df['Severity_Label'].isin(selected_sev)) & (df['HOUR'].between(hour_range[0], hour_range[1]))]
 
 # --- MAIN DASHBOARD HEADER ---
 head_col1, head_col2 = st.columns([1, 5])
@@ -109,7 +121,7 @@ with tab1:
     fig_donut = px.pie(cost_sev, values='Estimated Total Comprehensive Cost', names='Severity_Label', 
                        hole=0.4, title="Comprehensive Cost by Severity",
                        color_discrete_sequence=px.colors.qualitative.Prism)
-    st.plotly_chart(fig_donut, use_container_width=True)
+    plotly_chart(fig_donut, "render:donut", use_container_width=True)
 
 # TAB 2: GIS MAPPING
 with tab2:
@@ -126,7 +138,7 @@ with tab2:
                                     mapbox_style="carto-positron")
     
     fig_map.update_layout(margin={"r":0,"t":0,"l":0,"b":0}, height=600)
-    st.plotly_chart(fig_map, use_container_width=True)
+    plotly_chart(fig_map, "render:map", use_container_width=True)
 
 # TAB 3: STREET INTELLIGENCE
 with tab3:
@@ -154,4 +166,7 @@ with tab4:
     fig_vru = px.bar(vru_counts, x='User Type', y='Fatalities', color='User Type', 
                      title="Fatality Breakdown by Mode",
                      color_discrete_map={'Pedestrian':'#E63946', 'Bicycle':'#F1FAEE', 'Motorcycle':'#A8DADC'})
-    st.plotly_chart(fig_vru, use_container_width=True)
\ No newline at end of file
+    plotly_chart(fig_vru, "render:vru", use_container_width=True)
+
+admin_panel()
+rec.end_rerun()
@@ -2,6 +2,11 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+from pipeline.spatial import load_fars_geo
 
 #1. Load the dataset
 # Ensure 'accident.csv' is in your working directory
@@ -16,47 +21,50 @@ with open('accident_2017to2023.csv', 'r') as f:
     print(first_line)
 
 # 2. Data Cleaning & Numeric Conversion
-df['LATITUDE'] = pd.to_numeric(df['LATITUDE'], errors='coerce')
-df['LONGITUD'] = pd.to_numeric(df['LONGITUD'], errors='coerce')
+# Coordinates are validated (contiguous US) and projected to equal-area x/y once
+# at ingest (pipeline stage fars_geo) and cached under data/.pipeline
+df = df.join(load_fars_geo('accident_2017to2023.csv'))
 df['FATALS'] = pd.to_numeric(df['FATALS'], errors='coerce')
 
-# Filter for valid coordinates within the contiguous United States
-valid_coords = df[
-    (df['LATITUDE'] < 50) & (df['LATITUDE'] > 24) &
-    (df['LONGITUD'] > -125) & (df['LONGITUD'] < -66)
-].dropna(subset=['LATITUDE', 'LONGITUD', 'FATALS']).copy()
+valid_coords = df[df['geo_valid']].dropna(subset=['FATALS']).copy()
+# Hexagons of equal size in equal-area kilometres cover equal ground areas
+valid_coords['X_KM'] = valid_coords['X'] / 1000
+valid_coords['Y_KM'] = valid_coords['Y'] / 1000
 
 # --- HEATMAP 1: General Accident Density ---
 plt.figure(figsize=(14, 8))
-hb1 = plt.hexbin(valid_coords['LONGITUD'], valid_coords['LATITUDE'], 
+hb1 = plt.hexbin(valid_coords['X_KM'], valid_coords['Y_KM'], 
                  gridsize=80, cmap='YlOrRd', bins='log', mincnt=1)
 plt.colorbar(hb1, label='Log10(Number of Accidents)')
 plt.title('Heatmap 1: General Accident Density (2017-2023)', fontsize=15)
-plt.xlabel('Longitude')
-plt.ylabel('Latitude')
+plt.gca().set_aspect('equal')
+plt.xlabel('Easting (km, Albers equal-area)')
+plt.ylabel('Northing (km)')
 plt.grid(alpha=0.2)
 plt.savefig('heatmap_density_2017_2023.png', dpi=300)
 
 # --- HEATMAP 2: Fatality Risk Hotspots ---
 plt.figure(figsize=(14, 8))
-hb2 = plt.hexbin(valid_coords['LONGITUD'], valid_coords['LATITUDE'], 
+hb2 = plt.hexbin(valid_coords['X_KM'], valid_coords['Y_KM'], 
                  C=valid_coords['FATALS'], reduce_C_function=np.sum, 
                  gridsize=80, cmap='Reds', mincnt=1)
 plt.colorbar(hb2, label='Total Fatalities (Sum)')
 plt.title('Heatmap 2: Fatality Risk Hotspots (Severity Weighted)', fontsize=15)
-plt.xlabel('Longitude')
-plt.ylabel('Latitude')
+plt.gca().set_aspect('equal')
+plt.xlabel('Easting (km, Albers equal-area)')
+plt.ylabel('Northing (km)')
 plt.grid(alpha=0.2)
 plt.savefig('heatmap_fatality_2017_2023.png', dpi=300)
 
 # --- HEATMAP 3: Nighttime Accident Risk ---
 night_df = valid_coords[valid_coords['LGT_CONDNAME'].str.contains('Dark', case=False, na=False)]
 plt.figure(figsize=(14, 8))
-hb3 = plt.hexbin(night_df['LONGITUD'], night_df['LATITUDE'], 
+hb3 = plt.hexbin(night_df['X_KM'], night_df['Y_KM'], 
                  gridsize=80, cmap='magma', bins='log', mincnt=1)
 plt.colorbar(hb3, label='Log10(Nighttime Accidents)')
 plt.title('Heatmap 3: Nighttime Accident Risk Analysis', fontsize=15)
-plt.xlabel('Longitude')
-plt.ylabel('Latitude')
+plt.gca().set_aspect('equal')
+plt.xlabel('Easting (km, Albers equal-area)')
+plt.ylabel('Northing (km)')
 plt.grid(alpha=0.2)
 plt.savefig('heatmap_night_2017_2023.png', dpi=300)
\ No newline at end of file
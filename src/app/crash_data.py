@@ -0,0 +1,36 @@
+import pandas as pd
+
+from app.instrument import timed
+
+# Shared Austin crash preprocessing used by the portals (same columns the
+# load_data() functions in data/processed/biai_strm_*.py derive).
+
+TIMESTAMP_COL = "Crash timestamp (US/Central)"
+COST_COL = "Estimated Total Comprehensive Cost"
+
+SEV_MAP = {1: "Fatal", 2: "Serious Injury", 3: "Minor Injury", 4: "Possible Injury", 0: "No Injury", 5: "Unknown"}
+
+
+@timed("derive_columns")
+def derive_columns(df):
+    """Add the timestamp, severity and map columns the dashboards filter on."""
+    df['Crash timestamp'] = pd.to_datetime(df[TIMESTAMP_COL], errors='coerce')
+    df['Year'] = df['Crash timestamp'].dt.year
+    df['Date'] = df['Crash timestamp'].dt.date
+    df['HOUR'] = df['Crash timestamp'].dt.hour
+    df['DAY_NAME'] = df['Crash timestamp'].dt.day_name()
+
+    df['Severity_Label'] = df['crash_sev_id'].map(SEV_MAP)
+
+    df['latitude'] = pd.to_numeric(df['latitude'], errors='coerce')
+    df['longitude'] = pd.to_numeric(df['longitude'], errors='coerce')
+
+    # Handle Speed Limits (default to 0 if missing)
+    if 'crash_speed_limit' in df.columns:
+        df['crash_speed_limit'] = pd.to_numeric(df['crash_speed_limit'], errors='coerce').fillna(0)
+        df['map_size'] = df['crash_speed_limit'].where(df['crash_speed_limit'] > 0, 5)
+    else:
+        df['map_size'] = 5  # Default marker size if speed is missing
+
+    df[COST_COL] = pd.to_numeric(df[COST_COL], errors='coerce').fillna(0)
+    return df
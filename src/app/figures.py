@@ -0,0 +1,163 @@
+import collections
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+
+from app.instrument import recorder
+
+# Payload-aware Plotly figures for the portals.
+#
+# A scatter or marker map of every filtered crash sends each point (and its
+# hover text) to the browser, so payload and render time grow with the data.
+# The builders here cap what is sent: large scatters become a WebGL trace over
+# a stratified sample that keeps every fatal crash, and heatmaps are binned on
+# a grid before plotting. Serialised figures are cached per filter signature,
+# so a rerun with the same filters skips building and serialising the figure.
+#
+#   chart(("markers", filter_key), lambda: scatter_map(df, ...), "markers", use_container_width=True)
+
+MAX_POINTS = 20_000        # scatter points sent before sampling kicks in
+MAX_MAP_POINTS = 15_000    # marker map points
+GRID_DEG = 0.002           # heatmap cell (about 200 m), finer than a pixel at zoom 10
+SAMPLE_SEED = 42
+
+
+# ---- Downsampling ----
+def keep_fatal(df):
+    """Rows that must never be sampled away."""
+    return df["death_cnt"].fillna(0) > 0 if "death_cnt" in df.columns else pd.Series(False, index=df.index)
+
+
+def stratified_sample(df, n, strata=None, keep=None, seed=SAMPLE_SEED):
+    """At most about `n` rows: all `keep` rows plus a proportional sample of each stratum."""
+    if len(df) <= n:
+        return df
+    keep = (keep_fatal(df) if keep is None else keep).to_numpy()
+    frac = max(n - keep.sum(), 0) / max((~keep).sum(), 1)
+    codes = pd.factorize(df[strata])[0] if strata is not None and strata in df.columns else np.zeros(len(df), int)
+    codes = np.where(keep, -2, codes)           # kept rows form their own group (NaN strata are -1)
+    # Random order within each stratum; take the first round(frac * size) of each
+    order = np.lexsort((np.random.default_rng(seed).random(len(df)), codes))
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    sizes = np.diff(np.r_[starts, len(df)])
+    rank = np.arange(len(df)) - np.repeat(starts, sizes)
+    quota = np.repeat(np.round(sizes * frac), sizes)
+    take = np.zeros(len(df), bool)
+    take[order] = (sorted_codes == -2) | (rank < quota)
+    return df[take]
+
+
+def _shown_note(shown, total, kept):
+    return f"{shown:,} of {total:,} crashes shown (sampled, all {kept:,} fatal kept)"
+
+
+def grid_density(df, lat, lon, z=None, cell=GRID_DEG):
+    """Sum `z` (or count rows) per lat/lon grid cell; one row per non-empty cell at its centre."""
+    pts = df[[lat, lon]].dropna()
+    cy = np.floor(pts[lat].to_numpy() / cell).astype(np.int64)
+    cx = np.floor(pts[lon].to_numpy() / cell).astype(np.int64)
+    weight = df.loc[pts.index, z].fillna(0).to_numpy() if z else np.ones(len(pts))
+    cells = pd.DataFrame({"cy": cy, "cx": cx, "w": weight}).groupby(["cy", "cx"], sort=False)["w"].sum().reset_index()
+    return pd.DataFrame({lat: ((cells["cy"] + 0.5) * cell).astype("float32"),
+                         lon: ((cells["cx"] + 0.5) * cell).astype("float32"),
+                         z or "count": cells["w"].to_numpy()})
+
+
+# ---- Figure builders ----
+def scatter(df, x, y, color=None, size=None, hover_data=None, title=None, max_points=MAX_POINTS, **kwargs):
+    """px.scatter as a WebGL trace; above `max_points` rows, a stratified sample keeping fatal crashes."""
+    import plotly.express as px
+    shown = stratified_sample(df, max_points, strata=color)
+    if len(shown) < len(df):
+        note = _shown_note(len(shown), len(df), int(keep_fatal(df).sum()))
+        title = f"{title}<br><sup>{note}</sup>" if title else note
+    return px.scatter(shown, x=x, y=y, color=color, size=size, hover_data=hover_data, title=title,
+                      render_mode="webgl", **kwargs)
+
+
+def scatter_map(df, lat, lon, color=None, size=None, max_points=MAX_MAP_POINTS, **kwargs):
+    """px.scatter_mapbox over a stratified sample (fatal crashes kept) with float32 coordinates."""
+    import plotly.express as px
+    shown = stratified_sample(df, max_points, strata=color)
+    cols = [c for c in [lat, lon, color, size] if c]
+    shown = shown[cols].astype({lat: "float32", lon: "float32"})
+    fig = px.scatter_mapbox(shown, lat=lat, lon=lon, color=color, size=size, **kwargs)
+    if len(shown) < len(df):
+        fig.add_annotation(text=_shown_note(len(shown), len(df), int(keep_fatal(df).sum())),
+                           xref="paper", yref="paper", x=0.01, y=0.99, showarrow=False, bgcolor="white")
+    return fig
+
+
+def density_map(df, lat, lon, z=None, cell=GRID_DEG, **kwargs):
+    """px.density_mapbox over grid-cell totals instead of every crash."""
+    import plotly.express as px
+    cells = grid_density(df, lat, lon, z, cell)
+    return px.density_mapbox(cells, lat=lat, lon=lon, z=z or "count", **kwargs)
+
+
+# ---- Serialised figure cache ----
+class FigureCache:
+    """LRU of figure JSON keyed by chart and filter signature, bounded by entries and bytes."""
+
+    def __init__(self, max_entries=128, max_bytes=256e6):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._specs = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            if key in self._specs:
+                self._specs.move_to_end(key)
+                self.hits += 1
+                return self._specs[key]
+        spec = build()
+        with self._lock:
+            self.misses += 1
+            if key not in self._specs:
+                self._specs[key] = spec
+                self._bytes += self.size(spec)
+            while self._specs and (len(self._specs) > self.max_entries or self._bytes > self.max_bytes):
+                _, old = self._specs.popitem(last=False)
+                self._bytes -= self.size(old)
+        return spec
+
+    @staticmethod
+    def size(value):
+        return len(value)
+
+    def clear(self):
+        with self._lock:
+            self._specs.clear()
+            self._bytes = 0
+
+    def stats(self):
+        return {"entries": len(self._specs), "mb": round(self._bytes / 1e6, 1), "hits": self.hits, "misses": self.misses}
+
+
+FIGURES = FigureCache()
+
+
+def _to_json(fig):
+    return fig if isinstance(fig, str) else fig.to_json()
+
+
+def chart(key, build, stage, cache=FIGURES, **kwargs):
+    """st.plotly_chart for the figure (or figure JSON) `build()` returns, built once per `key`.
+
+    Build and render times and the payload size are recorded under `stage`
+    for the performance panel. Returns the payload size in bytes.
+    """
+    import streamlit as st
+    rec = recorder()
+    with rec.span(f"build:{stage}"):
+        spec = cache.get_or_build((stage, key), lambda: _to_json(build()))
+    rec.payload(f"render:{stage}", len(spec))
+    with rec.span(f"render:{stage}"):
+        st.plotly_chart(json.loads(spec), **kwargs)
+    return len(spec)
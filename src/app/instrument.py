@@ -0,0 +1,271 @@
+import collections
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# Stage timings, memory and payload counters for the Streamlit portals.
+#
+# One Recorder per server process collects samples from every session, so the
+# admin panel shows p50/p95 per stage across all users. Spans are cheap
+# (two perf_counter calls and a deque append) and stay on in production.
+#
+#   rec = recorder()
+#   rec.begin_rerun("viz01")
+#   with rec.span("filter"):
+#       df = apply_filters(df_raw)
+#   plotly_chart(fig, "render:map", use_container_width=True)  # timed, payload sampled
+#   admin_panel()                                               # only with ?admin=1
+#   rec.end_rerun()
+#
+# PNBI_INSTRUMENT_LOG=path appends one JSON line per rerun for offline analysis.
+
+WINDOW = 2000          # samples kept per stage
+PROFILE_INTERVAL = 0.005
+PAYLOAD_SAMPLE_EVERY = 20   # plotly_chart serialises a figure for sizing on 1 in N renders per stage
+
+
+def rss_mb():
+    """Resident set size of this process in MB (peak RSS where /proc is missing)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+class Recorder:
+    def __init__(self, window=WINDOW, log_path=None):
+        self._lock = threading.Lock()
+        self._local = threading.local()    # Streamlit runs each session's script on its own thread
+        self.window = window
+        self.stages = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self.payloads = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self._payload_calls = collections.Counter()
+        self._last_payload = {}
+        self.reruns = collections.deque(maxlen=window)
+        self.log_path = log_path or os.environ.get("PNBI_INSTRUMENT_LOG")
+
+    # ---- Spans ----
+    @contextmanager
+    def span(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def timed(self, stage):
+        """Decorator form of span()."""
+        def wrap(func):
+            def inner(*args, **kwargs):
+                with self.span(stage):
+                    return func(*args, **kwargs)
+            return functools.wraps(func)(inner)
+        return wrap
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.stages[stage].append(seconds)
+        current = getattr(self._local, "rerun", None)
+        if current is not None:
+            current["stages"][stage] = current["stages"].get(stage, 0.0) + seconds
+
+    def payload(self, stage, nbytes, sampled=True):
+        with self._lock:
+            if sampled:
+                self.payloads[stage].append(nbytes)
+        current = getattr(self._local, "rerun", None)
+        if current is not None:
+            current["payload_bytes"] += nbytes
+
+    def sampled_payload(self, stage, measure, every=PAYLOAD_SAMPLE_EVERY):
+        """Count a payload, calling the (costly) `measure()` only on the first and every `every`-th call.
+
+        Calls in between add the last measured size to the rerun total.
+        """
+        with self._lock:
+            due = self._payload_calls[stage] % every == 0 or stage not in self._last_payload
+            self._payload_calls[stage] += 1
+        if due:
+            self._last_payload[stage] = measure()
+        self.payload(stage, self._last_payload[stage], sampled=due)
+
+    # ---- Reruns ----
+    def begin_rerun(self, app):
+        self._local.rerun = {"app": app, "start": time.time(), "t0": time.perf_counter(),
+                             "rss_start_mb": rss_mb(), "payload_bytes": 0, "stages": {}}
+
+    def end_rerun(self):
+        """Close the current rerun; returns its record (None if none was open)."""
+        current = getattr(self._local, "rerun", None)
+        if current is None:
+            return None
+        self._local.rerun = None
+        current["seconds"] = time.perf_counter() - current.pop("t0")
+        current["rss_mb"] = rss_mb()
+        current["rss_delta_mb"] = current["rss_mb"] - current["rss_start_mb"]
+        with self._lock:
+            self.stages[f"rerun:{current['app']}"].append(current["seconds"])
+            self.reruns.append(current)
+        if self.log_path:
+            with open(self.log_path, "a") as f:
+                f.write(json.dumps(current) + "\n")
+        return current
+
+    def current(self):
+        return getattr(self._local, "rerun", None)
+
+    # ---- Reports ----
+    def summary(self):
+        """p50/p95/max per stage (ms) plus median payload, over every session's samples."""
+        with self._lock:
+            stages = {k: np.array(v) for k, v in self.stages.items()}
+            payloads = {k: np.median(v) for k, v in self.payloads.items()}
+        rows = [{"stage": stage, "n": len(t), "p50_ms": np.percentile(t, 50) * 1e3,
+                 "p95_ms": np.percentile(t, 95) * 1e3, "max_ms": t.max() * 1e3,
+                 "payload_kb": payloads.get(stage, np.nan) / 1e3}
+                for stage, t in stages.items() if len(t)]
+        columns = ["stage", "n", "p50_ms", "p95_ms", "max_ms", "payload_kb"]
+        return pd.DataFrame(rows, columns=columns).sort_values("p95_ms", ascending=False, ignore_index=True)
+
+    def rerun_log(self):
+        with self._lock:
+            return pd.json_normalize(list(self.reruns))
+
+
+_recorder = Recorder()
+
+
+def recorder():
+    """The process-wide Recorder (module state outlives Streamlit reruns)."""
+    return _recorder
+
+
+def span(stage):
+    return _recorder.span(stage)
+
+
+def timed(stage):
+    return _recorder.timed(stage)
+
+
+# ---- Sampling profiler ----
+class SamplingProfiler:
+    """Samples one thread's Python stack every `interval` seconds (stdlib only).
+
+    Much cheaper than cProfile on pandas-heavy code, so it can be switched on
+    for a single rerun of a live portal.
+    """
+
+    def __init__(self, thread_id=None, interval=PROFILE_INTERVAL):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.own = collections.Counter()     # innermost frame
+        self.total = collections.Counter()   # anywhere on the stack
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            self.own[_where(frame)] += 1
+            seen = set()
+            while frame is not None:
+                seen.add(_where(frame))
+                frame = frame.f_back
+            self.total.update(seen)
+
+    def top(self, n=25):
+        """Functions by share of samples: own (innermost frame) and total (on the stack)."""
+        if not self.samples:
+            return pd.DataFrame(columns=["function", "own_pct", "total_pct"])
+        rows = [{"function": where, "own_pct": 100 * self.own[where] / self.samples,
+                 "total_pct": 100 * count / self.samples} for where, count in self.total.items()]
+        return pd.DataFrame(rows).sort_values(["own_pct", "total_pct"], ascending=False).head(n)
+
+
+def _where(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+# ---- Streamlit helpers ----
+def plotly_chart(fig, stage, **kwargs):
+    """st.plotly_chart with the render timed under `stage` and its JSON size counted.
+
+    The size takes an extra serialisation, so it is sampled and kept out of the span.
+    """
+    import streamlit as st
+    _recorder.sampled_payload(stage, lambda: len(fig.to_json()))
+    with _recorder.span(stage):
+        return st.plotly_chart(fig, **kwargs)
+
+
+def is_admin():
+    import streamlit as st
+    return st.query_params.get("admin") == "1"
+
+
+def start_profiling():
+    """Start the sampling profiler for this rerun if the admin panel toggle is on."""
+    import streamlit as st
+    if is_admin() and st.session_state.get("_profile_rerun"):
+        st.session_state["_profiler"] = SamplingProfiler().start()
+
+
+def admin_panel(extra=None):
+    """Hidden performance panel in the sidebar, shown only with ?admin=1 in the URL.
+
+    `extra` maps labels to small dicts (e.g. cache statistics) shown under the table.
+    """
+    if not is_admin():
+        return
+    import streamlit as st
+    profiler = st.session_state.pop("_profiler", None)
+    if profiler is not None:
+        st.session_state["_profile_top"] = profiler.stop().top()
+
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        summary = _recorder.summary()
+        st.dataframe(summary, hide_index=True, use_container_width=True,
+                     column_config={c: st.column_config.NumberColumn(format="%.1f")
+                                    for c in ["p50_ms", "p95_ms", "max_ms", "payload_kb"]})
+        current = _recorder.current()
+        if current is not None:
+            st.caption(f"This rerun so far: {time.perf_counter() - current['t0']:.2f}s, "
+                       f"RSS {rss_mb():,.0f} MB ({rss_mb() - current['rss_start_mb']:+.1f}), "
+                       f"payload {current['payload_bytes'] / 1e3:,.0f} KB")
+        for label, values in (extra or {}).items():
+            st.caption(f"{label}: " + ", ".join(f"{k} {v:,}" for k, v in values.items()))
+        st.toggle("Sample-profile reruns", key="_profile_rerun")
+        if "_profile_top" in st.session_state:
+            st.dataframe(st.session_state["_profile_top"], hide_index=True, use_container_width=True)
+        st.download_button("Export stage summary (CSV)", summary.to_csv(index=False),
+                           file_name="stage_summary.csv", mime="text/csv")
+        st.download_button("Export rerun log (JSONL)",
+                           "\n".join(json.dumps(r) for r in list(_recorder.reruns)),
+                           file_name="reruns.jsonl", mime="application/json")
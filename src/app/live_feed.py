@@ -0,0 +1,130 @@
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from app.crash_data import COST_COL, derive_columns
+from app.instrument import timed
+
+# Local change stream for the portals.
+#
+# New crash records dropped as CSV files into a watched folder are parsed on a
+# background thread and folded into an in-memory frame plus running KPI
+# totals. Every fold bumps `version`, so sessions can tell when something new
+# arrived and only rerun the parts of the page that depend on it.
+#
+#   feed = LiveFeed(df_raw, "data/incoming")
+#   feed.start()
+#   version, frame = feed.snapshot()
+
+KPI_COLUMNS = ['death_cnt', 'sus_serious_injry_cnt', 'pedestrian_death_count',
+               'bicycle_death_count', 'motorcycle_death_count', COST_COL]
+
+
+class LiveFeed:
+    def __init__(self, base, drop_dir, poll_seconds=2.0, key="ID", store=None):
+        self.drop_dir = Path(drop_dir)
+        self.done_dir = self.drop_dir / "processed"
+        self.poll_seconds = poll_seconds
+        self.key = key
+        self.store = store                      # optional AustinStore to persist deltas
+        self._lock = threading.Lock()
+        self._frame = base
+        self._stop = threading.Event()
+        self._thread = None
+        self.version = 0
+        self.last_update = None
+        self.recent = []                        # (time, file, rows) of the last folds
+        self._failed = set()                    # (name, mtime) of files that could not be moved aside
+        self.totals = self._kpis(base)
+
+    @staticmethod
+    def _kpis(df):
+        totals = {c: float(pd.to_numeric(df[c], errors='coerce').sum()) for c in KPI_COLUMNS if c in df.columns}
+        totals['crashes'] = len(df)
+        return totals
+
+    # ---- Background watcher ----
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self.drop_dir.mkdir(parents=True, exist_ok=True)
+            self._thread = threading.Thread(target=self._watch, name="live-feed", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self):
+        while not self._stop.is_set():
+            for path in self._ready_files():
+                try:
+                    self.ingest(pd.read_csv(path, low_memory=False), source=path.name)
+                    self.done_dir.mkdir(exist_ok=True)
+                    shutil.move(str(path), self.done_dir / path.name)
+                except Exception as exc:  # keep watching; leave the file for inspection
+                    self._note(f"{path.name}: {exc}")
+                    self._set_aside(path)
+            self._stop.wait(self.poll_seconds)
+
+    def _ready_files(self):
+        """CSV files nobody has written to for a poll interval, oldest first."""
+        ready = []
+        for path in self.drop_dir.glob("*.csv"):
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:   # moved away since the listing
+                continue
+            if time.time() - mtime >= self.poll_seconds and (path.name, mtime) not in self._failed:
+                ready.append((mtime, path))
+        return [path for _, path in sorted(ready)]
+
+    def _set_aside(self, path):
+        try:
+            path.rename(path.with_suffix(".error"))
+        except OSError as exc:   # already moved, or an earlier .error is in the way
+            self._note(f"{path.name}: not renamed to .error ({exc})")
+            try:
+                self._failed.add((path.name, path.stat().st_mtime))   # do not retry it every poll
+            except OSError:
+                pass
+
+    def _note(self, message):
+        with self._lock:
+            self.recent = (self.recent + [(time.time(), message, 0)])[-20:]
+
+    # ---- Folding ----
+    @timed("live:ingest")
+    def ingest(self, records, source="manual"):
+        """Derive columns for the new records and fold them into the frame."""
+        if self.store is not None:
+            self.store.upsert(records.copy())
+        new = derive_columns(records.copy()).dropna(subset=['latitude', 'longitude'])
+        deleted = new['Is deleted'].astype(str).str.upper().eq('TRUE') if 'Is deleted' in new.columns else None
+
+        with self._lock:
+            frame = self._frame
+            if self.key in new.columns and self.key in frame.columns:
+                # Updated records replace their earlier version
+                replaced = frame[self.key].isin(new[self.key])
+                self._apply_totals(frame[replaced], sign=-1)
+                frame = frame[~replaced]
+            if deleted is not None:
+                new = new[~deleted]
+            self._apply_totals(new, sign=1)
+            self._frame = pd.concat([frame, new], ignore_index=True)
+            self.version += 1
+            self.last_update = time.time()
+            self.recent = (self.recent + [(self.last_update, source, len(new))])[-20:]
+        return len(new)
+
+    def _apply_totals(self, rows, sign):
+        for name, value in self._kpis(rows).items():
+            self.totals[name] = self.totals.get(name, 0) + sign * value
+
+    def snapshot(self):
+        """(version, frame); the frame is never mutated after being handed out."""
+        with self._lock:
+            return self.version, self._frame
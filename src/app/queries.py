@@ -0,0 +1,114 @@
+import pickle as pkl
+
+import numpy as np
+import pandas as pd
+
+from app.crash_data import COST_COL
+from app.figures import density_map, scatter_map
+from ml.features import cost_xy
+from pipeline.append import cube_of
+from pipeline.lazy import lazy_import
+
+cluster = lazy_import("sklearn.cluster")
+
+# Portal computations as plain functions of (frame, parameters).
+#
+# The portals call these in-process; app/workers.py runs the same functions in
+# worker processes, looked up by name in QUERIES, so results do not depend on
+# where they were computed.
+
+AUSTIN_CENTER = dict(lat=30.2672, lon=-97.7431)
+
+
+def filter_crashes(df, years, street, hour_range, severities):
+    """viz01 sidebar filters."""
+    df = df[df['Year'].isin(years)]
+    if street != "All Streets":
+        df = df[df['rpt_street_name'] == street]
+    return df[(df['Severity_Label'].isin(severities)) & (df['HOUR'].between(hour_range[0], hour_range[1]))]
+
+
+def dashboard_state(df):
+    """KPIs and aggregates for one filter selection (everything viz01 shows except the map)."""
+    kpis = {
+        'crashes': len(df),
+        'pedestrian': int(df['pedestrian_death_count'].sum()),
+        'bicycle': int(df['bicycle_death_count'].sum()),
+        'motorcycle': int(df['motorcycle_death_count'].sum()),
+        'cost': float(df[COST_COL].sum()),
+    }
+    cost_sev = df.groupby('Severity_Label')[COST_COL].sum().reset_index()
+
+    street_df = df[~df['rpt_street_name'].str.contains("NOT REPORTED|UNKNOWN", case=False, na=True)]
+    # Dynamic check for ID field (common change in cleansed files)
+    id_col = 'ID' if 'ID' in street_df.columns else street_df.columns[0]
+    risk_index = street_df.groupby('rpt_street_name').agg({
+        id_col: 'count', 'death_cnt': 'sum', 'sus_serious_injry_cnt': 'sum', COST_COL: 'sum'
+    }).reset_index()
+    risk_index.columns = ['Street Name', 'Total Incidents', 'Death Count', 'Serious Injuries', 'Total Comprehensive Cost']
+    risk_index = risk_index.nlargest(10, 'Total Incidents')
+
+    vru_counts = pd.DataFrame({
+        'User Type': ['Pedestrian', 'Bicycle', 'Motorcycle'],
+        'Fatalities': [kpis['pedestrian'], kpis['bicycle'], kpis['motorcycle']]
+    })
+    return {'kpis': kpis, 'cost_sev': cost_sev, 'risk_index': risk_index, 'vru_counts': vru_counts}
+
+
+def map_figure(df, view_mode):
+    """viz01 GIS tab: binned cost heatmap or sampled incident markers."""
+    if view_mode == "Heatmap":
+        fig = density_map(df, lat='latitude', lon='longitude', z=COST_COL, radius=10,
+                          center=AUSTIN_CENTER, zoom=10, mapbox_style="carto-darkmatter")
+    else:
+        fig = scatter_map(df, lat='latitude', lon='longitude', color='Severity_Label', size='map_size',
+                          size_max=12, center=AUSTIN_CENTER, zoom=10, mapbox_style="carto-positron")
+    fig.update_layout(margin={"r": 0, "t": 0, "l": 0, "b": 0}, height=600)
+    return fig
+
+
+def hotspots(df, k=5):
+    """KMeans crash hotspots: centroid, crash count and cost per cluster."""
+    geo = df[['latitude', 'longitude']].dropna()
+    if len(geo) < k:
+        return pd.DataFrame(columns=['latitude', 'longitude', 'crashes', 'cost'])
+    km = cluster.KMeans(n_clusters=k, random_state=42, n_init=10).fit(geo)
+    labels = pd.Series(km.labels_, index=geo.index)
+    out = pd.DataFrame(km.cluster_centers_, columns=['latitude', 'longitude'])
+    out['crashes'] = np.bincount(km.labels_, minlength=k)
+    out['cost'] = df.loc[geo.index, COST_COL].groupby(labels).sum().reindex(range(k), fill_value=0).to_numpy()
+    return out
+
+
+_models = {}
+
+
+def load_model(path):
+    """Unpickle a model once per process."""
+    if path not in _models:
+        with open(path, "rb") as f:
+            _models[path] = pkl.load(f)
+    return _models[path]
+
+
+def predict_cost(df, model_path):
+    """Predicted comprehensive cost for every row the cost model can score."""
+    X, _ = cost_xy(df.assign(**{COST_COL: df[COST_COL].fillna(0)}))
+    return pd.Series(load_model(str(model_path)).predict(X), index=X.index, name='predicted_cost')
+
+
+# name -> function(frame, **params); filters are applied before the query runs
+QUERIES = {
+    "filter": lambda df: df,
+    "state": dashboard_state,
+    "map": lambda df, view_mode: map_figure(df, view_mode).to_json(),
+    "hotspots": hotspots,
+    "cube": cube_of,
+    "predict_cost": predict_cost,
+}
+
+
+def run_query(df, name, filters=None, **params):
+    if filters:
+        df = filter_crashes(df, **filters)
+    return QUERIES[name](df, **params)
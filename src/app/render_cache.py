@@ -0,0 +1,75 @@
+import pandas as pd
+
+from app.figures import FigureCache
+
+# Cross-session cache of dashboard render state.
+#
+# Many sessions open the portal on the same selection (last two years, all
+# streets, full day). The KPIs, aggregates and figure specs for a selection
+# are stored once per server process under its normalised filter signature
+# and dataset version, and reused by every session on that version. Entries
+# for all but the KEEP_VERSIONS most recently seen versions are dropped.
+#
+#   cache = RenderCache().at_version(feed.version)   # view bound to this session's version
+#   key = filter_signature(years, street, hour_range, severities)
+#   state = cache.get_or_build(("state", key), lambda: compute_state(apply_filters(frame)))
+#   chart(key, build_map, "markers", cache=cache)
+
+
+def filter_signature(years, street, hour_range, severities, **extra):
+    """Hashable, order-independent form of a filter selection."""
+    return (tuple(sorted(int(y) for y in years)), street, (int(hour_range[0]), int(hour_range[1])),
+            tuple(sorted(map(str, severities))), *sorted(extra.items()))
+
+
+KEEP_VERSIONS = 2
+
+
+class RenderCache(FigureCache):
+    """LRU of render state (frames, dicts, figure JSON) keyed by dataset version and filter signature."""
+
+    def __init__(self, max_entries=256, max_bytes=512e6, keep_versions=KEEP_VERSIONS):
+        super().__init__(max_entries, max_bytes)
+        self.keep_versions = keep_versions
+        self.versions = []      # most recent last
+
+    def at_version(self, version):
+        """A view of the cache bound to `version`; a new version evicts the oldest one's entries."""
+        with self._lock:
+            if version not in self.versions:
+                self.versions.append(version)
+                stale = self.versions[:-self.keep_versions]
+                del self.versions[:-self.keep_versions]
+                for key in [k for k in self._specs if k[0] in stale]:
+                    self._bytes -= self.size(self._specs.pop(key))
+        return VersionView(self, version)
+
+    def get_or_build(self, key, build, version=None):
+        # Keyed on the caller's version, so a session still on older data never sees newer results
+        return super().get_or_build((version, key), build)
+
+    @staticmethod
+    def size(value):
+        if isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(deep=True).sum())
+        if isinstance(value, pd.Series):
+            return int(value.memory_usage(deep=True))
+        if isinstance(value, dict):
+            return sum(RenderCache.size(v) for v in value.values())
+        if isinstance(value, (str, bytes)):
+            return len(value)
+        return 64
+
+
+class VersionView:
+    """RenderCache access for one session's dataset version."""
+
+    def __init__(self, cache, version):
+        self.cache = cache
+        self.version = version
+
+    def get_or_build(self, key, build):
+        return self.cache.get_or_build(key, build, self.version)
+
+    def stats(self):
+        return self.cache.stats()
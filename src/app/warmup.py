@@ -0,0 +1,90 @@
+import hashlib
+import importlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from pipeline.paths import CACHE_DIR
+
+# Background warm-up for the Streamlit portals.
+#
+# A page registers its slow start-up work (reading the CSV, deriving columns,
+# building indexes, importing sklearn) with one Warmup per server process.
+# Tasks run in order on a background thread, so the first request only waits
+# for the task it actually needs. A small summary of the dataset is kept on
+# disk so the first page can be drawn from it while the full frame loads.
+#
+#   @st.cache_resource
+#   def warmup():
+#       return Warmup().submit("data", load_data).submit("ml", preload_imports, "sklearn.ensemble")
+#
+#   if warmup().ready("data"): df = warmup().get("data")
+
+
+class Warmup:
+    def __init__(self):
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="warmup")
+        self._futures = {}
+        self.timings = {}
+
+    def submit(self, name, func, *args, **kwargs):
+        """Queue a task; tasks run one after another in submission order."""
+        def timed():
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.timings[name] = time.perf_counter() - start
+        self._futures[name] = self._pool.submit(timed)
+        return self
+
+    def ready(self, name):
+        return name in self._futures and self._futures[name].done()
+
+    def get(self, name, timeout=None):
+        """Result of a task, waiting for it if needed (re-raises its exception)."""
+        return self._futures[name].result(timeout)
+
+    def status(self):
+        return {name: ("ready" if f.done() else "running" if f.running() else "queued")
+                for name, f in self._futures.items()}
+
+
+_import_lock = threading.Lock()
+
+
+def preload_imports(*modules):
+    """Import heavy modules ahead of use; later imports just hit sys.modules."""
+    with _import_lock:
+        for module in modules:
+            importlib.import_module(module)
+
+
+# ---- Summary cache ----
+def _summary_path(source, name):
+    source = Path(source).resolve()
+    tag = hashlib.sha1(str(source).encode()).hexdigest()[:10]
+    return CACHE_DIR / f"{source.stem}.{name}.{tag}.pkl"
+
+
+def _stamp(source):
+    st = Path(source).stat()
+    return st.st_size, st.st_mtime_ns
+
+
+def load_summary(source, name="summary"):
+    """Cached summary for `source`, or None if missing or the file changed since."""
+    path = _summary_path(source, name)
+    if not path.exists() or not Path(source).exists():
+        return None
+    cached = pd.read_pickle(path)
+    return cached["summary"] if cached["stamp"] == _stamp(source) else None
+
+
+def save_summary(source, summary, name="summary"):
+    path = _summary_path(source, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pd.to_pickle({"stamp": _stamp(source), "summary": summary}, path)
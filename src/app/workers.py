@@ -0,0 +1,210 @@
+import argparse
+import hashlib
+import multiprocessing
+import os
+import pickle as pkl
+import shutil
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]  # repo root
+sys.path.insert(0, str(ROOT / "src"))
+
+from app.queries import QUERIES, run_query
+from pipeline.paths import CACHE_DIR
+
+# Multi-process serving for the portals.
+#
+# A Streamlit server runs every session's script on threads of one process, so
+# concurrent users queue on the GIL while filtering, aggregating and
+# clustering. With PNBI_WORKERS=N the heavy queries (app/queries.py) run on N
+# worker processes instead. Each worker loads a pickled snapshot of the
+# prepared frame once. Results go to a file cache under data/.cache/queries,
+# keyed on (query, parameters, data version), that every app process and
+# worker reuses.
+#
+#   pool = QueryPool(CSV_PATH, frame=df_raw, processes=4)
+#   state = pool.query("state", filters={"years": [2025], "street": "All Streets", ...})
+#
+#   python src/app/workers.py data.csv --workers 4 --users 16      # throughput vs in-process
+
+QUERY_CACHE_DIR = CACHE_DIR / "queries"
+MAX_CACHE_BYTES = 2e9
+
+
+def data_version(source):
+    st = Path(source).stat()
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+
+def query_key(name, version, filters, params):
+    """Stable digest of a query; filter lists are order-independent."""
+    norm = {k: sorted(v) if isinstance(v, (list, tuple, set)) and k != "hour_range" else v
+            for k, v in (filters or {}).items()}
+    text = repr((name, version, sorted(norm.items()), sorted(params.items())))
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+# ---- Shared file cache ----
+class ResultCache:
+    """Pickled query results in one directory, shared by processes; oldest-used pruned first."""
+
+    def __init__(self, path=QUERY_CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+
+    def _file(self, key):
+        return self.path / f"{key}.pkl"
+
+    def get(self, key):
+        path = self._file(key)
+        try:
+            with open(path, "rb") as f:
+                result = pkl.load(f)
+            os.utime(path)    # mark as recently used
+        except (FileNotFoundError, EOFError, pkl.UnpicklingError):
+            # Missing, partial, or pruned/replaced by another worker since it was opened: a miss
+            return None
+        return result
+
+    def put(self, key, result):
+        self.path.mkdir(parents=True, exist_ok=True)
+        # Write then rename so readers in other processes never see a partial file
+        tmp = self.path / f"{key}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pkl.dump(result, f, protocol=pkl.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._file(key))
+        self._prune()
+
+    def _prune(self):
+        files = []
+        for p in self.path.glob("*.pkl"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:   # pruned by another worker since the listing
+                continue
+            files.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+# ---- Worker side ----
+_frame = None
+
+
+def _init_worker(snapshot):
+    global _frame
+    _frame = pd.read_pickle(snapshot)
+
+
+def _ping(_):
+    return os.getpid()
+
+
+def _run(name, filters, params, key, cache_dir):
+    result = run_query(_frame, name, filters, **params)
+    ResultCache(cache_dir).put(key, result)
+    return result
+
+
+# ---- App side ----
+class QueryPool:
+    def __init__(self, source, frame=None, processes=None, cache=None):
+        """`frame` is the prepared data read from `source`; it is snapshotted for the workers."""
+        self.version = data_version(source)
+        self.cache = cache or ResultCache()
+        snapshot = CACHE_DIR / f"{Path(source).stem}.{self.version}.frame.pkl"
+        if not snapshot.exists():
+            snapshot.parent.mkdir(parents=True, exist_ok=True)
+            tmp = snapshot.with_suffix(f".{os.getpid()}.tmp")
+            (frame if frame is not None else pd.read_csv(source, low_memory=False)).to_pickle(tmp)
+            os.replace(tmp, snapshot)
+        # spawn, not fork: the Streamlit server is multi-threaded
+        self.processes = processes or os.cpu_count()
+        self._pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=_init_worker, initargs=(str(snapshot),))
+
+    def warm(self):
+        """Start every worker (and load its snapshot) now rather than on the first queries."""
+        return len(set(self._pool.map(_ping, range(self.processes * 4))))
+
+    def submit(self, name, filters=None, **params):
+        """Future for a query result, served from the shared cache when another process already ran it."""
+        if name not in QUERIES:
+            raise KeyError(f"Unknown query {name!r}; expected one of {sorted(QUERIES)}")
+        key = query_key(name, self.version, filters, params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+            return future
+        return self._pool.submit(_run, name, filters, params, key, str(self.cache.path))
+
+    def query(self, name, filters=None, **params):
+        return self.submit(name, filters, **params).result()
+
+    def shutdown(self):
+        self._pool.shutdown(cancel_futures=True)
+
+
+# ---- Throughput check ----
+def _random_filters(frame, rng):
+    years = sorted(frame['Year'].dropna().unique().astype(int))
+    streets = frame['rpt_street_name'].value_counts().index[:50].tolist()
+    start = int(rng.integers(0, 20))
+    return {"years": years[-int(rng.integers(1, len(years) + 1)):],
+            "street": "All Streets" if rng.random() < 0.5 else streets[int(rng.integers(len(streets)))],
+            "hour_range": (start, int(rng.integers(start, 24))),
+            "severities": frame['Severity_Label'].dropna().unique().tolist()}
+
+
+def main(argv=None):
+    import numpy as np
+    from app.crash_data import derive_columns
+
+    parser = argparse.ArgumentParser(description="Compare in-process and worker-pool query throughput")
+    parser.add_argument("source", help="Austin crash CSV")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--users", type=int, default=16, help="concurrent sessions")
+    parser.add_argument("--queries", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    frame = derive_columns(pd.read_csv(args.source, low_memory=False)).dropna(subset=['latitude', 'longitude'])
+    rng = np.random.default_rng(0)
+    jobs = [("state", _random_filters(frame, rng)) for _ in range(args.queries)]
+    jobs += [("hotspots", f) for _, f in jobs[: args.queries // 4]]
+
+    with ThreadPoolExecutor(args.users) as users:
+        start = time.perf_counter()
+        list(users.map(lambda job: run_query(frame, job[0], job[1]), jobs))
+        threads = time.perf_counter() - start
+
+    cache = ResultCache(QUERY_CACHE_DIR / "throughput")
+    shutil.rmtree(cache.path, ignore_errors=True)
+    pool = QueryPool(args.source, frame=frame, processes=args.workers, cache=cache)
+    pool.warm()
+    with ThreadPoolExecutor(args.users) as users:
+        start = time.perf_counter()
+        list(users.map(lambda job: pool.query(job[0], job[1]), jobs))
+        workers = time.perf_counter() - start
+        start = time.perf_counter()
+        list(users.map(lambda job: pool.query(job[0], job[1]), jobs))
+        cached = time.perf_counter() - start
+    pool.shutdown()
+
+    print(f"{len(jobs)} queries from {args.users} concurrent sessions:")
+    print(f"  in-process threads   {threads:7.2f}s")
+    print(f"  {args.workers} worker processes  {workers:7.2f}s")
+    print(f"  shared cache hits    {cached:7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import argparse
+import importlib.util
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]  # repo root
+sys.path.insert(0, str(ROOT / "src"))
+
+from app.crash_data import COST_COL, derive_columns
+from app.figures import MAX_MAP_POINTS, scatter_map, stratified_sample
+from bench.synthetic import write_austin, write_fars
+from ml.backends import make_model
+from ml.features import BEST_RF_PARAMS, COST_FEATURES, TARGET, cost_xy
+from pipeline.append import cube_of
+from pipeline.cleanse import cleanse
+from pipeline.fars_join import TABLES as FARS_TABLES
+from pipeline.fars_join import FarsTables
+from pipeline.lazy import lazy_import, load_all
+from pipeline.paths import CACHE_DIR
+
+cluster = lazy_import("sklearn.cluster")
+
+# Timing and memory benchmarks for the dashboard and model hot paths on
+# synthetic data (src/bench/synthetic.py) at growing sizes.
+#
+# Each stage is timed (best of --repeats) and then run once more under
+# tracemalloc for its peak allocation. Results are compared with the stored
+# baselines in src/bench/baselines.json so regressions and scaling show up.
+# Before any timing, lazy modules (sklearn) and plotly are imported and every
+# stage runs once on WARMUP_ROWS rows, so no stage pays a one-off import or
+# first-call setup. Baselines record whether plotly was installed (the payload
+# stage measures real figure JSON only with it); runs in a different
+# environment are not compared.
+#
+#   python src/bench/run_bench.py                          # 10k and 100k rows
+#   python src/bench/run_bench.py --scales 1M 10M --repeats 1 --no-memory
+#   python src/bench/run_bench.py --save-baseline          # record the current numbers
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+BENCH_DIR = CACHE_DIR / "bench"
+SCALES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+REGRESSION_RATIO = 1.25
+WARMUP_ROWS = 1_000
+
+
+def environment():
+    """Installed optional packages that change what a stage measures."""
+    return {"plotly": importlib.util.find_spec("plotly") is not None}
+
+
+def preload():
+    """Import everything the stages would otherwise import on first use, then run each stage once."""
+    load_all()
+    if environment()["plotly"]:
+        import plotly.express  # noqa: F401
+    run_scale("warmup", WARMUP_ROWS, repeats=1, memory=False)
+
+
+# ---- Synthetic inputs (written once per scale, reused across runs) ----
+def austin_csv(n):
+    path = BENCH_DIR / f"austin_{n}.csv"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_austin(path, n)
+    return path
+
+
+def fars_dir(n):
+    folder = BENCH_DIR / f"fars_{n}"
+    if not (folder / FARS_TABLES["accident"]).exists():
+        write_fars(folder, n)
+    return folder
+
+
+# ---- Hot paths (the same operations the portals and scripts run) ----
+def filter_portal(df):
+    """viz01 filter block: last two years, daytime hours, one severity excluded."""
+    years = sorted(df["Year"].dropna().unique())[-2:]
+    out = df[df["Year"].isin(years)]
+    sev = [s for s in out["Severity_Label"].dropna().unique() if s != "Unknown"]
+    return out[(out["Severity_Label"].isin(sev)) & (out["HOUR"].between(7, 19))]
+
+
+def street_risk(df):
+    """viz01 street intelligence table."""
+    street_df = df[~df["rpt_street_name"].str.contains("NOT REPORTED|UNKNOWN", case=False, na=True)]
+    risk = street_df.groupby("rpt_street_name").agg({"ID": "count", "death_cnt": "sum",
+                                                     "sus_serious_injry_cnt": "sum", COST_COL: "sum"})
+    return risk.nlargest(10, "ID")
+
+
+def kmeans_hotspots(df):
+    geo = df[["latitude", "longitude"]].dropna()
+    return cluster.KMeans(n_clusters=5, random_state=42, n_init=10).fit_predict(geo)
+
+
+def marker_payload(df):
+    """Bytes the GIS tab's incident-marker map sends to the browser."""
+    try:
+        import plotly.express
+    except ImportError:
+        # Same arrays the scatter_mapbox trace would carry
+        cols = ["latitude", "longitude", "Severity_Label", "map_size"]
+        shown = stratified_sample(df, MAX_MAP_POINTS, strata="Severity_Label")
+        return len(shown[cols].to_json(orient="split", index=False))
+    fig = scatter_map(df, lat="latitude", lon="longitude", color="Severity_Label",
+                      size="map_size", size_max=12, zoom=10)
+    return len(fig.to_json())
+
+
+def fars_filter(df):
+    """geo_spatial.py contiguous-US filter."""
+    lat = pd.to_numeric(df["LATITUDE"], errors="coerce")
+    lon = pd.to_numeric(df["LONGITUD"], errors="coerce")
+    return df[(lat < 50) & (lat > 24) & (lon > -125) & (lon < -66)]
+
+
+def fars_density(df):
+    """Fatality-weighted density grid (the data behind the hexbin heatmaps)."""
+    return np.histogram2d(df["LONGITUD"], df["LATITUDE"], bins=80, weights=df["FATALS"])
+
+
+# name -> (input key, function, output key)
+AUSTIN_STAGES = [
+    ("parse", "csv", lambda path: pd.read_csv(path, low_memory=False), "raw"),
+    ("derive", "raw", lambda df: derive_columns(df.copy()).dropna(subset=["latitude", "longitude"]), "derived"),
+    ("filter", "derived", filter_portal, "filtered"),
+    ("aggregate", "derived", lambda df: (street_risk(df), cube_of(df)), None),
+    ("cluster", "filtered", kmeans_hotspots, None),
+    ("features", "raw", lambda df: cost_xy(cleanse(df.copy(), dropna_subset=COST_FEATURES + [TARGET])), "xy"),
+    ("train", "xy", lambda xy: make_model("regressor", random_state=42, **BEST_RF_PARAMS).fit(*xy), "model"),
+    ("predict", "model+xy", lambda model, xy: model.predict(xy[0]), None),
+    ("payload", "filtered", marker_payload, "payload_bytes"),
+]
+FARS_STAGES = [
+    ("fars_parse", "fars_accident", lambda path: pd.read_csv(path, sep="|", low_memory=False), "accident"),
+    ("fars_filter", "accident", fars_filter, "valid"),
+    ("fars_aggregate", "valid", fars_density, None),
+    ("fars_join", "tables", lambda tables: tables.vehicle_view(), None),
+]
+
+
+def measure(func, args, repeats, memory):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func(*args)
+        times.append(time.perf_counter() - start)
+    peak = float("nan")
+    if memory:
+        tracemalloc.start()
+        func(*args)
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return result, min(times), peak
+
+
+def run_scale(label, n, repeats=3, memory=True, only=None):
+    ctx = {"csv": austin_csv(n)}
+    folder = fars_dir(n)
+    ctx["fars_accident"] = folder / FARS_TABLES["accident"]
+    rows = []
+    for name, key, func, out in AUSTIN_STAGES + FARS_STAGES:
+        if name == "fars_join":
+            ctx["tables"] = FarsTables.from_csv(folder)
+        args = [ctx["model"], ctx["xy"]] if key == "model+xy" else [ctx[key]]
+        wanted = only is None or name in only
+        result, seconds, peak = measure(func, args, repeats if wanted else 1, memory and wanted)
+        if out:
+            ctx[out] = result
+        if wanted:
+            rows.append({"scale": label, "stage": name, "rows": n, "seconds": seconds, "peak_mb": peak,
+                         "payload_mb": result / 1e6 if name == "payload" else float("nan")})
+    return rows
+
+
+# ---- Baselines ----
+def load_baselines(path=BASELINES_PATH):
+    if not Path(path).exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baselines(results, path=BASELINES_PATH):
+    baselines = load_baselines(path)
+    if baselines.get("environment", environment()) != environment():
+        baselines = {}   # numbers from another environment would not be comparable
+    baselines["environment"] = environment()
+    for row in results.to_dict("records"):
+        baselines.setdefault(row["scale"], {})[row["stage"]] = {
+            k: (None if pd.isna(row[k]) else round(row[k], 4)) for k in ("seconds", "peak_mb", "payload_mb")}
+    with open(path, "w") as f:
+        json.dump(baselines, f, indent=1, sort_keys=True)
+
+
+def compare(results, baselines, threshold=REGRESSION_RATIO):
+    base = results.apply(lambda r: baselines.get(r["scale"], {}).get(r["stage"], {}).get("seconds"), axis=1)
+    results = results.assign(baseline_s=pd.to_numeric(base, errors="coerce"))
+    results["vs_baseline"] = results["seconds"] / results["baseline_s"]
+    # Ignore jitter on stages that take a few milliseconds
+    results["regressed"] = (results["vs_baseline"] > threshold) & (results["seconds"] - results["baseline_s"] > 0.01)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the loaders, filters, aggregations and models")
+    parser.add_argument("--scales", nargs="+", default=["10k", "100k"], choices=list(SCALES))
+    parser.add_argument("--only", nargs="+", help="stages to report (others still run to build inputs)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_RATIO, help="slowdown ratio flagged as regression")
+    parser.add_argument("--out", help="optional CSV for the results table")
+    args = parser.parse_args(argv)
+
+    baselines = load_baselines()
+    recorded = baselines.pop("environment", None)
+    if baselines and recorded != environment() and not args.save_baseline:
+        print(f"Baselines were recorded with {recorded}, this environment has {environment()}; "
+              "re-record them with --save-baseline instead of comparing")
+        return 2
+
+    preload()
+    rows = []
+    for label in args.scales:
+        rows += run_scale(label, SCALES[label], args.repeats, not args.no_memory, args.only)
+    results = compare(pd.DataFrame(rows), baselines, args.threshold)
+
+    with pd.option_context("display.width", 200, "display.float_format", "{:,.3f}".format):
+        print(results.to_string(index=False))
+    if args.out:
+        results.to_csv(args.out, index=False)
+    if args.save_baseline:
+        save_baselines(results)
+        print(f"Baselines saved to {BASELINES_PATH}")
+    elif results["regressed"].any():
+        print(f"Slower than baseline (>{args.threshold:.2f}x): {', '.join(results.loc[results['regressed'], 'stage'])}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,444 @@
+import argparse
+import csv
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]  # repo root
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "data"))
+
+from clean_data_csvs import datasets as FARS_DATASETS
+
+# Synthetic crash records with the same columns as the real exports, for
+# benchmarking and scale testing at sizes the sample files don't reach.
+# Distributions (severity mix, speed limits, unit combinations, cost levels)
+# follow atx_crash_2025.csv; crashes cluster along streets (Austin) or around
+# cities (FARS). Everything is generated column-wise with numpy, in chunks, so
+# files of any size are written with bounded memory.
+#
+#   python src/bench/synthetic.py austin --rows 10M --out atx_synthetic.csv
+#   python src/bench/synthetic.py fars --rows 2M --out data/synthetic/fars               # cleaned tables
+#   python src/bench/synthetic.py fars --rows 2M --layout raw --malformed 0.001 --out raw/  # yearly extracts
+#
+#   austin_frame(100_000)            # Austin open-data export schema, in memory
+#   fars_frames(100_000)             # {"accident", "vehicle", "person", "factor", "cevent"}
+
+AUSTIN_CENTER = (30.29, -97.74)
+
+# crash_sev_id as coded in the export: 4 fatal, 1 suspected serious injury,
+# 2 non-incapacitating, 3 possible, 5 not injured, 0 unknown
+SEVERITY_P = {5: 0.475, 2: 0.230, 3: 0.191, 0: 0.073, 1: 0.023, 4: 0.008}
+MAX_COST = {0: 20_000, 1: 3_000_000, 2: 250_000, 3: 200_000, 4: 3_500_000, 5: 20_000}
+SPEED_P = {35: 0.17, 45: 0.16, 65: 0.14, 55: 0.09, -1: 0.08, 60: 0.08, 30: 0.08, 40: 0.07,
+           50: 0.05, 25: 0.03, 70: 0.03, 20: 0.02}
+UNITS_P = {
+    "Passenger car": 0.40, "Large passenger vehicle & Passenger car": 0.29, "Large passenger vehicle": 0.14,
+    "Motor vehicle – other & Passenger car": 0.04, "Large passenger vehicle & Motor vehicle – other": 0.02,
+    "Passenger car & Pedestrian": 0.03, "Bicycle & Passenger car": 0.02, "Motorcycle & Passenger car": 0.03,
+    "Large passenger vehicle & Other/Unknown & Passenger car": 0.01, "E-scooter & Passenger car": 0.01,
+    "Micromobility device & Passenger car": 0.01,
+}
+# Which death/serious-injury column a casualty goes to, by the vulnerable unit in the crash
+MODE_COLUMNS = {"Pedestrian": "pedestrian", "Bicycle": "bicycle", "Motorcycle": "motorcycle",
+                "E-scooter": "micromobility", "Micromobility device": "micromobility"}
+STREET_SUFFIXES = ["HWY", "BLVD", "RD", "ST", "LN", "DR", "EXPY", "AVE", "PKWY"]
+HOUR_PROFILE = np.array([2.2, 1.9, 2.3, 1.5, 1.0, 1.2, 2.2, 3.9, 4.6, 3.6, 3.5, 4.1,
+                         4.7, 4.8, 5.1, 5.9, 6.5, 7.2, 6.4, 5.1, 4.5, 4.1, 3.6, 3.0])
+
+AUSTIN_COLUMNS = [
+    "ID", "Crash ID", "crash_fatal_fl", "case_id", "rpt_block_num", "rpt_street_name", "rpt_street_sfx",
+    "crash_speed_limit", "road_constr_zone_fl", "latitude", "longitude", "crash_sev_id",
+    "sus_serious_injry_cnt", "nonincap_injry_cnt", "poss_injry_cnt", "non_injry_cnt", "unkn_injry_cnt",
+    "tot_injry_cnt", "death_cnt", "units_involved", "point",
+    "motor_vehicle_death_count", "motor_vehicle_serious_injury_count", "bicycle_death_count",
+    "bicycle_serious_injury_count", "pedestrian_death_count", "pedestrian_serious_injury_count",
+    "motorcycle_death_count", "motorcycle_serious_injury_count", "other_death_count",
+    "other_serious_injury_count", "onsys_fl", "private_dr_fl", "micromobility_serious_injury_count",
+    "micromobility_death_count", "Crash timestamp (US/Central)", "Crash_year", "Crash timestamp",
+    "Is deleted", "Is temporary record", "Law enforcement fatality count", "Reported street prefix",
+    "Estimated Maximum Comprehensive Cost", "Estimated Total Comprehensive Cost", "Location ID",
+    "Location group", "Address",
+]
+
+
+def _choice(rng, table, n):
+    values = np.array(list(table))
+    p = np.array(list(table.values()), dtype=float)
+    return values[rng.choice(len(values), size=n, p=p / p.sum())]
+
+
+def _zipf_index(rng, n_items, n, a=1.1):
+    """Indices 0..n_items-1 with a few heavy hitters, like crash counts per street."""
+    p = 1.0 / np.arange(1, n_items + 1) ** a
+    return rng.choice(n_items, size=n, p=p / p.sum())
+
+
+def _format_minutes(minutes, days):
+    """'m/d/yyyy H:MM' strings (the export's format) for minutes since days[0],
+    built from lookup tables instead of per-row strftime."""
+    day_str = np.array([f"{d.month}/{d.day}/{d.year}" for d in days], dtype=object)
+    hm_str = np.array([f"{h}:{m:02d}" for h in range(24) for m in range(60)], dtype=object)
+    return day_str[minutes // 1440] + " " + hm_str[minutes % 1440]
+
+
+def _timestamps(rng, n, years):
+    """Local and UTC (CST + 6h) timestamp strings plus the local year."""
+    days = pd.date_range(f"{years[0]}-01-01", f"{years[1] + 1}-01-01", freq="D")
+    day = rng.integers(0, len(days) - 1, n)
+    hour = rng.choice(24, size=n, p=HOUR_PROFILE / HOUR_PROFILE.sum())
+    local_min = day * 1440 + hour * 60 + rng.integers(0, 60, n)
+    return _format_minutes(local_min, days), _format_minutes(local_min + 360, days), days.year.to_numpy()[day]
+
+
+def austin_frame(n, seed=0, years=(2018, 2025), n_streets=2000, id_offset=0, layout_seed=0):
+    """n synthetic rows in the Austin crash export schema.
+
+    The street network depends only on layout_seed, so chunks generated with
+    different seeds (and id_offsets) describe the same city.
+    """
+    rng = np.random.default_rng(seed)
+    sev = _choice(rng, SEVERITY_P, n).astype(int)
+    units = _choice(rng, UNITS_P, n)
+
+    # Streets are line segments across the city; crashes fall along them
+    street = _zipf_index(rng, n_streets, n)
+    srng = np.random.default_rng(layout_seed)
+    a = np.array(AUSTIN_CENTER) + srng.normal(0, [0.08, 0.06], (n_streets, 2))
+    b = a + srng.normal(0, 0.04, (n_streets, 2))
+    t = rng.random(n)[:, None]
+    lat, lon = (a[street] + t * (b[street] - a[street]) + rng.normal(0, 0.002, (n, 2))).T
+    missing_xy = rng.random(n) < 0.02
+    lat[missing_xy] = np.nan
+    lon[missing_xy] = np.nan
+
+    local, utc, year = _timestamps(rng, n, years)
+
+    # Casualties consistent with the severity code
+    death = np.where(sev == 4, 1 + (rng.random(n) < 0.06), 0)
+    serious = np.where(sev == 1, 1 + (rng.random(n) < 0.15), np.where(sev == 4, rng.random(n) < 0.1, 0)).astype(int)
+    nonincap = np.where(sev == 2, rng.integers(1, 3, n), 0)
+    poss = np.where(sev == 3, rng.integers(1, 3, n), 0)
+    non_injry = rng.poisson(np.where(sev == 5, 2.4, 1.0))
+    unkn = rng.poisson(np.where(sev == 0, 1.0, 0.05))
+    tot_injry = serious + nonincap + poss
+
+    mode = np.full(n, "motor_vehicle", dtype=object)
+    for unit, col in MODE_COLUMNS.items():
+        mode[np.char.find(units.astype(str), unit) >= 0] = col
+    people = tot_injry + non_injry + unkn + death
+    max_cost = pd.Series(sev).map(MAX_COST).to_numpy()
+    total_cost = (max_cost * (1 + 0.35 * np.maximum(people - 1, 0) * rng.random(n))).round(-4)
+
+    speed = _choice(rng, SPEED_P, n).astype(float)
+    streets = np.array([f"STREET {i:04d}" for i in range(n_streets)], dtype=object)
+    streets[:5] = ["N IH 35 SB", "N IH 35 NB", "MOPAC", "N LAMAR BLVD", "RESEARCH BLVD SB"]
+    street_name = streets[street]
+    street_name[rng.random(n) < 0.04] = "NOT REPORTED"
+    ids = np.arange(1, n + 1) + 1_000_000 + id_offset
+
+    df = pd.DataFrame({
+        "ID": ids,
+        "Crash ID": ids + 19_000_000,
+        "crash_fatal_fl": sev == 4,
+        "case_id": (rng.integers(100_000_000, 999_999_999, n)).astype(str),
+        "rpt_block_num": np.where(rng.random(n) < 0.14, None, (rng.integers(1, 130, n) * 100).astype(str)),
+        "rpt_street_name": street_name,
+        "rpt_street_sfx": np.where(rng.random(n) < 0.48, None,
+                                   np.array(STREET_SUFFIXES, dtype=object)[street % len(STREET_SUFFIXES)]),
+        "crash_speed_limit": speed,
+        "road_constr_zone_fl": rng.random(n) < 0.13,
+        "latitude": lat.round(8),
+        "longitude": lon.round(6),
+        "crash_sev_id": sev,
+        "sus_serious_injry_cnt": serious,
+        "nonincap_injry_cnt": nonincap,
+        "poss_injry_cnt": poss,
+        "non_injry_cnt": non_injry,
+        "unkn_injry_cnt": unkn,
+        "tot_injry_cnt": tot_injry,
+        "death_cnt": death,
+        "units_involved": units,
+        "point": np.where(missing_xy, None, "POINT (" + lon.round(6).astype(str) + " " + lat.round(8).astype(str) + ")"),
+    })
+    for col in ("motor_vehicle", "bicycle", "pedestrian", "motorcycle", "other"):
+        df[f"{col}_death_count"] = np.where(mode == col, death, 0)
+        df[f"{col}_serious_injury_count"] = np.where(mode == col, serious, 0)
+    df["onsys_fl"] = street % 2 == 0
+    df["private_dr_fl"] = False
+    df["micromobility_serious_injury_count"] = np.where(mode == "micromobility", serious, 0)
+    df["micromobility_death_count"] = np.where(mode == "micromobility", death, 0)
+    df["Crash timestamp (US/Central)"] = local
+    df["Crash_year"] = year
+    df["Crash timestamp"] = utc
+    df["Is deleted"] = False
+    df["Is temporary record"] = rng.random(n) < 0.0002
+    df["Law enforcement fatality count"] = 0
+    df["Reported street prefix"] = None
+    df["Estimated Maximum Comprehensive Cost"] = max_cost
+    df["Estimated Total Comprehensive Cost"] = total_cost
+    df["Location ID"] = np.where(rng.random(n) < 0.055, None, np.char.add("L", street.astype(str)))
+    df["Location group"] = np.where(df["Location ID"].isna(), np.nan, 1.0 + (street % 4 == 0))
+    df["Address"] = np.where(df["rpt_block_num"].isna(), street_name, df["rpt_block_num"].fillna("") + " " + street_name)
+    return df[AUSTIN_COLUMNS]
+
+
+# ---- FARS ----
+STATE_CENTERS = {48: (31.0, -99.0), 6: (36.5, -119.5), 12: (28.3, -81.6), 13: (32.7, -83.4),
+                 37: (35.5, -79.4), 45: (33.9, -80.9), 4: (34.2, -111.6), 42: (40.9, -77.8),
+                 39: (40.3, -82.8), 47: (35.8, -86.3)}
+STATES = np.array(list(STATE_CENTERS))
+CENTER_BY_STATE = np.zeros((max(STATE_CENTERS) + 1, 2))
+CENTER_BY_STATE[STATES] = list(STATE_CENTERS.values())
+CITIES_PER_STATE = 12
+DAY_NAMES = np.array(["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"], dtype=object)
+LIGHT = {"Daylight": 0.48, "Dark - Not Lighted": 0.22, "Dark - Lighted": 0.2, "Dusk": 0.05, "Dawn": 0.05}
+WEATHER = {"Clear": 0.72, "Cloudy": 0.15, "Rain": 0.09, "Fog, Smog, Smoke": 0.02, "Not Reported": 0.02}
+FACTORS = {0: "None", 1: "Tires", 2: "Brake System", 5: "Lights", 7: "Steering", 98: "Not Reported", 99: "Unknown"}
+FACTOR_P = [0.86, 0.03, 0.02, 0.01, 0.01, 0.04, 0.03]
+EVENTS = {12: "Motor Vehicle In-Transport", 1: "Rollover/Overturn", 8: "Pedestrian", 42: "Tree (Standing Only)",
+          33: "Curb", 59: "Ditch", 25: "Concrete Traffic Barrier", 24: "Guardrail Face"}
+EVENT_P = [0.42, 0.14, 0.14, 0.1, 0.06, 0.06, 0.04, 0.04]
+
+
+def _repeat_index(counts):
+    """(parent row, 1-based number within parent) for `counts` children per parent."""
+    parent = np.repeat(np.arange(len(counts)), counts)
+    number = np.arange(len(parent)) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+    return parent, number
+
+
+def _fill_schema(df, name, rng):
+    """Add the remaining base columns of a FARS table with placeholder categories."""
+    n = len(df)
+    for col in FARS_DATASETS[name]["base_columns"]:
+        if col not in df.columns:
+            labels = np.array([f"{col.title()} {i}" for i in range(1, 6)], dtype=object)
+            df[col] = labels[rng.integers(0, 5, n)] if col.endswith("NAME") else rng.integers(0, 10, n)
+    return df
+
+
+class CaseNumbers:
+    """Running ST_CASE numbers per (year, state), so chunks never reuse a key."""
+
+    def __init__(self):
+        self.next = {}
+
+    def assign(self, year, state):
+        group = year * 100 + state
+        order = np.argsort(group, kind="stable")
+        sorted_group = group[order]
+        starts = np.r_[0, np.flatnonzero(np.diff(sorted_group)) + 1]
+        lengths = np.diff(np.r_[starts, len(group)])
+        seq = np.empty(len(group), dtype=np.int64)
+        offsets = np.array([self.next.get(int(g), 0) for g in sorted_group[starts]], dtype=np.int64)
+        seq[order] = np.arange(len(group)) - np.repeat(starts, lengths) + np.repeat(offsets, lengths) + 1
+        for g, off, k in zip(sorted_group[starts], offsets, lengths):
+            self.next[int(g)] = int(off + k)
+        return state * 10_000 + seq
+
+
+def fars_frames(n_crashes, seed=0, years=(2017, 2023), cases=None, layout_seed=0):
+    """All five FARS tables for n crashes, keyed consistently on (YEAR, ST_CASE, VEH_NO).
+
+    Crashes cluster around a dozen cities per state with a rural spread around
+    the state centre; 60% are in Texas, like the cleaned extract.
+    """
+    rng = np.random.default_rng(seed)
+    n = n_crashes
+    cases = cases or CaseNumbers()
+    year = rng.integers(years[0], years[1] + 1, n)
+    state = np.where(rng.random(n) < 0.6, 48, STATES[rng.integers(0, len(STATES), n)])
+    st_case = cases.assign(year, state)
+
+    # Same city layout for every chunk
+    lrng = np.random.default_rng(layout_seed)
+    cities = CENTER_BY_STATE[:, None, :] + lrng.normal(0, 1.5, (len(CENTER_BY_STATE), CITIES_PER_STATE, 2))
+    city = _zipf_index(rng, CITIES_PER_STATE, n, a=1.3)
+    urban = rng.random(n) < 0.7
+    spread = np.where(urban, 0.12, 1.3)[:, None]
+    origin = np.where(urban[:, None], cities[state, city], CENTER_BY_STATE[state])
+    lat, lon = (origin + rng.normal(0, 1, (n, 2)) * spread).T
+
+    month = rng.integers(1, 13, n)
+    day = rng.integers(1, 29, n)
+    dates = (year - 1970).astype("datetime64[Y]").astype("datetime64[M]") + (month - 1)
+    weekday = ((dates.astype("datetime64[D]") + (day - 1)).astype(np.int64) + 4) % 7   # 1970-01-01 was a Thursday
+    hour = rng.choice(24, size=n, p=HOUR_PROFILE / HOUR_PROFILE.sum())
+    fatals = 1 + (rng.random(n) < 0.08) + (rng.random(n) < 0.01)
+    peds = (rng.random(n) < 0.18).astype(int)
+    n_veh = 1 + rng.poisson(0.6, n)
+
+    accident = pd.DataFrame({
+        "ST_CASE": st_case, "STATE": state, "YEAR": year,
+        "LATITUDE": lat.round(7), "LONGITUD": lon.round(7),
+        "MONTH": month, "DAY": day, "HOUR": hour, "MINUTE": rng.integers(0, 60, n),
+        "DAY_WEEKNAME": DAY_NAMES[weekday], "LGT_CONDNAME": _choice(rng, LIGHT, n),
+        "WEATHERNAME": _choice(rng, WEATHER, n), "RUR_URBNAME": np.where(urban, "Urban", "Rural"),
+        "FATALS": fatals, "VE_TOTAL": n_veh, "PEDS": peds, "PERSONS": n_veh + rng.poisson(0.5, n),
+    })
+    accident["LATITUDENAME"] = accident["LATITUDE"].astype(str)
+    accident["LONGITUDNAME"] = accident["LONGITUD"].astype(str)
+
+    # Vehicles, one driver each plus passengers; deaths go to the first vehicle unless a pedestrian died
+    veh_crash, veh_no = _repeat_index(n_veh)
+    m = len(veh_crash)
+    vehicle = pd.DataFrame({
+        "ST_CASE": st_case[veh_crash], "VEH_NO": veh_no, "STATE": state[veh_crash], "YEAR": year[veh_crash],
+        "HOUR": hour[veh_crash], "MONTH": month[veh_crash], "DAY": day[veh_crash],
+        "MOD_YEAR": rng.integers(1995, 2024, m),
+        "DEATHS": np.where((veh_no == 1) & (peds[veh_crash] == 0), fatals[veh_crash], 0),
+        "SPEEDREL": (rng.random(m) < 0.25).astype(int),
+    })
+
+    occupants = 1 + rng.poisson(0.4, m)
+    per_veh, per_no = _repeat_index(occupants)
+    k = len(per_veh)
+    person = pd.DataFrame({
+        "ST_CASE": st_case[veh_crash][per_veh], "VEH_NO": veh_no[per_veh], "PER_NO": per_no,
+        "STATE": state[veh_crash][per_veh], "YEAR": year[veh_crash][per_veh],
+        "PER_TYPE": np.where(per_no == 1, 1, 2),
+        "AGE": rng.integers(16, 90, k), "SEX": rng.choice([1, 2], size=k, p=[0.7, 0.3]),
+        "DRINKING": rng.choice([0, 1, 8, 9], size=k, p=[0.7, 0.15, 0.1, 0.05]),
+        "REST_USE": rng.choice([20, 3, 8, 99], size=k, p=[0.45, 0.35, 0.1, 0.1]),
+        "REST_MIS": rng.choice([0, 1], size=k, p=[0.95, 0.05]),
+    })
+
+    n_factor = 1 + (rng.random(m) < 0.05)
+    f_veh, _ = _repeat_index(n_factor)
+    codes = rng.choice(list(FACTORS), size=len(f_veh), p=FACTOR_P)
+    factor = pd.DataFrame({
+        "ST_CASE": st_case[veh_crash][f_veh], "VEH_NO": veh_no[f_veh], "STATE": state[veh_crash][f_veh],
+        "YEAR": year[veh_crash][f_veh], "MFACTOR": codes,
+        "MFACTORNAME": pd.Series(codes).map(FACTORS).to_numpy(), "VEHICLECC": None,
+    })
+
+    n_events = 1 + rng.poisson(0.5, n)
+    ev_crash, ev_no = _repeat_index(n_events)
+    soe = rng.choice(list(EVENTS), size=len(ev_crash), p=EVENT_P)
+    cevent = pd.DataFrame({
+        "ST_CASE": st_case[ev_crash], "STATE": state[ev_crash], "YEAR": year[ev_crash], "EVENTNUM": ev_no,
+        "SOE": soe, "SOENAME": pd.Series(soe).map(EVENTS).to_numpy(),
+    })
+
+    tables = {"accident": accident, "vehicle": vehicle, "person": person, "factor": factor, "cevent": cevent}
+    return {name: _fill_schema(df, name, rng) for name, df in tables.items()}
+
+
+# ---- Streaming to disk ----
+def _csv_text(df, sep):
+    """Header-less CSV text; pyarrow's writer (installed with streamlit) is several
+    times faster than DataFrame.to_csv on wide string columns."""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        return df.to_csv(header=False, index=False, sep=sep, lineterminator="\n")
+    buf = io.BytesIO()
+    options = pa_csv.WriteOptions(include_header=False, delimiter=sep, quoting_style="needed")
+    pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf, options)
+    return buf.getvalue().decode("utf-8")
+
+
+def _with_malformed(df, rate, rng, sep=","):
+    """CSV text for df where a fraction of rows are ragged (fields cut off or extra
+    fields appended), the way broken export rows look in the raw files."""
+    text = _csv_text(df, sep)
+    if rate <= 0:
+        return text
+    lines = text.split("\n")
+    bad = np.flatnonzero(rng.random(len(df)) < rate)
+    buf = io.StringIO()
+    writer = csv.writer(buf, delimiter=sep, lineterminator="")
+    values = df.iloc[bad].astype(object).where(df.iloc[bad].notna(), "").to_numpy()
+    for i, row, cut in zip(bad, values, rng.integers(-3, 4, len(bad))):
+        row = list(row[:cut]) if cut < 0 else list(row) + ["X"] * max(cut, 1)
+        buf.seek(0)
+        buf.truncate()
+        writer.writerow(row)
+        lines[i] = buf.getvalue()
+    return "\n".join(lines)
+
+
+def write_austin(path, rows, chunk_rows=500_000, malformed=0.0, seed=0, years=(2018, 2025)):
+    """Stream `rows` Austin records to one CSV, `chunk_rows` at a time."""
+    rng = np.random.default_rng(seed + 7)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(",".join(AUSTIN_COLUMNS) + "\n")
+        for i, start in enumerate(range(0, rows, chunk_rows)):
+            n = min(chunk_rows, rows - start)
+            f.write(_with_malformed(austin_frame(n, seed=seed + i, years=years, id_offset=start), malformed, rng))
+    return path
+
+
+def write_fars(folder, crashes, layout="cleaned", chunk_crashes=200_000, malformed=0.0, seed=0,
+               years=(2017, 2023)):
+    """Stream `crashes` FARS crashes and their child rows to disk.
+
+    layout="cleaned": the five pipe-separated *_2017to2023.csv files the
+    dashboards read, with clean_data_csvs.py's column selection and filters.
+    layout="raw": comma-separated yearly extracts (accident_2017.csv, ...) as
+    clean_data_csvs.py expects in FARS_RAW_DIR, optionally with ragged rows.
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed + 11)
+    cases = CaseNumbers()
+    handles = {}
+    try:
+        for i, start in enumerate(range(0, crashes, chunk_crashes)):
+            n = min(chunk_crashes, crashes - start)
+            for name, df in fars_frames(n, seed=seed + i, years=years, cases=cases).items():
+                config = FARS_DATASETS[name]
+                if layout == "cleaned":
+                    df = config["filter"](df[config["base_columns"] + ["YEAR"]])
+                    parts = {config["output"]: df}
+                    sep = "|"
+                else:
+                    parts = {f"{name}_{y}.csv": g.drop(columns="YEAR") for y, g in df.groupby("YEAR")}
+                    sep = ","
+                for file_name, part in parts.items():
+                    if file_name not in handles:
+                        handles[file_name] = open(folder / file_name, "w", encoding="utf-8", newline="")
+                        handles[file_name].write(sep.join(part.columns) + "\n")
+                    handles[file_name].write(_with_malformed(part, malformed if layout == "raw" else 0, rng, sep))
+    finally:
+        for f in handles.values():
+            f.close()
+    return sorted(handles)
+
+
+def _count(text):
+    """'10M' / '250k' / '1000' -> int"""
+    units = {"k": 1_000, "m": 1_000_000}
+    text = text.lower().replace("_", "")
+    return int(float(text[:-1]) * units[text[-1]]) if text[-1] in units else int(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic Austin or FARS crash files")
+    parser.add_argument("dataset", choices=["austin", "fars"])
+    parser.add_argument("--rows", default="100k", help="Austin rows or FARS crashes (e.g. 250k, 10M)")
+    parser.add_argument("--out", required=True, help="CSV path (austin) or folder (fars)")
+    parser.add_argument("--layout", choices=["cleaned", "raw"], default="cleaned", help="FARS only")
+    parser.add_argument("--malformed", type=float, default=0.0, help="fraction of ragged rows")
+    parser.add_argument("--chunk", default="250k", help="rows generated per chunk (bounds memory)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    rows, chunk = _count(args.rows), _count(args.chunk)
+    if args.dataset == "austin":
+        write_austin(args.out, rows, chunk, args.malformed, args.seed)
+        written = [args.out]
+    else:
+        written = write_fars(args.out, rows, args.layout, chunk, args.malformed, args.seed)
+    print(f"Wrote {rows:,} {args.dataset} records to {len(written)} file(s) in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
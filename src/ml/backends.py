@@ -0,0 +1,48 @@
+import os
+
+import pandas as pd
+
+from pipeline.lazy import lazy_import
+
+ensemble = lazy_import("sklearn.ensemble")
+inspection = lazy_import("sklearn.inspection")
+
+# Pluggable model engines for the severity classifiers and the cost regressor.
+# "rf" keeps the original RandomForest setup; "hgb" bins every feature into at
+# most 255 buckets, which suits the hour/weekday/speed-limit/flag features and
+# trains in seconds on the multi-year data.
+#
+# Select with make_model(..., engine="hgb") or PNBI_MODEL_ENGINE=hgb.
+
+ENGINES = ("rf", "hgb")
+DEFAULT_ENGINE = os.environ.get("PNBI_MODEL_ENGINE", "rf")
+
+_MODELS = {
+    ("rf", "classifier"): ("RandomForestClassifier", {"n_estimators": 100, "n_jobs": -1}),
+    ("rf", "regressor"): ("RandomForestRegressor", {"n_estimators": 100, "n_jobs": -1}),
+    ("hgb", "classifier"): ("HistGradientBoostingClassifier", {"max_iter": 200, "learning_rate": 0.1}),
+    ("hgb", "regressor"): ("HistGradientBoostingRegressor", {"max_iter": 200, "learning_rate": 0.1}),
+}
+
+
+def make_model(task, engine=None, **params):
+    """New unfitted estimator for task "classifier" or "regressor"."""
+    engine = engine or DEFAULT_ENGINE
+    if (engine, task) not in _MODELS:
+        raise ValueError(f"Unknown engine/task: {engine}/{task} (engines: {ENGINES})")
+    cls_name, defaults = _MODELS[(engine, task)]
+    return getattr(ensemble, cls_name)(**{**defaults, **params})
+
+
+def feature_importance(model, X, y=None, n_repeats=5, random_state=42):
+    """Importance per feature: impurity-based when the model has it,
+    permutation importance otherwise (needs X, y)."""
+    if hasattr(model, "feature_importances_"):
+        values = model.feature_importances_
+    else:
+        if y is None:
+            raise ValueError("permutation importance needs y")
+        result = inspection.permutation_importance(model, X, y, n_repeats=n_repeats,
+                                        random_state=random_state, n_jobs=-1)
+        values = result.importances_mean
+    return pd.Series(values, index=list(X.columns))
@@ -0,0 +1,88 @@
+import argparse
+import pickle as pkl
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+from sklearn.metrics import accuracy_score, mean_absolute_error, r2_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+
+ROOT = Path(__file__).resolve().parents[2]  # repo root
+sys.path.insert(0, str(ROOT / "src"))
+
+from ml.backends import ENGINES, make_model
+from ml.features import BEST_RF_PARAMS, cost_xy, severity_xy
+from pipeline.paths import AUSTIN_CLEANSED_CSV, PROCESSED_DIR
+
+# Side-by-side comparison of the model engines on the severity and cost tasks.
+#
+#   python src/ml/compare_engines.py
+#   python src/ml/compare_engines.py --tasks cost --out engines.csv
+
+
+def _score(task, model, X, y):
+    if task == "severity":
+        proba = model.predict_proba(X)[:, 1]
+        return {"accuracy": accuracy_score(y, proba >= 0.5),
+                "roc_auc": roc_auc_score(y, proba) if y.nunique() > 1 else float("nan")}
+    pred = model.predict(X)
+    return {"r2": r2_score(y, pred), "mae": mean_absolute_error(y, pred)}
+
+
+def benchmark(task, engine, X, y, repeats=3):
+    kind = "classifier" if task == "severity" else "regressor"
+    params = BEST_RF_PARAMS if (engine, task) == ("rf", "cost") else {}
+    x_train, x_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    model = make_model(kind, engine, random_state=42, **params)
+    tracemalloc.start()
+    started = time.perf_counter()
+    model.fit(x_train, y_train)
+    fit_s = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        model.predict(x_test)
+    predict_s = (time.perf_counter() - started) / repeats
+
+    return {
+        "task": task, "engine": engine, "train_rows": len(x_train),
+        "fit_s": fit_s,
+        "predict_rows_per_s": len(x_test) / predict_s if predict_s else float("inf"),
+        "fit_peak_mb": peak / 1e6,
+        "model_mb": len(pkl.dumps(model)) / 1e6,
+        **_score(task, model, x_test, y_test),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare RandomForest and histogram GBM engines")
+    parser.add_argument("--tasks", nargs="+", default=["severity", "cost"], choices=["severity", "cost"])
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=ENGINES)
+    parser.add_argument("--severity-data", default=str(PROCESSED_DIR / "atx_crash_2025.csv"))
+    parser.add_argument("--cost-data", default=str(AUSTIN_CLEANSED_CSV))
+    parser.add_argument("--out", help="optional CSV for the results table")
+    args = parser.parse_args(argv)
+
+    rows = []
+    for task in args.tasks:
+        path = args.severity_data if task == "severity" else args.cost_data
+        df = pd.read_csv(path, low_memory=False)
+        X, y = severity_xy(df) if task == "severity" else cost_xy(df)
+        for engine in args.engines:
+            rows.append(benchmark(task, engine, X, y))
+
+    results = pd.DataFrame(rows)
+    with pd.option_context("display.width", 200, "display.float_format", "{:,.3f}".format):
+        print(results.to_string(index=False))
+    if args.out:
+        results.to_csv(args.out, index=False)
+    return results
+
+
+if __name__ == "__main__":
+    main()
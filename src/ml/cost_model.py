@@ -0,0 +1,40 @@
+import pickle as pkl
+
+import pandas as pd
+
+from ml.backends import DEFAULT_ENGINE, feature_importance, make_model
+from ml.features import BEST_RF_PARAMS, cost_xy
+from pipeline.lazy import lazy_import
+
+model_selection = lazy_import("sklearn.model_selection")
+
+# Non-notebook version of rf_model.ipynb: fit the comprehensive-cost regressor
+# with the tuned parameters and export the model + feature importance.
+
+
+def train_cost_model(cleansed_csv, model_path, importance_path,
+                     train_size=35000, test_size=5000, params=None, engine=None):
+    df = pd.read_csv(cleansed_csv, low_memory=False)
+    X, y = cost_xy(df)
+
+    train_size = min(train_size, int(len(X) * 0.8))
+    test_size = min(test_size, len(X) - train_size)
+    x_train, x_test, y_train, y_test = model_selection.train_test_split(
+        X, y, train_size=train_size, test_size=test_size, random_state=42
+    )
+
+    engine = engine or DEFAULT_ENGINE
+    if params is None and engine == "rf":
+        params = BEST_RF_PARAMS
+    model = make_model("regressor", engine, random_state=42, **(params or {}))
+    model.fit(x_train, y_train)
+    score = model.score(x_test, y_test)
+
+    with open(model_path, "wb") as f:
+        pkl.dump(model, f)
+
+    importance = feature_importance(model, x_test, y_test)
+    importance.sort_values(ascending=False).rename("Importance").rename_axis("Feature").to_csv(importance_path)
+
+    print(f"Cost model R^2 on holdout: {score:.3f}")
+    return score
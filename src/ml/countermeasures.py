@@ -0,0 +1,189 @@
+import argparse
+import hashlib
+import pickle as pkl
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]  # repo root
+sys.path.insert(0, str(ROOT / "src"))
+
+from ml.features import COST_FEATURES, TARGET, cost_xy
+from pipeline.cleanse import cleanse
+from pipeline.lazy import lazy_import
+from pipeline.paths import AUSTIN_CLEANSED_CSV, CACHE_DIR, MODELS_DIR, PROCESSED_DIR
+
+cluster = lazy_import("sklearn.cluster")
+
+# Prescriptive ranking of countermeasures per corridor and crash hotspot.
+#
+# Each intervention is a counterfactual edit of the cost model's features for
+# the crashes it would plausibly have changed (lower posted speed, VRUs
+# separated from traffic, night crashes under daylight-like conditions). Every
+# edited crash is scored in one batched predict() call, and the drop in
+# predicted comprehensive cost is summed per corridor and per hotspot. The
+# numbers are model counterfactuals, not measured effects of treatments.
+#
+#   python src/ml/countermeasures.py                          # cleansed CSV + models/cost_rf.pkl
+#   python src/ml/countermeasures.py --corridors 50 --hotspots 10 --top 3
+
+COST_MODEL_PATH = MODELS_DIR / "cost_rf.pkl"
+COUNTERMEASURES_PATH = PROCESSED_DIR / "countermeasures.csv"
+TOP_CORRIDORS = 25
+N_HOTSPOTS = 8
+CACHE_VERSION = 2       # bump when the ranking's columns or meaning change
+
+SPEED_CUT_MPH = 10
+MIN_SPEED_LIMIT = 20
+VRU_FLAGS = ["pedestrian_involved", "bicycle_involved", "micromobility device_involved", "e-scooter_involved"]
+NIGHT_HOURS = [20, 21, 22, 23, 0, 1, 2, 3, 4, 5]
+LIT_HOUR = 19   # dusk: last hour the model sees under mostly lit/daylight conditions
+
+
+# ---- Interventions: X -> (edited X, rows affected) ----
+def speed_reduction(X, mph=SPEED_CUT_MPH, floor=MIN_SPEED_LIMIT):
+    affected = X["crash_speed_limit"] > floor
+    X.loc[affected, "crash_speed_limit"] = np.maximum(X.loc[affected, "crash_speed_limit"] - mph, floor)
+    return X, affected
+
+
+def vru_protection(X):
+    """Protected lanes and crossings: the VRU is no longer in the crash."""
+    flags = [c for c in VRU_FLAGS if c in X.columns]
+    affected = X[flags].astype(bool).any(axis=1)
+    X.loc[affected, flags] = 0
+    return X, affected
+
+
+def night_lighting(X):
+    affected = X["hour_of_day"].isin(NIGHT_HOURS)
+    X.loc[affected, "hour_of_day"] = LIT_HOUR
+    return X, affected
+
+
+INTERVENTIONS = {
+    f"Speed limit -{SPEED_CUT_MPH} mph": speed_reduction,
+    "VRU protection": vru_protection,
+    "Night lighting": night_lighting,
+}
+
+
+def counterfactual_savings(model, X, interventions=INTERVENTIONS):
+    """(baseline prediction, crashes x interventions matrices of predicted cost saved and of rows edited).
+
+    Only affected rows are re-scored, all interventions in a single predict().
+    """
+    edits = [func(X.copy()) for func in interventions.values()]
+    stacked = pd.concat([X] + [edited[affected] for edited, affected in edits])
+    preds = model.predict(stacked)
+
+    baseline = preds[:len(X)]
+    savings = np.zeros((len(X), len(edits)))
+    edited = np.column_stack([affected.to_numpy(dtype=bool) for _, affected in edits])
+    start = len(X)
+    for j in range(len(edits)):
+        rows = np.flatnonzero(edited[:, j])
+        savings[rows, j] = baseline[rows] - preds[start:start + len(rows)]
+        start += len(rows)
+    return baseline, savings, edited
+
+
+# ---- Units: corridors and hotspots ----
+def corridor_units(df, top=TOP_CORRIDORS):
+    street = df["rpt_street_name"].where(
+        ~df["rpt_street_name"].str.contains("NOT REPORTED|UNKNOWN", case=False, na=True))
+    keep = street.value_counts().index[:top]
+    return street.where(street.isin(keep))
+
+
+def hotspot_units(df, k=N_HOTSPOTS):
+    labels = cluster.KMeans(n_clusters=k, random_state=42, n_init=10).fit_predict(df[["latitude", "longitude"]])
+    centres = df.groupby(labels)[["latitude", "longitude"]].mean()
+    names = {i: f"Hotspot {i + 1} ({lat:.3f}, {lon:.3f})" for i, (lat, lon) in centres.iterrows()}
+    return pd.Series(labels, index=df.index).map(names)
+
+
+def rank_countermeasures(df, model, corridors=TOP_CORRIDORS, hotspots=N_HOTSPOTS, interventions=INTERVENTIONS):
+    """One row per (unit, intervention), ranked by expected cost reduction within each unit."""
+    X, _ = cost_xy(df)
+    df = df.loc[X.index]
+    baseline, savings, edited = counterfactual_savings(model, X, interventions)
+    names = list(interventions)
+    crashes = pd.DataFrame(savings, index=X.index, columns=names)
+    # Rows each intervention applies to, whether or not their prediction moved
+    affected = pd.DataFrame(edited, index=X.index, columns=names)
+    crashes["baseline_cost"] = baseline
+
+    tables = []
+    for unit_type, units in [("Corridor", corridor_units(df, corridors)), ("Hotspot", hotspot_units(df, hotspots))]:
+        grouped = crashes.groupby(units)
+        totals = grouped.sum()
+        counts = affected.groupby(units).sum()
+        table = totals[names].stack().rename("expected_reduction").reset_index()
+        table.columns = ["unit", "intervention", "expected_reduction"]
+        table["affected_crashes"] = counts.stack().to_numpy()
+        table = table.merge(grouped.size().rename("crashes"), left_on="unit", right_index=True)
+        table = table.merge(totals["baseline_cost"], left_on="unit", right_index=True)
+        table.insert(0, "unit_type", unit_type)
+        tables.append(table)
+
+    out = pd.concat(tables, ignore_index=True)
+    out["reduction_pct"] = 100 * out["expected_reduction"] / out["baseline_cost"]
+    out["rank"] = out.groupby(["unit_type", "unit"])["expected_reduction"].rank(ascending=False, method="first").astype(int)
+    return out.sort_values(["unit_type", "baseline_cost", "rank"], ascending=[True, False, True], ignore_index=True)
+
+
+# ---- Cached entry point ----
+def _stamp(path):
+    st = Path(path).stat()
+    return st.st_size, st.st_mtime_ns
+
+
+def cached_ranking(data=AUSTIN_CLEANSED_CSV, model_path=COST_MODEL_PATH, corridors=TOP_CORRIDORS,
+                   hotspots=N_HOTSPOTS, cache_dir=CACHE_DIR):
+    """rank_countermeasures() for the files on disk, recomputed only when the data or model changes."""
+    key = repr((str(Path(data).resolve()), _stamp(data), str(Path(model_path).resolve()), _stamp(model_path),
+                corridors, hotspots, sorted(INTERVENTIONS), CACHE_VERSION))
+    path = Path(cache_dir) / f"countermeasures.{hashlib.sha1(key.encode()).hexdigest()[:16]}.pkl"
+    if path.exists():
+        return pd.read_pickle(path)
+
+    df = pd.read_csv(data, low_memory=False)
+    if "hour_of_day" not in df.columns:   # raw export rather than the cleansed file
+        df = cleanse(df, dropna_subset=COST_FEATURES + [TARGET])
+    with open(model_path, "rb") as f:
+        model = pkl.load(f)
+    ranking = rank_countermeasures(df, model, corridors, hotspots)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ranking.to_pickle(path)
+    return ranking
+
+
+def refresh(data=AUSTIN_CLEANSED_CSV, model_path=COST_MODEL_PATH, out=COUNTERMEASURES_PATH):
+    ranking = cached_ranking(data, model_path)
+    ranking.to_csv(out, index=False)
+    return ranking
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank countermeasures per corridor and hotspot by predicted cost saved")
+    parser.add_argument("--data", default=str(AUSTIN_CLEANSED_CSV))
+    parser.add_argument("--model", default=str(COST_MODEL_PATH))
+    parser.add_argument("--corridors", type=int, default=TOP_CORRIDORS)
+    parser.add_argument("--hotspots", type=int, default=N_HOTSPOTS)
+    parser.add_argument("--top", type=int, default=1, help="interventions to print per unit")
+    parser.add_argument("--out", default=str(COUNTERMEASURES_PATH))
+    args = parser.parse_args(argv)
+
+    ranking = cached_ranking(args.data, args.model, args.corridors, args.hotspots)
+    ranking.to_csv(args.out, index=False)
+    best = ranking[ranking["rank"] <= args.top]
+    with pd.option_context("display.width", 200, "display.max_rows", 500):
+        print(best[["unit_type", "unit", "intervention", "crashes", "affected_crashes",
+                    "expected_reduction", "reduction_pct"]].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
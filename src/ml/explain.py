@@ -0,0 +1,203 @@
+import argparse
+import hashlib
+import pickle as pkl
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]  # repo root
+sys.path.insert(0, str(ROOT / "src"))
+
+from ml.countermeasures import COST_MODEL_PATH
+from ml.features import cost_xy
+from ml.scenarios import using_n_jobs
+from pipeline.lazy import lazy_import
+from pipeline.paths import AUSTIN_CLEANSED_CSV, CACHE_DIR
+
+joblib = lazy_import("joblib")
+sparse = lazy_import("scipy.sparse")
+
+# Explanations for the comprehensive-cost model.
+#
+# Impurity importances (feature_importances_) favour high-cardinality features
+# such as longitude. This module gives
+#   - permutation importance: drop in R^2 when one feature is shuffled, on a
+#     sample stratified by target quantile, features scored in parallel with
+#     all repeats of a feature in one predict() call;
+#   - per-prediction tree attributions (path contributions, as in treeinterpreter):
+#     prediction = bias + sum of per-feature contributions, computed for every
+#     tree in parallel with sparse decision-path products.
+# Results are cached on disk per model version (hash of the pickle) and data.
+#
+#   explainer = Explainer.from_path("data/models/cost_rf.pkl")
+#   explainer.importance(X, y)               # global, unbiased ranking
+#   explainer.drivers(X, df["rpt_street_name"])   # mean contribution per corridor
+#
+#   python src/ml/explain.py --street "N LAMAR BLVD"
+
+EXPLAIN_DIR = CACHE_DIR / "explain"
+MAX_ROWS = 5000
+N_REPEATS = 5
+QUANTILE_BINS = 10
+
+
+def model_version(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:16]
+
+
+def frame_digest(*frames):
+    h = hashlib.sha1()
+    for frame in frames:
+        h.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def stratified_rows(y, n, bins=QUANTILE_BINS, seed=42):
+    """Positions of about `n` rows, sampled evenly within each target quantile (keeps the costly tail)."""
+    if len(y) <= n:
+        return np.arange(len(y))
+    strata = pd.qcut(pd.Series(np.asarray(y)).rank(method="first"), bins, labels=False)
+    take = strata.groupby(strata).sample(frac=n / len(y), random_state=seed).index
+    return np.sort(take.to_numpy())
+
+
+def _r2(y, preds):
+    """R^2 of each row of `preds` (repeats x rows) against y."""
+    y = np.asarray(y, dtype=np.float64)
+    return 1 - ((preds - y) ** 2).sum(axis=1) / ((y - y.mean()) ** 2).sum()
+
+
+# ---- Permutation importance ----
+def permutation_importance(model, X, y, n_repeats=N_REPEATS, max_rows=MAX_ROWS, n_jobs=-1, seed=42):
+    """Mean/std drop in R^2 per shuffled feature, features in parallel."""
+    rows = stratified_rows(y, max_rows, seed=seed)
+    Xs, ys = X.iloc[rows], np.asarray(y)[rows]
+    base = _r2(ys, model.predict(Xs)[None, :])[0]
+    values = Xs.to_numpy(dtype=np.float32)
+
+    def drop(j):
+        rng = np.random.default_rng(seed + j)
+        tiled = np.tile(values, (n_repeats, 1))
+        tiled[:, j] = np.concatenate([rng.permutation(values[:, j]) for _ in range(n_repeats)])
+        preds = model.predict(pd.DataFrame(tiled, columns=X.columns, copy=False)).reshape(n_repeats, len(rows))
+        return base - _r2(ys, preds)
+
+    # Features in parallel threads; each predict single-threaded to avoid oversubscription
+    with using_n_jobs(model, 1):
+        drops = joblib.Parallel(n_jobs=n_jobs, prefer="threads")(
+            joblib.delayed(drop)(j) for j in range(X.shape[1]))
+    drops = np.array(drops)
+    return pd.DataFrame({"feature": X.columns, "importance": drops.mean(axis=1), "std": drops.std(axis=1)}) \
+        .sort_values("importance", ascending=False, ignore_index=True)
+
+
+# ---- Tree path attributions ----
+def _tree_contributions(estimator, values, n_features):
+    """(rows x features) contributions of one tree and its root value."""
+    tree = estimator.tree_
+    node_value = tree.value[:, 0, 0]
+    parent = np.full(tree.node_count, -1)
+    for children in (tree.children_left, tree.children_right):
+        inner = np.flatnonzero(children >= 0)
+        parent[children[inner]] = inner
+    child = np.flatnonzero(parent >= 0)
+    # Each edge parent -> child moves the prediction by value[child] - value[parent],
+    # credited to the feature the parent splits on
+    edges = sparse.csr_matrix((node_value[child] - node_value[parent[child]], (child, tree.feature[parent[child]])),
+                              shape=(tree.node_count, n_features))
+    return estimator.decision_path(values) @ edges, node_value[0]
+
+
+def has_tree_paths(model):
+    """Whether tree_attributions() can explain `model` (forests and single trees, not histogram GBMs)."""
+    return hasattr(model, "estimators_") or hasattr(model, "tree_")
+
+
+def tree_attributions(model, X, n_jobs=-1):
+    """(bias, contributions frame): prediction = bias + contributions.sum(axis=1) for every row."""
+    trees = getattr(model, "estimators_", None)
+    if trees is None and hasattr(model, "tree_"):
+        trees = [model]
+    if trees is None:
+        raise TypeError(f"Tree attributions need a forest or decision tree, not {type(model).__name__}")
+    values = X.to_numpy(dtype=np.float32)
+    parts = joblib.Parallel(n_jobs=n_jobs, prefer="threads")(
+        joblib.delayed(_tree_contributions)(tree, values, X.shape[1]) for tree in np.ravel(trees))
+    contrib = sum(p for p, _ in parts) / len(parts)
+    bias = float(np.mean([b for _, b in parts]))
+    return bias, pd.DataFrame(np.asarray(contrib.todense()), index=X.index, columns=X.columns)
+
+
+# ---- Cached service ----
+class Explainer:
+    def __init__(self, model, version, cache_dir=EXPLAIN_DIR):
+        self.model = model
+        self.version = version
+        self.cache_dir = Path(cache_dir)
+
+    @classmethod
+    def from_path(cls, path, cache_dir=EXPLAIN_DIR):
+        with open(path, "rb") as f:
+            model = pkl.load(f)
+        return cls(model, model_version(path), cache_dir)
+
+    def _cached(self, kind, digest, compute):
+        path = self.cache_dir / f"{self.version}.{kind}.{digest}.pkl"
+        if path.exists():
+            return pd.read_pickle(path)
+        result = compute()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pd.to_pickle(result, path)
+        return result
+
+    def importance(self, X, y, n_repeats=N_REPEATS, max_rows=MAX_ROWS):
+        digest = frame_digest(X, pd.Series(np.asarray(y))) + f"-{n_repeats}-{max_rows}"
+        return self._cached("importance", digest,
+                            lambda: permutation_importance(self.model, X, y, n_repeats, max_rows))
+
+    @property
+    def has_attributions(self):
+        return has_tree_paths(self.model)
+
+    def attributions(self, X):
+        """(bias, per-crash contributions) for the rows of X."""
+        return self._cached("attributions", frame_digest(X), lambda: tree_attributions(self.model, X))
+
+    def drivers(self, X, groups, max_rows=MAX_ROWS, seed=42):
+        """Mean contribution per feature for each group (e.g. corridor), on at most `max_rows` crashes."""
+        if len(X) > max_rows:
+            X = X.sample(max_rows, random_state=seed)
+        _, contrib = self.attributions(X)
+        return contrib.groupby(pd.Series(groups, index=groups.index).reindex(X.index)).mean()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Permutation importance and per-corridor cost drivers")
+    parser.add_argument("--data", default=str(AUSTIN_CLEANSED_CSV))
+    parser.add_argument("--model", default=str(COST_MODEL_PATH))
+    parser.add_argument("--street", help="show drivers for this rpt_street_name")
+    parser.add_argument("--rows", type=int, default=MAX_ROWS)
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.data, low_memory=False)
+    X, y = cost_xy(df)
+    explainer = Explainer.from_path(args.model)
+    print(f"Permutation importance (R^2 drop, {min(args.rows, len(X)):,} rows):")
+    print(explainer.importance(X, y, max_rows=args.rows).to_string(index=False, float_format="{:.4f}".format))
+    if args.street and not explainer.has_attributions:
+        print(f"\nNo per-crash attributions for a {type(explainer.model).__name__}; importance only.")
+    elif args.street:
+        on_street = df.loc[X.index, "rpt_street_name"] == args.street
+        bias, contrib = explainer.attributions(X[on_street])
+        print(f"\nMean contribution on {args.street} ({on_street.sum():,} crashes, base ${bias:,.0f}):")
+        print(contrib.mean().sort_values().to_string(float_format="{:,.0f}".format))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import pandas as pd
+
+# Feature frame used by the comprehensive-cost regressor (rf_model.ipynb).
+# Order matches the columns the pickled RandomizedSearchTreeRegressor was fit on.
+
+TARGET = "Estimated Total Comprehensive Cost"
+
+COST_FEATURES = [
+    "crash_speed_limit", "road_constr_zone_fl", "latitude", "longitude",
+    "onsys_fl", "private_dr_fl", "Location group",
+    "day_of_week", "week_of_year", "hour_of_day",
+    "train_involved", "pedestrian_involved", "motorcycle_involved",
+    "micromobility device_involved", "e-scooter_involved", "motor vehicle_involved",
+    "large passenger vehicle_involved", "other_involved", "passenger car_involved",
+    "bicycle_involved",
+]
+
+BOOL_FEATURES = ["road_constr_zone_fl", "onsys_fl", "private_dr_fl"]
+
+# Best parameters found by the randomized search in rf_model.ipynb
+BEST_RF_PARAMS = {
+    "n_estimators": 50, "min_samples_leaf": 4, "max_features": None,
+    "max_depth": 5, "criterion": "squared_error",
+}
+
+
+def to_bool(s):
+    """Normalise TRUE/FALSE strings and 0/1 to booleans."""
+    if s.dtype == bool:
+        return s
+    return s.astype(str).str.strip().str.upper().isin(["TRUE", "1", "1.0", "T", "Y"])
+
+
+def cost_xy(df, features=COST_FEATURES, target=TARGET):
+    """Return (X, y) for the cost model from a cleansed Austin frame."""
+    df = df.dropna(subset=features + [target])
+    X = df[features].copy()
+    for col in BOOL_FEATURES:
+        if col in X.columns:
+            X[col] = to_bool(X[col])
+    X = X.astype("float32")
+    y = pd.to_numeric(df[target], errors="coerce").astype("float64")
+    return X, y
+
+
+# Severity classifier used in bi_ai_atx.py / bi_ai_atx_analysis1.py
+SEVERITY_FEATURES = ["crash_speed_limit", "HOUR", "DAY_WEEK", "onsys_fl", "private_dr_fl"]
+
+
+def severity_xy(df):
+    """Return (X, y) for the high-severity classifier from a raw Austin frame."""
+    ts = pd.to_datetime(df["Crash timestamp (US/Central)"], errors="coerce")
+    frame = pd.DataFrame({
+        "crash_speed_limit": pd.to_numeric(df["crash_speed_limit"], errors="coerce"),
+        "HOUR": ts.dt.hour,
+        "DAY_WEEK": ts.dt.dayofweek,
+        "onsys_fl": to_bool(df["onsys_fl"]),
+        "private_dr_fl": to_bool(df["private_dr_fl"]),
+        "high_severity": ((df["death_cnt"] > 0) | (df["sus_serious_injry_cnt"] > 0)).astype(int),
+    }).dropna()
+    return frame[SEVERITY_FEATURES].astype("float32"), frame["high_severity"]
@@ -0,0 +1,226 @@
+import argparse
+import pickle as pkl
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]  # repo root
+sys.path.insert(0, str(ROOT / "src"))
+
+from pipeline.lazy import lazy_import
+from pipeline.paths import AUSTIN_CLEANSED_CSV, MODELS_DIR, PROCESSED_DIR
+
+stats = lazy_import("scipy.stats")
+
+# Crash-count forecasting per corridor and severity group.
+#
+# Daily counts live in one (series x day) matrix covering the last
+# HISTORY_DAYS days. New records are folded in with update(), which only
+# touches the affected cells and shifts the window when a new day arrives, so
+# rolling 7/28-day aggregates stay current without re-reading the history.
+# The model is an exponentially weighted level times a day-of-week profile,
+# fitted for every series at once with matrix operations.
+#
+#   python src/ml/forecast.py                      # rebuild state + next-week forecast
+#   python src/ml/forecast.py --update new.csv     # fold in new records only
+
+TIMESTAMP_COL = "Crash timestamp (US/Central)"
+HISTORY_DAYS = 364
+TOP_CORRIDORS = 50
+ALL_CORRIDORS = "All Corridors"
+# crash_sev_id -> group (4 fatal, 1 suspected serious injury), everything else "Other"
+SEVERITY_GROUPS = {4: "KSI", 1: "KSI"}
+ROLLING_WINDOWS = (7, 28)
+
+STATE_PATH = MODELS_DIR / "forecast_state.pkl"
+FORECAST_PATH = PROCESSED_DIR / "forecast_next_week.csv"
+
+
+def severity_group(sev_id):
+    return pd.Series(sev_id).map(SEVERITY_GROUPS).fillna("Other").to_numpy()
+
+
+def _prepare(df):
+    ts = pd.to_datetime(df[TIMESTAMP_COL], errors="coerce")
+    out = pd.DataFrame({
+        "day": ts.dt.normalize(),
+        "corridor": df["rpt_street_name"].fillna("").str.strip().str.upper(),
+        "severity": severity_group(df["crash_sev_id"]),
+    })
+    return out.dropna(subset=["day"])
+
+
+class CrashSeries:
+    """Daily crash counts per (corridor, severity) plus rolling aggregates."""
+
+    def __init__(self, corridors, end_day, history_days=HISTORY_DAYS):
+        self.corridors = list(corridors)
+        self.severities = ["KSI", "Other"]
+        self.keys = pd.MultiIndex.from_product([self.corridors + [ALL_CORRIDORS], self.severities],
+                                               names=["corridor", "severity"])
+        self.history_days = history_days
+        self.end_day = pd.Timestamp(end_day).normalize()
+        self.counts = np.zeros((len(self.keys), history_days), dtype=np.float32)
+
+    @property
+    def days(self):
+        return pd.date_range(end=self.end_day, periods=self.history_days, freq="D")
+
+    @classmethod
+    def from_frame(cls, df, top_corridors=TOP_CORRIDORS, history_days=HISTORY_DAYS):
+        rec = _prepare(df)
+        named = rec[~rec["corridor"].str.contains("NOT REPORTED|UNKNOWN", regex=True) & (rec["corridor"] != "")]
+        corridors = named["corridor"].value_counts().head(top_corridors).index
+        series = cls(corridors, rec["day"].max(), history_days)
+        series._add(rec)
+        return series
+
+    def _rows(self, rec):
+        """Series rows for each record: its own corridor (if tracked) and the all-corridor total."""
+        sev = pd.Index(self.severities).get_indexer(rec["severity"])
+        corridor = pd.Index(self.corridors).get_indexer(rec["corridor"])
+        n_sev = len(self.severities)
+        total_rows = len(self.corridors) * n_sev + sev
+        own_rows = np.where(corridor >= 0, corridor * n_sev + sev, -1)
+        return own_rows, total_rows
+
+    def _add(self, rec):
+        col = (rec["day"] - self.end_day).dt.days.to_numpy() + self.history_days - 1
+        keep = (col >= 0) & (col < self.history_days)
+        own_rows, total_rows = self._rows(rec)
+        np.add.at(self.counts, (total_rows[keep], col[keep]), 1)
+        own = keep & (own_rows >= 0)
+        np.add.at(self.counts, (own_rows[own], col[own]), 1)
+
+    def update(self, df):
+        """Fold new crash records in; shifts the window if they extend it."""
+        rec = _prepare(df)
+        if rec.empty:
+            return 0
+        newest = rec["day"].max()
+        shift = (newest - self.end_day).days
+        if shift > 0:
+            shift = min(shift, self.history_days)
+            self.counts = np.roll(self.counts, -shift, axis=1)
+            self.counts[:, -shift:] = 0
+            self.end_day = newest
+        self._add(rec)
+        return len(rec)
+
+    def rolling(self, windows=ROLLING_WINDOWS):
+        """Trailing sums ending at end_day for each window length."""
+        return pd.DataFrame({f"last_{w}d": self.counts[:, -w:].sum(axis=1) for w in windows}, index=self.keys)
+
+    def weekly(self):
+        """Weekly totals (series x weeks), weeks ending on end_day."""
+        n_weeks = self.history_days // 7
+        recent = self.counts[:, -n_weeks * 7:]
+        ends = pd.date_range(end=self.end_day, periods=n_weeks, freq="7D")
+        return pd.DataFrame(recent.reshape(len(self.keys), n_weeks, 7).sum(axis=2), index=self.keys, columns=ends)
+
+    def save(self, path=STATE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        state = {"corridors": self.corridors, "end_day": self.end_day,
+                 "history_days": self.history_days, "counts": self.counts}
+        with open(path, "wb") as f:
+            pkl.dump(state, f)
+
+    @classmethod
+    def load(cls, path=STATE_PATH):
+        with open(path, "rb") as f:
+            state = pkl.load(f)
+        series = cls(state["corridors"], state["end_day"], state["history_days"])
+        series.counts = state["counts"]
+        return series
+
+
+def fit_forecast(counts, end_day, horizon=7, alpha=0.05, shrink=8.0):
+    """Expected daily counts for the next `horizon` days, all series at once.
+
+    level   exponentially weighted mean of the daily counts (weights ~ (1-alpha)^age)
+    profile per-series weekday multipliers shrunk towards the pooled profile
+    """
+    n_series, n_days = counts.shape
+    age = np.arange(n_days)[::-1]
+    w = (1 - alpha) ** age
+    level = counts @ w / w.sum()
+
+    days = pd.date_range(end=end_day, periods=n_days, freq="D")
+    weekday = days.weekday.to_numpy()
+    onehot = np.eye(7, dtype=np.float32)[weekday]          # (days x 7)
+    per_dow = counts @ onehot / onehot.sum(axis=0)         # mean count per weekday
+    mean = counts.mean(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        profile = np.where(mean > 0, per_dow / mean, 1.0)
+    pooled = per_dow.sum(axis=0) / max(per_dow.sum(axis=0).mean(), 1e-9)
+    n = counts.sum(axis=1, keepdims=True)
+    profile = (n * profile + shrink * pooled) / (n + shrink)
+
+    future = pd.date_range(end_day + pd.Timedelta(days=1), periods=horizon, freq="D")
+    expected = level[:, None] * profile[:, future.weekday]
+    return future, expected
+
+
+def forecast_table(series, horizon=7, interval=0.9):
+    """Next-`horizon`-day forecast per series with Poisson intervals and rolling context."""
+    future, expected = fit_forecast(series.counts, series.end_day, horizon)
+    total = expected.sum(axis=1)
+    lo = stats.poisson.ppf((1 - interval) / 2, total)
+    hi = stats.poisson.ppf((1 + interval) / 2, total)
+    out = series.rolling().reset_index()
+    out["forecast_start"] = future[0].date()
+    out["forecast_end"] = future[-1].date()
+    out["expected_crashes"] = total
+    out["lower"] = lo
+    out["upper"] = hi
+    out["trend_vs_28d"] = np.where(out["last_28d"] > 0, total / (out["last_28d"] / 4), np.nan)
+    return out.sort_values(["severity", "expected_crashes"], ascending=[True, False], ignore_index=True)
+
+
+def backtest(series, holdout=28, horizon=7):
+    """Mean absolute error per horizon vs. a 28-day-average baseline."""
+    errors, baseline = [], []
+    for start in range(series.history_days - holdout, series.history_days - horizon + 1, horizon):
+        past = series.counts[:, :start]
+        actual = series.counts[:, start:start + horizon].sum(axis=1)
+        _, expected = fit_forecast(past, series.days[start - 1], horizon)
+        errors.append(np.abs(expected.sum(axis=1) - actual).mean())
+        baseline.append(np.abs(past[:, -28:].mean(axis=1) * horizon - actual).mean())
+    return float(np.mean(errors)), float(np.mean(baseline))
+
+
+def refresh(data=AUSTIN_CLEANSED_CSV, state_path=STATE_PATH, out=FORECAST_PATH):
+    df = pd.read_csv(data, usecols=[TIMESTAMP_COL, "rpt_street_name", "crash_sev_id"], low_memory=False)
+    series = CrashSeries.from_frame(df)
+    series.save(state_path)
+    forecast_table(series).to_csv(out, index=False)
+    return series
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Next-week crash forecast per corridor and severity")
+    parser.add_argument("--data", default=str(AUSTIN_CLEANSED_CSV))
+    parser.add_argument("--update", help="CSV of new crash records to fold into the saved state")
+    parser.add_argument("--out", default=str(FORECAST_PATH))
+    parser.add_argument("--backtest", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.update:
+        series = CrashSeries.load()
+        added = series.update(pd.read_csv(args.update, low_memory=False))
+        series.save()
+        forecast_table(series).to_csv(args.out, index=False)
+        print(f"Folded in {added:,} records; window ends {series.end_day.date()}")
+    else:
+        series = refresh(args.data, out=args.out)
+        print(f"Built {len(series.keys)} series ending {series.end_day.date()}")
+
+    if args.backtest:
+        mae, base = backtest(series)
+        print(f"Backtest MAE (7-day totals): model {mae:.3f} vs 28-day average {base:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import argparse
+import pickle as pkl
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import SGDRegressor
+from sklearn.preprocessing import StandardScaler
+
+ROOT = Path(__file__).resolve().parents[2]  # repo root
+sys.path.insert(0, str(ROOT / "src"))
+
+from ml.backends import DEFAULT_ENGINE, make_model
+from ml.features import BEST_RF_PARAMS, COST_FEATURES, TARGET, cost_xy
+from pipeline.cleanse import cleanse
+from pipeline.paths import AUSTIN_RAW_CSV, MODELS_DIR
+
+# Cost model over all 2018-2026 records instead of rf_model.ipynb's 35k sample.
+# The file is streamed in chunks (raw exports are cleansed on the fly) and one
+# of three strategies is used:
+#
+#   reservoir  stratified reservoir sample per crash_sev_id, fitted with the
+#              configured engine and weighted back to population counts
+#   rf_chunks  RandomForest grown with warm_start, a few trees per chunk
+#   sgd        linear model updated with partial_fit on every chunk
+#
+#   python src/ml/out_of_core.py --model reservoir --reservoir-size 20000
+
+TEST_FRACTION = 0.2
+STRATUM_COL = "crash_sev_id"
+
+
+def iter_feature_chunks(path, chunksize=100_000):
+    """(X, y, strata, is_test) per chunk; the split is stable across passes."""
+    for chunk_no, chunk in enumerate(pd.read_csv(path, chunksize=chunksize, low_memory=False)):
+        if "units_involved" in chunk.columns:
+            chunk = cleanse(chunk, dropna_subset=COST_FEATURES + [TARGET])
+        X, y = cost_xy(chunk)
+        strata = (chunk.loc[X.index, STRATUM_COL].fillna(-1).astype(int).to_numpy()
+                  if STRATUM_COL in chunk.columns else np.zeros(len(X), dtype=int))
+        is_test = np.random.default_rng(42 + chunk_no).random(len(X)) < TEST_FRACTION
+        yield X.to_numpy(np.float32), y.to_numpy(), strata, is_test
+
+
+class StratifiedReservoir:
+    """Uniform sample of up to `capacity` rows per stratum (Algorithm R)."""
+
+    def __init__(self, capacity, n_features, seed=42):
+        self.capacity = capacity
+        self.n_features = n_features
+        self.rng = np.random.default_rng(seed)
+        self.X, self.y, self.seen, self.filled = {}, {}, {}, {}
+
+    def add(self, X, y, strata):
+        for s in np.unique(strata):
+            rows = np.flatnonzero(strata == s)
+            if s not in self.X:
+                self.X[s] = np.empty((self.capacity, self.n_features), dtype=np.float32)
+                self.y[s] = np.empty(self.capacity, dtype=np.float64)
+                self.seen[s] = self.filled[s] = 0
+
+            # Fill empty slots first
+            free = min(self.capacity - self.filled[s], len(rows))
+            if free:
+                dst = slice(self.filled[s], self.filled[s] + free)
+                self.X[s][dst], self.y[s][dst] = X[rows[:free]], y[rows[:free]]
+                self.filled[s] += free
+            rest = rows[free:]
+            seen_before = self.seen[s] + free
+            self.seen[s] += len(rows)
+            if not len(rest):
+                continue
+
+            # Row number t (1-based) is kept with probability capacity / t
+            t = seen_before + np.arange(1, len(rest) + 1)
+            keep = self.rng.random(len(rest)) < self.capacity / t
+            slots = self.rng.integers(0, self.capacity, keep.sum())
+            self.X[s][slots], self.y[s][slots] = X[rest[keep]], y[rest[keep]]
+
+    def sample(self):
+        """(X, y, weight) with weights restoring each stratum's population share."""
+        keys = sorted(self.X)
+        X = np.concatenate([self.X[s][:self.filled[s]] for s in keys])
+        y = np.concatenate([self.y[s][:self.filled[s]] for s in keys])
+        w = np.concatenate([np.full(self.filled[s], self.seen[s] / self.filled[s]) for s in keys])
+        return X, y, w
+
+
+def train_reservoir(path, reservoir_size, chunksize, engine=None):
+    reservoir = StratifiedReservoir(reservoir_size, len(COST_FEATURES))
+    for X, y, strata, is_test in iter_feature_chunks(path, chunksize):
+        reservoir.add(X[~is_test], y[~is_test], strata[~is_test])
+    X, y, w = reservoir.sample()
+
+    engine = engine or DEFAULT_ENGINE
+    params = BEST_RF_PARAMS if engine == "rf" else {}
+    model = make_model("regressor", engine, random_state=42, **params)
+    model.fit(pd.DataFrame(X, columns=COST_FEATURES), y, sample_weight=w)
+    print(f"Reservoir: {len(y):,} rows from {sum(reservoir.seen.values()):,} "
+          f"({len(reservoir.X)} strata)")
+    return model
+
+
+def train_rf_chunks(path, chunksize, trees_per_chunk=5):
+    params = {k: v for k, v in BEST_RF_PARAMS.items() if k != "n_estimators"}
+    model = RandomForestRegressor(n_estimators=0, warm_start=True, n_jobs=-1, random_state=42, **params)
+    for X, y, _, is_test in iter_feature_chunks(path, chunksize):
+        if (~is_test).sum() < 2:
+            continue
+        model.n_estimators += trees_per_chunk
+        model.fit(pd.DataFrame(X[~is_test], columns=COST_FEATURES), y[~is_test])
+    return model
+
+
+class ScaledSGD:
+    """SGDRegressor on running-standardised features and a scaled target."""
+
+    def __init__(self):
+        self.scaler = StandardScaler()
+        self.model = SGDRegressor(random_state=42)
+        self.y_scale = None
+
+    def partial_fit(self, X, y):
+        self.scaler.partial_fit(X)
+        if self.y_scale is None:
+            self.y_scale = float(np.abs(y).mean()) or 1.0
+        self.model.partial_fit(self.scaler.transform(X), y / self.y_scale)
+
+    def predict(self, X):
+        return self.model.predict(self.scaler.transform(np.asarray(X))) * self.y_scale
+
+
+def train_sgd(path, chunksize, epochs=3):
+    model = ScaledSGD()
+    for _ in range(epochs):
+        for X, y, _, is_test in iter_feature_chunks(path, chunksize):
+            if (~is_test).any():
+                model.partial_fit(X[~is_test], y[~is_test])
+    return model
+
+
+def holdout_r2(model, path, chunksize):
+    """R^2 over every held-out row, accumulated chunk by chunk."""
+    n = sum_y = sum_y2 = sse = 0.0
+    for X, y, _, is_test in iter_feature_chunks(path, chunksize):
+        if not is_test.any():
+            continue
+        Xt = X[is_test]
+        pred = model.predict(pd.DataFrame(Xt, columns=COST_FEATURES) if not isinstance(model, ScaledSGD) else Xt)
+        yt = y[is_test]
+        n += len(yt)
+        sum_y += yt.sum()
+        sum_y2 += (yt ** 2).sum()
+        sse += ((yt - pred) ** 2).sum()
+    sst = sum_y2 - sum_y ** 2 / n if n else 0.0
+    return 1 - sse / sst if sst else float("nan")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Out-of-core cost model training")
+    parser.add_argument("--data", default=str(AUSTIN_RAW_CSV), help="raw or cleansed Austin CSV")
+    parser.add_argument("--model", choices=["reservoir", "rf_chunks", "sgd"], default="reservoir")
+    parser.add_argument("--engine", choices=["rf", "hgb"], default=None, help="engine for --model reservoir")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--reservoir-size", type=int, default=20_000, help="rows kept per severity stratum")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args(argv)
+
+    if args.model == "reservoir":
+        model = train_reservoir(args.data, args.reservoir_size, args.chunksize, args.engine)
+    elif args.model == "rf_chunks":
+        model = train_rf_chunks(args.data, args.chunksize)
+    else:
+        model = train_sgd(args.data, args.chunksize)
+
+    print(f"Holdout R^2: {holdout_r2(model, args.data, args.chunksize):.4f}")
+
+    out = Path(args.out or MODELS_DIR / f"cost_{args.model}.pkl")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "wb") as f:
+        pkl.dump(model, f)
+    print(f"Saved {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import argparse
+import itertools
+import pickle as pkl
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]  # repo root
+sys.path.insert(0, str(ROOT / "src"))
+
+from ml.countermeasures import COST_MODEL_PATH
+from ml.features import COST_FEATURES, cost_xy
+from pipeline.paths import AUSTIN_CLEANSED_CSV
+
+# What-if scenarios over the comprehensive-cost model.
+#
+# A scenario is a set of feature edits applied to a base population of crashes
+# ("every crash on N LAMAR BLVD at 45 mph"). All scenarios are evaluated
+# together: the base feature matrix is tiled once per scenario, the edits are
+# applied column-wise to the whole tiled matrix, and the model scores it in a
+# few large predict() calls with all cores. The result holds the per-crash
+# change in predicted cost for every scenario.
+#
+#   res = what_if(model, X, scenario_grid(crash_speed_limit=[30, 35, 40, 45]))
+#   res.summary()                 # one row per scenario: mean/total/percentiles of the deltas
+#
+#   python src/ml/scenarios.py --street "N LAMAR BLVD" --set crash_speed_limit=30,35,40,45
+
+OPS = {
+    "set": lambda base, v: np.broadcast_to(v, base.shape),
+    "add": lambda base, v: base + v,
+    "scale": lambda base, v: base * v,
+}
+MAX_ROWS_PER_PREDICT = 2_000_000
+QUANTILES = (0.05, 0.5, 0.95)
+
+
+def scenario_grid(**axes):
+    """Every combination of the given feature values, one scenario per row."""
+    names = list(axes)
+    return pd.DataFrame(list(itertools.product(*(axes[n] for n in names))), columns=names)
+
+
+def tiled_matrix(X, scenarios, ops=None):
+    """(len(scenarios) * len(X)) x features frame, scenario-major, with each scenario's edits applied."""
+    ops = ops or {}
+    base = X.to_numpy(dtype=np.float32)
+    n, s = len(base), len(scenarios)
+    tiled = np.tile(base, (s, 1))
+    for feature in scenarios.columns:
+        j = X.columns.get_loc(feature)
+        values = np.repeat(scenarios[feature].to_numpy(dtype=np.float32), n)
+        tiled[:, j] = OPS[ops.get(feature, "set")](tiled[:, j], values)
+    return pd.DataFrame(tiled, columns=X.columns, copy=False)
+
+
+@contextmanager
+def using_n_jobs(model, n_jobs=-1):
+    """Temporarily set a model's n_jobs (-1: forest trees predict on every core)."""
+    previous = getattr(model, "n_jobs", None)
+    if previous is not None:
+        model.n_jobs = n_jobs
+    try:
+        yield model
+    finally:
+        if previous is not None:
+            model.n_jobs = previous
+
+
+class WhatIf:
+    def __init__(self, scenarios, baseline, predicted):
+        self.scenarios = scenarios.reset_index(drop=True)
+        self.baseline = baseline                   # (crashes,)
+        self.predicted = predicted                 # (scenarios, crashes)
+        self.deltas = predicted - baseline         # negative = cheaper than today
+
+    def summary(self, quantiles=QUANTILES):
+        """Per scenario: mean and total delta, delta percentiles and share of crashes made cheaper."""
+        out = self.scenarios.copy()
+        out["mean_delta"] = self.deltas.mean(axis=1)
+        out["total_delta"] = self.deltas.sum(axis=1)
+        out["total_delta_pct"] = 100 * out["total_delta"] / self.baseline.sum()
+        for q, values in zip(quantiles, np.quantile(self.deltas, quantiles, axis=1)):
+            out[f"p{int(q * 100)}_delta"] = values
+        out["share_cheaper"] = (self.deltas < 0).mean(axis=1)
+        return out
+
+    def distribution(self, scenario, bins=30):
+        """Histogram (counts, edges) of per-crash deltas for one scenario row."""
+        return np.histogram(self.deltas[scenario], bins=bins)
+
+
+def what_if(model, X, scenarios, ops=None, max_rows=MAX_ROWS_PER_PREDICT):
+    """Predicted cost under every scenario for every crash in X, as one batched evaluation.
+
+    `scenarios` has one column per edited feature; `ops` maps a feature to
+    "set" (default), "add" or "scale".
+    """
+    unknown = set(scenarios.columns) - set(X.columns)
+    if unknown:
+        raise KeyError(f"Scenario features not in the model matrix: {sorted(unknown)}")
+    n = len(X)
+    # Whole scenarios per chunk so memory stays bounded for large grids
+    per_chunk = max(1, max_rows // max(n, 1))
+    preds = []
+    with using_n_jobs(model):
+        baseline = model.predict(X.astype(np.float32))
+        for start in range(0, len(scenarios), per_chunk):
+            chunk = scenarios.iloc[start:start + per_chunk]
+            preds.append(model.predict(tiled_matrix(X, chunk, ops)).reshape(len(chunk), n))
+    return WhatIf(scenarios, baseline, np.vstack(preds))
+
+
+# ---- CLI ----
+def _parse_axes(items, cast=float):
+    return {name: [cast(v) for v in values.split(",")] for name, values in (i.split("=", 1) for i in items)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Predicted cost deltas for feature what-if scenarios")
+    parser.add_argument("--data", default=str(AUSTIN_CLEANSED_CSV))
+    parser.add_argument("--model", default=str(COST_MODEL_PATH))
+    parser.add_argument("--street", help="base population: crashes on this rpt_street_name")
+    parser.add_argument("--set", nargs="*", default=[], metavar="FEATURE=V1,V2", help="absolute values to try")
+    parser.add_argument("--add", nargs="*", default=[], metavar="FEATURE=D1,D2", help="offsets to try")
+    parser.add_argument("--scale", nargs="*", default=[], metavar="FEATURE=F1,F2", help="factors to try")
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.data, low_memory=False)
+    if args.street:
+        df = df[df["rpt_street_name"] == args.street]
+    X, _ = cost_xy(df)
+    axes, ops = {}, {}
+    for op in ("set", "add", "scale"):
+        for feature, values in _parse_axes(getattr(args, op)).items():
+            if feature not in COST_FEATURES:
+                parser.error(f"{feature} is not a cost-model feature")
+            axes[feature], ops[feature] = values, op
+    if not axes:
+        parser.error("give at least one --set/--add/--scale")
+    with open(args.model, "rb") as f:
+        model = pkl.load(f)
+
+    res = what_if(model, X, scenario_grid(**axes), ops)
+    print(f"{len(res.scenarios):,} scenarios x {len(X):,} crashes; baseline predicted cost ${res.baseline.sum():,.0f}")
+    with pd.option_context("display.width", 200, "display.float_format", "{:,.1f}".format):
+        print(res.summary().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,220 @@
+import argparse
+import collections
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 from pathlib import Path
 
 from sklearn.model_selection import train_test_split
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import OneHotEncoder
-from sklearn.linear_model import LogisticRegression
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.pipeline import Pipeline
 
 # SAMPLE ML CODE TO GET STARTED
+#
+#   python src/ml/train.py                       # streamed, hashed MODEL, bounded memory
+#   python src/ml/train.py --encoding target     # streamed, smoothed target encoding
+#   python src/ml/train.py --mode memory         # original in-memory one-hot pipeline
 
 # ---- Paths ----
 ROOT = Path(__file__).resolve().parents[2] if __name__ != "__main__" else Path.cwd()
 DATA_PATH = ROOT / "data" / "processed" / "vehicles_2017to2023.csv"
 
-# ---- Load ----
-df = pd.read_csv(DATA_PATH)
-
 # ---- Minimal feature/target selection ----
 # Features: TRAV_SP (numeric), MODEL (categorical)
 # Target: is_make_ford (1 if MAKE == 'Ford', else 0)
 required_cols = ["TRAV_SP", "MODEL", "MAKE"]
-if not set(required_cols).issubset(df.columns):
-    raise ValueError(f"CSV must contain columns: {required_cols}")
 
-X = df[["TRAV_SP", "MODEL"]].copy()
-y = (df["MAKE"].astype(str).str.strip().str.upper() == "FORD").astype(int)
+N_HASH_FEATURES = 2 ** 18
+TEST_FRACTION = 0.2
+N_WORKERS = min(4, os.cpu_count() or 1)     # featurisation threads (and chunks read ahead)
+
+
+def _target(make):
+    return (make.astype(str).str.strip().str.upper() == "FORD").astype(int).to_numpy()
+
+
+def _clean_chunk(chunk):
+    if not set(required_cols).issubset(chunk.columns):
+        raise ValueError(f"CSV must contain columns: {required_cols}")
+    speed = pd.to_numeric(chunk["TRAV_SP"], errors="coerce")
+    mask = speed.notna() & chunk["MODEL"].notna()
+    return speed[mask].to_numpy(np.float32), chunk.loc[mask, "MODEL"].astype(str).to_numpy(), _target(chunk.loc[mask, "MAKE"])
+
+
+def iter_chunks(path, chunksize, sep=","):
+    """(chunk_no, speed, model, y, is_test) for every chunk of the vehicle file."""
+    reader = pd.read_csv(path, sep=sep, usecols=required_cols, dtype=str, chunksize=chunksize)
+    for chunk_no, chunk in enumerate(reader):
+        speed, model, y = _clean_chunk(chunk)
+        # Same split on every pass: seeded by chunk number
+        is_test = np.random.default_rng(42 + chunk_no).random(len(y)) < TEST_FRACTION
+        yield chunk_no, speed, model, y, is_test
+
+
+class HashedFeatures:
+    """TRAV_SP plus MODEL hashed into a fixed-width sparse space."""
+
+    def __init__(self, n_features=N_HASH_FEATURES):
+        self.hasher = FeatureHasher(n_features=n_features, input_type="string", alternate_sign=False)
+
+    def transform(self, speed, model, own=None):
+        if not len(model):  # FeatureHasher cannot transform zero rows
+            return sp.csr_matrix((0, self.hasher.n_features + 1), dtype=np.float64)
+        cat = self.hasher.transform([[f"MODEL={m}"] for m in model])
+        return sp.hstack([sp.csr_matrix(speed[:, None] / 100.0), cat], format="csr")
+
+    def update(self, model, y):
+        pass
+
+
+class TargetEncodedFeatures:
+    """TRAV_SP plus a smoothed running Ford-rate per MODEL.
+
+    In the first epoch the statistics only include chunks already trained on.
+    Later epochs pass the chunk's labels as `own`, and they are subtracted from
+    the final statistics, so a chunk is never encoded with its own labels.
+    Memory is bounded by the MODEL vocabulary.
+    """
+
+    def __init__(self, smoothing=20.0):
+        self.smoothing = smoothing
+        self.sums = pd.Series(dtype=np.float64)
+        self.counts = pd.Series(dtype=np.float64)
+
+    def transform(self, speed, model, own=None):
+        keys = pd.Index(model)
+        s = self.sums.reindex(keys).fillna(0).to_numpy()
+        n = self.counts.reindex(keys).fillna(0).to_numpy()
+        total, count = self.sums.sum(), self.counts.sum()
+        if own is not None:
+            g = pd.Series(own, index=keys).groupby(level=0)
+            s = s - g.sum().reindex(keys).to_numpy()
+            n = n - g.size().reindex(keys).to_numpy()
+            total, count = total - np.sum(own), count - len(own)
+        prior = total / count if count else 0.5
+        enc = (s + self.smoothing * prior) / (n + self.smoothing)
+        return sp.csr_matrix(np.column_stack([speed / 100.0, enc]).astype(np.float32))
+
+    def update(self, model, y):
+        g = pd.Series(y, index=model).groupby(level=0)
+        self.sums = self.sums.add(g.sum(), fill_value=0)
+        self.counts = self.counts.add(g.size(), fill_value=0)
+
+
+def train_streaming(path, encoding="hash", chunksize=200_000, epochs=1, sep=",", workers=N_WORKERS):
+    """Out-of-core logistic regression with partial_fit over file chunks.
+
+    Chunks are featurised on `workers` threads, at most `workers` chunks ahead
+    of the fit; the SGD updates themselves are sequential. The first epoch of
+    target encoding runs in order, since each chunk's encoding depends on the
+    chunks before it.
+    """
+    features = HashedFeatures() if encoding == "hash" else TargetEncodedFeatures()
+    clf = SGDClassifier(loss="log_loss", alpha=1e-5, random_state=42)
+
+    def featurize(item, leave_out=False):
+        chunk_no, speed, model, y, is_test = item
+        train = ~is_test
+        own = y[train] if leave_out else None
+        return features.transform(speed[train], model[train], own), model[train], y[train]
+
+    def fit(X, y):
+        # A chunk can be entirely held out (e.g. a short final chunk)
+        if len(y):
+            clf.partial_fit(X, y, classes=[0, 1])
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for epoch in range(epochs):
+            chunks = iter_chunks(path, chunksize, sep)
+            if encoding == "target" and epoch == 0:
+                for item in chunks:
+                    X, model, y = featurize(item)
+                    fit(X, y)
+                    features.update(model, y)
+                continue
+            # Bounded look-ahead. After the first epoch the target statistics are final, so
+            # each chunk is encoded with its own labels left out
+            pending = collections.deque()
+            for item in chunks:
+                pending.append(pool.submit(featurize, item, epoch > 0))
+                if len(pending) > workers:
+                    fit(*pending.popleft().result()[::2])
+            while pending:
+                fit(*pending.popleft().result()[::2])
+
+    # Second pass: score the held-out rows
+    correct = total = 0
+    for _, speed, model, y, is_test in iter_chunks(path, chunksize, sep):
+        if is_test.any():
+            pred = clf.predict(features.transform(speed[is_test], model[is_test]))
+            correct += int((pred == y[is_test]).sum())
+            total += int(is_test.sum())
+    return clf, features, (correct / total if total else float("nan"))
+
+
+def train_in_memory(path, sep=","):
+    # ---- Load ----
+    df = pd.read_csv(path, sep=sep)
+
+    if not set(required_cols).issubset(df.columns):
+        raise ValueError(f"CSV must contain columns: {required_cols}")
+
+    X = df[["TRAV_SP", "MODEL"]].copy()
+    y = (df["MAKE"].astype(str).str.strip().str.upper() == "FORD").astype(int)
+
+    # Drop rows with missing values in our small feature set
+    mask = X["TRAV_SP"].notna() & X["MODEL"].notna()
+    X, y = X[mask], y[mask]
+
+    # ---- Preprocess & model ----
+    numeric_features = ["TRAV_SP"]
+    categorical_features = ["MODEL"]
+
+    preprocess = ColumnTransformer(
+        transformers=[
+            ("num", "passthrough", numeric_features),
+            ("cat", OneHotEncoder(handle_unknown="ignore"), categorical_features),
+        ]
+    )
+
+    model = LogisticRegression(max_iter=1000)
+
+    clf = Pipeline(steps=[("prep", preprocess), ("model", model)])
 
-# Drop rows with missing values in our small feature set
-mask = X["TRAV_SP"].notna() & X["MODEL"].notna()
-X, y = X[mask], y[mask]
+    # ---- Train / evaluate ----
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
 
-# ---- Preprocess & model ----
-numeric_features = ["TRAV_SP"]
-categorical_features = ["MODEL"]
+    clf.fit(X_train, y_train)
+    return clf, clf.score(X_test, y_test)
 
-preprocess = ColumnTransformer(
-    transformers=[
-        ("num", "passthrough", numeric_features),
-        ("cat", OneHotEncoder(handle_unknown="ignore"), categorical_features),
-    ]
-)
 
-model = LogisticRegression(max_iter=1000)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vehicle MAKE classifier")
+    parser.add_argument("--data", default=str(DATA_PATH))
+    parser.add_argument("--sep", default=",", help="use '|' for the clean_data_csvs.py output")
+    parser.add_argument("--mode", choices=["stream", "memory"], default="stream")
+    parser.add_argument("--encoding", choices=["hash", "target"], default="hash")
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=N_WORKERS, help="featurisation threads")
+    args = parser.parse_args(argv)
 
-clf = Pipeline(steps=[("prep", preprocess), ("model", model)])
+    if args.mode == "memory":
+        _, acc = train_in_memory(args.data, sep=args.sep)
+    else:
+        _, _, acc = train_streaming(args.data, args.encoding, args.chunksize, args.epochs, args.sep,
+                                   args.workers)
 
-# ---- Train / evaluate ----
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
+    print(f"Test accuracy: {acc:.3f}")
 
-clf.fit(X_train, y_train)
-acc = clf.score(X_test, y_test)
 
-print(f"Test accuracy: {acc:.3f}")
+if __name__ == "__main__":
+    main()
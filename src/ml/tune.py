@@ -0,0 +1,216 @@
+import argparse
+import hashlib
+import json
+import math
+import pickle as pkl
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import KFold, ParameterGrid, train_test_split
+
+ROOT = Path(__file__).resolve().parents[2]  # repo root
+sys.path.insert(0, str(ROOT / "src"))
+
+from ml.features import cost_xy
+from pipeline.paths import AUSTIN_CLEANSED_CSV, MODELS_DIR
+
+# Successive-halving replacement for the GridSearchCV cell in rf_model.ipynb.
+#
+# Every configuration of the notebook grid starts on a small subsample with a
+# capped number of trees; only the best 1/ETA of each rung is promoted to the
+# next one, where the sample and tree budget grow by ETA. Fold splits and the
+# feature matrix are cached on disk. Each (rung, config) score is checkpointed
+# as its folds finish (flushed every CHECKPOINT_EVERY configs), keyed on the
+# data and the search settings, so an interrupted search resumes where it stopped.
+#
+#   python src/ml/tune.py                   # tune and save best model
+#   python src/ml/tune.py --resume          # continue an interrupted run
+
+PARAM_GRID = {
+    'n_estimators': [25, 50, 100, 200],
+    'criterion': ['squared_error'],
+    'max_depth': [3, 5, 10, None],
+    'min_samples_leaf': [1, 2, 4],
+    'max_features': ['sqrt', 'log2', None],
+}
+
+CACHE_DIR = MODELS_DIR / "tune_cache"
+CHECKPOINT_EVERY = 10
+
+
+def _file_digest(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:12]
+
+
+def _config_key(params):
+    return json.dumps(params, sort_keys=True)
+
+
+def checkpoint_path(csv_path, param_grid=PARAM_GRID, cv=5, eta=3, min_rows=2000, cache_dir=CACHE_DIR):
+    """Score checkpoint for one search: scores only carry over when the data and settings match."""
+    grid = hashlib.sha1(json.dumps(param_grid, sort_keys=True).encode()).hexdigest()[:8]
+    return Path(cache_dir) / f"halving_{_file_digest(csv_path)}_eta{eta}_cv{cv}_min{min_rows}_{grid}.json"
+
+
+def _save_checkpoint(state, checkpoint):
+    Path(checkpoint).parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(checkpoint).with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    tmp.replace(checkpoint)
+
+
+def load_matrices(csv_path, train_size=35000, test_size=5000, cache_dir=CACHE_DIR):
+    """Feature matrices for the search, cached per input-file digest."""
+    cache = Path(cache_dir) / f"data_{_file_digest(csv_path)}_{train_size}_{test_size}.npz"
+    if cache.exists():
+        z = np.load(cache, allow_pickle=False)
+        return z["x_train"], z["x_test"], z["y_train"], z["y_test"], z["columns"].tolist()
+
+    df = pd.read_csv(csv_path, low_memory=False)
+    X, y = cost_xy(df)
+    train_size = min(train_size, int(len(X) * 0.8))
+    test_size = min(test_size, len(X) - train_size)
+    x_train, x_test, y_train, y_test = train_test_split(
+        X, y, train_size=train_size, test_size=test_size, random_state=42
+    )
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(cache, x_train=x_train.to_numpy(np.float32), x_test=x_test.to_numpy(np.float32),
+             y_train=y_train.to_numpy(), y_test=y_test.to_numpy(), columns=np.array(X.columns, dtype=str))
+    return (x_train.to_numpy(np.float32), x_test.to_numpy(np.float32),
+            y_train.to_numpy(), y_test.to_numpy(), list(X.columns))
+
+
+def load_folds(n_rows, cv=5, cache_dir=CACHE_DIR):
+    """KFold indices computed once per training-set size."""
+    cache = Path(cache_dir) / f"folds_{n_rows}_{cv}.npz"
+    if cache.exists():
+        z = np.load(cache)
+        return [(z[f"train_{i}"], z[f"test_{i}"]) for i in range(cv)]
+    folds = list(KFold(n_splits=cv, shuffle=True, random_state=42).split(np.arange(n_rows)))
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(cache, **{f"train_{i}": tr for i, (tr, _) in enumerate(folds)},
+             **{f"test_{i}": te for i, (_, te) in enumerate(folds)})
+    return folds
+
+
+def _fit_score(params, n_estimators, X, y, train_idx, test_idx):
+    model = RandomForestRegressor(**dict(params, n_estimators=n_estimators), random_state=42)
+    model.fit(X[train_idx], y[train_idx])
+    return model.score(X[test_idx], y[test_idx])
+
+
+def rung_budgets(n_rows, n_candidates, eta=3, min_rows=2000, min_trees=10):
+    """(rows, tree cap) per rung; the last rung uses all rows and full trees."""
+    n_rungs = int(math.log(max(n_candidates, 1), eta)) + 1
+    budgets = []
+    for r in range(n_rungs):
+        scale = eta ** (r - n_rungs + 1)
+        rows = n_rows if r == n_rungs - 1 else max(min_rows, int(n_rows * scale))
+        trees = None if r == n_rungs - 1 else max(min_trees, int(200 * scale))
+        budgets.append((rows, trees))
+    return budgets
+
+
+def successive_halving(X, y, param_grid=PARAM_GRID, cv=5, eta=3, min_rows=2000,
+                       n_jobs=-1, checkpoint=None, resume=False, verbose=True):
+    candidates = list(ParameterGrid(param_grid))
+    folds = load_folds(len(X), cv)
+    # Shuffle each fold once; a rung uses a prefix of it, so rungs are nested
+    rng = np.random.RandomState(0)
+    folds = [(rng.permutation(tr), rng.permutation(te)) for tr, te in folds]
+
+    state = {"scores": {}}
+    if checkpoint and resume and Path(checkpoint).exists():
+        with open(checkpoint) as f:
+            state = json.load(f)
+
+    budgets = rung_budgets(len(X), len(candidates), eta, min_rows)
+    history = []
+    # Results arrive in submission order, so a config is complete after its cv folds
+    with Parallel(n_jobs=n_jobs, return_as="generator") as parallel:
+        for rung, (rows, tree_cap) in enumerate(budgets):
+            frac = rows / len(X)
+            rung_folds = [(tr[:max(1, int(len(tr) * frac))], te[:max(1, int(len(te) * frac))])
+                          for tr, te in folds]
+
+            if rung and budgets[rung - 1] == (rows, tree_cap):
+                # Same budget as the previous rung (small data): reuse its scores
+                for c in candidates:
+                    state["scores"][f"{rung}|{_config_key(c)}"] = state["scores"][f"{rung - 1}|{_config_key(c)}"]
+
+            todo = [c for c in candidates if f"{rung}|{_config_key(c)}" not in state["scores"]]
+            started = time.perf_counter()
+            jobs = [
+                delayed(_fit_score)(c, min(c["n_estimators"], tree_cap or c["n_estimators"]), X, y, tr, te)
+                for c in todo for tr, te in rung_folds
+            ]
+            fold_scores = []
+            for score in parallel(jobs):
+                fold_scores.append(score)
+                if len(fold_scores) % cv:
+                    continue
+                done = len(fold_scores) // cv
+                state["scores"][f"{rung}|{_config_key(todo[done - 1])}"] = float(np.mean(fold_scores[-cv:]))
+                if checkpoint and done % CHECKPOINT_EVERY == 0:
+                    _save_checkpoint(state, checkpoint)
+            if checkpoint:
+                _save_checkpoint(state, checkpoint)
+
+            scored = sorted(candidates, key=lambda c: state["scores"][f"{rung}|{_config_key(c)}"], reverse=True)
+            history.append({
+                "rung": rung, "rows": rows, "tree_cap": tree_cap, "candidates": len(candidates),
+                "fits": len(todo) * cv, "seconds": time.perf_counter() - started,
+                "best_score": state["scores"][f"{rung}|{_config_key(scored[0])}"],
+            })
+            if verbose:
+                h = history[-1]
+                print(f"rung {rung}: {h['candidates']:>3} configs x {rows:,} rows "
+                      f"(trees<={tree_cap or 'full'}) best={h['best_score']:.4f} in {h['seconds']:.1f}s")
+            if rung < len(budgets) - 1:
+                candidates = scored[:max(1, math.ceil(len(candidates) / eta))]
+            else:
+                candidates = scored
+
+    best = candidates[0]
+    return best, state["scores"][f"{len(budgets) - 1}|{_config_key(best)}"], history
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Successive-halving search for the cost regressor")
+    parser.add_argument("--data", default=str(AUSTIN_CLEANSED_CSV))
+    parser.add_argument("--out", default=str(MODELS_DIR / "HalvingSearchTreeRegressor.pkl"))
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--cv", type=int, default=5)
+    parser.add_argument("--min-rows", type=int, default=2000)
+    parser.add_argument("--resume", action="store_true")
+    args = parser.parse_args(argv)
+
+    x_train, x_test, y_train, y_test, columns = load_matrices(args.data)
+    checkpoint = checkpoint_path(args.data, cv=args.cv, eta=args.eta, min_rows=args.min_rows)
+    best_params, best_score, _ = successive_halving(
+        x_train, y_train, cv=args.cv, eta=args.eta, min_rows=args.min_rows,
+        checkpoint=checkpoint, resume=args.resume,
+    )
+
+    model = RandomForestRegressor(**best_params, n_jobs=-1, random_state=42)
+    model.fit(pd.DataFrame(x_train, columns=columns), y_train)
+    with open(args.out, "wb") as f:
+        pkl.dump(model, f)
+
+    print(best_params)
+    print(best_score)
+    print(f"Holdout R^2: {model.score(pd.DataFrame(x_test, columns=columns), y_test):.4f}")
+
+
+if __name__ == "__main__":
+    main()
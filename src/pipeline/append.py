@@ -0,0 +1,255 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]  # repo root
+sys.path.insert(0, str(ROOT / "src"))
+
+from app.crash_data import COST_COL, derive_columns
+from pipeline.lazy import lazy_import
+from pipeline.paths import PROCESSED_DIR
+
+cluster = lazy_import("sklearn.cluster")
+
+# Append-only store for the Austin crash export.
+#
+# Rows are keyed on `ID` (falling back to `Crash ID`) and partitioned by crash
+# year. A delta file is compared against the stored row hashes; only new or
+# changed rows get their derived columns, cluster assignment, filter-index
+# entries and aggregate contributions recomputed, and only the touched year
+# partitions are rewritten. Rows flagged `Is deleted` are removed; rows flagged
+# `Is temporary record` are stored as-is and replaced when the permanent
+# version arrives under the same key.
+#
+#   python src/pipeline/append.py --init atx_crash_2025.csv     # build the store
+#   python src/pipeline/append.py daily_export.csv              # merge a delta
+
+STORE_DIR = PROCESSED_DIR / "austin_store"
+N_CLUSTERS = 5
+CUBE_DIMS = ["Year", "Severity_Label", "rpt_street_name", "HOUR"]
+CUBE_MEASURES = {"n": None, "death_cnt": "death_cnt", "sus_serious_injry_cnt": "sus_serious_injry_cnt",
+                 "cost": COST_COL}
+INDEXED_COLUMNS = ["Year", "Severity_Label", "rpt_street_name"]
+
+
+def _key_column(df):
+    return "ID" if "ID" in df.columns else "Crash ID"
+
+
+def _flag(s):
+    if s.dtype == bool:
+        return s
+    return s.astype(str).str.strip().str.upper().isin(["TRUE", "1", "T"])
+
+
+def row_hashes(df):
+    """Per-row hash that does not depend on how read_csv typed each column
+    (1 vs 1.0, True vs "TRUE"), so an unchanged record always hashes the same."""
+    norm = {}
+    for col in df.columns:
+        s = df[col]
+        if s.dtype == object:
+            # read_csv leaves TRUE/FALSE columns with gaps as Python bools in an object column
+            is_bool = s.map(type).eq(bool)
+            if is_bool.any():
+                s = s.where(~is_bool, s[is_bool].map({True: "TRUE", False: "FALSE"}))
+        if s.dtype == bool:
+            text = s.map({True: "TRUE", False: "FALSE"})
+        else:
+            num = pd.to_numeric(s, errors="coerce")
+            text = s.astype(str).str.strip().str.upper().where(num.isna(), num.astype("float64").astype(str))
+        norm[col] = text.where(s.notna(), "")
+    return pd.util.hash_pandas_object(pd.DataFrame(norm, index=df.index), index=False).to_numpy()
+
+
+def cube_of(df):
+    """Counts and sums per cube cell for a set of rows."""
+    if df.empty:
+        return pd.DataFrame(columns=list(CUBE_MEASURES))
+    measures = pd.DataFrame({name: (1 if col is None else pd.to_numeric(df[col], errors="coerce").fillna(0))
+                             for name, col in CUBE_MEASURES.items()}, index=df.index)
+    keys = df[CUBE_DIMS].astype(object).where(df[CUBE_DIMS].notna(), "∅")
+    return measures.groupby([keys[d] for d in CUBE_DIMS]).sum()
+
+
+class AustinStore:
+    def __init__(self, path=STORE_DIR):
+        self.path = Path(path)
+        self.meta = {"version": 0, "rows": 0, "key": "ID", "raw_columns": []}
+        self.key_index = pd.Series(dtype="int64")      # key -> partition year
+        self.cube = pd.DataFrame(columns=list(CUBE_MEASURES))
+        self.filter_index = {c: {} for c in INDEXED_COLUMNS}
+        self.centroids = None
+        if (self.path / "meta.json").exists():
+            self._load()
+
+    # ---- Persistence ----
+    def _load(self):
+        with open(self.path / "meta.json") as f:
+            self.meta = json.load(f)
+        self.key_index = pd.read_pickle(self.path / "key_index.pkl")
+        self.cube = pd.read_pickle(self.path / "cube.pkl")
+        self.filter_index = pd.read_pickle(self.path / "filter_index.pkl")
+        centroids = self.path / "centroids.npy"
+        self.centroids = np.load(centroids) if centroids.exists() else None
+
+    def _save(self, partitions):
+        self.path.mkdir(parents=True, exist_ok=True)
+        for year, part in partitions.items():
+            part_path = self._partition_path(year)
+            if part.empty:
+                part_path.unlink(missing_ok=True)
+            else:
+                part.to_pickle(part_path)
+        self.key_index.to_pickle(self.path / "key_index.pkl")
+        self.cube.to_pickle(self.path / "cube.pkl")
+        pd.to_pickle(self.filter_index, self.path / "filter_index.pkl")
+        if self.centroids is not None:
+            np.save(self.path / "centroids.npy", self.centroids)
+        with open(self.path / "meta.json", "w") as f:
+            json.dump(self.meta, f, indent=1)
+
+    def _partition_path(self, year):
+        return self.path / f"part_{int(year)}.pkl"
+
+    def _partition(self, year):
+        path = self._partition_path(year)
+        return pd.read_pickle(path) if path.exists() else pd.DataFrame()
+
+    @property
+    def version(self):
+        return self.meta["version"]
+
+    def load_frame(self, years=None):
+        """Stored rows (all partitions or the given years)."""
+        paths = sorted(self.path.glob("part_*.pkl"))
+        if years is not None:
+            wanted = {int(y) for y in years}
+            paths = [p for p in paths if int(p.stem.split("_")[1]) in wanted]
+        frames = [pd.read_pickle(p) for p in paths]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    # ---- Derived state for changed rows only ----
+    def _assign_clusters(self, rows):
+        coords = rows[["latitude", "longitude"]]
+        valid = coords.notna().all(axis=1).to_numpy()
+        labels = np.full(len(rows), -1)
+        if self.centroids is None and valid.sum() >= N_CLUSTERS:
+            self.centroids = cluster.KMeans(n_clusters=N_CLUSTERS, random_state=42, n_init=10).fit(coords[valid]).cluster_centers_
+        if self.centroids is not None and valid.any():
+            d = ((coords[valid].to_numpy()[:, None, :] - self.centroids[None]) ** 2).sum(axis=2)
+            labels[valid] = d.argmin(axis=1)
+        rows["Risk_Cluster"] = labels
+        return rows
+
+    def _index_add(self, rows, key):
+        for col in INDEXED_COLUMNS:
+            index = self.filter_index[col]
+            for value, keys in rows.groupby(col, dropna=True)[key]:
+                index.setdefault(value, set()).update(keys.tolist())
+
+    def _index_remove(self, rows, key):
+        for col in INDEXED_COLUMNS:
+            index = self.filter_index[col]
+            for value, keys in rows.groupby(col, dropna=True)[key]:
+                bucket = index.get(value)
+                if bucket is not None:
+                    bucket.difference_update(keys.tolist())
+                    if not bucket:
+                        del index[value]
+
+    def _cube_combine(self, cells, sign):
+        if self.cube.empty:
+            return cells * sign
+        return self.cube.add(cells * sign, fill_value=0)
+
+    def rows_matching(self, column, values):
+        """Keys of stored rows whose `column` is in `values` (from the filter index)."""
+        index = self.filter_index[column]
+        return set().union(*(index.get(v, set()) for v in values))
+
+    # ---- Merge ----
+    def upsert(self, delta):
+        """Merge new/updated/deleted records; returns counts of what changed."""
+        key = _key_column(delta)
+        if not self.meta["raw_columns"]:
+            self.meta["key"] = key
+            self.meta["raw_columns"] = [c for c in delta.columns]
+        raw_cols = [c for c in self.meta["raw_columns"] if c in delta.columns]
+
+        delta = delta.dropna(subset=[key]).drop_duplicates(subset=[key], keep="last").copy()
+        delta[key] = delta[key].astype("int64")
+        delta["_row_hash"] = row_hashes(delta[raw_cols])
+        deleted = _flag(delta["Is deleted"]) if "Is deleted" in delta.columns else pd.Series(False, index=delta.index)
+
+        known = delta[key].isin(self.key_index.index)
+        stats = {"new": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+
+        # Load only the partitions that hold rows touched by the delta
+        touched_years = set(self.key_index.reindex(delta.loc[known, key]).dropna().astype(int))
+        partitions = {y: self._partition(y) for y in touched_years}
+
+        # Existing versions of touched keys
+        old_parts = [p[p[key].isin(delta[key])] for p in partitions.values() if not p.empty]
+        old = pd.concat(old_parts, ignore_index=True) if old_parts else pd.DataFrame(columns=[key, "_row_hash"])
+        old_hash = old.set_index(key)["_row_hash"] if not old.empty else pd.Series(dtype="uint64")
+        same = known & (delta[key].map(old_hash) == delta["_row_hash"]) & ~deleted
+        stats["unchanged"] = int(same.sum())
+
+        changed = delta[~same]
+        removed = old[old[key].isin(changed[key])] if not old.empty else old
+        stats["deleted"] = int((deleted & known).sum())
+        stats["updated"] = int((known & ~same & ~deleted).sum())
+        stats["new"] = int((~known & ~deleted).sum())
+
+        # Retract old contributions
+        if not removed.empty:
+            self.cube = self._cube_combine(cube_of(removed), sign=-1)
+            self._index_remove(removed, key)
+            for y in touched_years:
+                part = partitions[y]
+                partitions[y] = part[~part[key].isin(removed[key])]
+            self.key_index = self.key_index.drop(removed[key])
+
+        # Derive and add new contributions
+        added = changed[~deleted.loc[changed.index]].copy()
+        if not added.empty:
+            added = self._assign_clusters(derive_columns(added))
+            added["_part"] = added["Year"].fillna(0).astype(int)
+            for y, rows in added.groupby("_part"):
+                if y not in partitions:
+                    partitions[y] = self._partition(y)
+                partitions[y] = pd.concat([partitions[y], rows.drop(columns="_part")], ignore_index=True)
+            self.cube = self._cube_combine(cube_of(added), sign=1)
+            self._index_add(added, key)
+            self.key_index = pd.concat([self.key_index, added.set_index(key)["_part"]])
+
+        self.cube = self.cube[self.cube["n"] > 0]
+        if stats["new"] or stats["updated"] or stats["deleted"]:
+            self.meta["version"] += 1
+        self.meta["rows"] = int(len(self.key_index))
+        self._save(partitions)
+        return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge Austin crash records into the append store")
+    parser.add_argument("csv", help="full export (with --init) or delta file")
+    parser.add_argument("--init", action="store_true", help="start a new store from this file")
+    parser.add_argument("--store", default=str(STORE_DIR))
+    args = parser.parse_args(argv)
+
+    if args.init and Path(args.store).exists():
+        for p in Path(args.store).iterdir():
+            p.unlink()
+    store = AustinStore(args.store)
+    stats = store.upsert(pd.read_csv(args.csv, low_memory=False))
+    print(", ".join(f"{k}: {v:,}" for k, v in stats.items()) + f" -> version {store.version}, {store.meta['rows']:,} rows")
+
+
+if __name__ == "__main__":
+    main()
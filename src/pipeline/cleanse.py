@@ -0,0 +1,65 @@
+import pandas as pd
+
+# Port of "Data cleansing and feature creation.ipynb" so the pipeline can run it
+# without a notebook kernel.
+
+TIMESTAMP_COL = "Crash timestamp (US/Central)"
+
+# Categories seen in `units_involved` (the notebook derives them from the data;
+# we pin them so every refresh produces the same *_involved columns).
+UNIT_CATEGORIES = [
+    "train", "pedestrian", "motorcycle", "micromobility device", "e-scooter",
+    "motor vehicle", "large passenger vehicle", "other", "passenger car", "bicycle",
+]
+
+
+def extract_units(s):
+    a_list = []
+    for units in s.split('&'):
+        # The export is sometimes double-encoded, so accept both dashes
+        for unit in units.replace('â€“', '–').split('–'):
+            a_list.append(unit.strip())
+
+    return a_list
+
+
+def unit_categories(units_involved):
+    """Distinct unit categories present in a `units_involved` column."""
+    cats = set(i for s in units_involved.dropna().str.lower().map(extract_units).to_list() for i in s)
+    cats.discard('other/unknown')  # combine with "other"
+    return sorted(cats)
+
+
+def add_time_features(df):
+    ts = pd.to_datetime(df[TIMESTAMP_COL], errors='coerce')
+    df['day_of_week'] = ts.dt.weekday
+    df['week_of_year'] = ts.dt.isocalendar().week
+    df['hour_of_day'] = ts.dt.hour
+    return df
+
+
+def add_unit_flags(df, categories=UNIT_CATEGORIES):
+    units = df['units_involved'].fillna('').str.lower()
+    for cat in categories:
+        df[f'{cat}_involved'] = units.str.contains(cat, regex=False)
+    return df
+
+
+def cleanse(df, dropna_subset=None):
+    """Derive the time and unit features and drop incomplete rows.
+
+    The notebook dropped every row with any NaN; newer exports carry columns
+    that are always empty (e.g. `Reported street prefix`), so callers can pass
+    the columns that actually have to be complete.
+    """
+    df = add_time_features(df)
+    df = add_unit_flags(df)
+    df = df.drop(columns=['units_involved'])
+    return df.dropna(subset=dropna_subset)
+
+
+def cleanse_file(src, dst, dropna_subset=None):
+    df = pd.read_csv(src, low_memory=False)
+    df = cleanse(df, dropna_subset=dropna_subset)
+    df.to_csv(dst, index=False)
+    return len(df)
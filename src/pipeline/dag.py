@@ -0,0 +1,222 @@
+import csv
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from graphlib import TopologicalSorter
+from pathlib import Path
+
+# Small make-style runner: stages declare the files they read and write,
+# dependencies are inferred from those files, independent stages run
+# concurrently and a stage is only re-run when one of its inputs changed.
+
+
+class Stage:
+    def __init__(self, name, func, inputs=(), outputs=(), after=(), version="1"):
+        self.name = name
+        self.func = func
+        self.inputs = [str(p) for p in inputs]    # files or glob patterns
+        self.outputs = [str(p) for p in outputs]
+        self.after = list(after)                  # explicit ordering without a file link
+        self.version = version                    # bump to force a re-run after code changes
+
+    def resolved_inputs(self):
+        files = []
+        for pattern in self.inputs:
+            if glob.has_magic(pattern):
+                files.extend(sorted(glob.glob(pattern)))
+            else:
+                files.append(pattern)
+        return files
+
+    def __repr__(self):
+        return f"Stage({self.name!r})"
+
+
+class FileDigests:
+    """sha1 per file, re-hashed only when size or mtime changed."""
+
+    def __init__(self, cache=None):
+        self.cache = cache or {}
+        self.lock = threading.Lock()
+
+    def digest(self, path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        key = [st.st_size, st.st_mtime_ns]
+        with self.lock:
+            hit = self.cache.get(path)
+        if hit and hit[:2] == key:
+            return hit[2]
+
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        value = h.hexdigest()
+        with self.lock:
+            self.cache[path] = key + [value]
+        return value
+
+
+class Pipeline:
+    def __init__(self, stages, state_dir):
+        self.stages = {s.name: s for s in stages}
+        self.state_dir = Path(state_dir)
+        self.state_path = self.state_dir / "state.json"
+        self.timings_path = self.state_dir / "timings.csv"
+
+        producers = {}
+        for s in stages:
+            for out in s.outputs:
+                if out in producers:
+                    raise ValueError(f"{out} is produced by both {producers[out]} and {s.name}")
+                producers[out] = s.name
+
+        self.graph = {}
+        for s in stages:
+            deps = set(s.after)
+            for pattern in s.inputs:
+                for out, producer in producers.items():
+                    if out == pattern or (glob.has_magic(pattern) and Path(out).match(pattern)):
+                        deps.add(producer)
+            deps.discard(s.name)
+            unknown = deps - set(self.stages)
+            if unknown:
+                raise ValueError(f"{s.name} depends on unknown stage(s): {sorted(unknown)}")
+            self.graph[s.name] = deps
+
+        TopologicalSorter(self.graph).prepare()  # raises CycleError early
+
+    # ---- State ----
+    def _load_state(self):
+        if self.state_path.exists():
+            with open(self.state_path) as f:
+                return json.load(f)
+        return {"stages": {}, "digests": {}}
+
+    def _save_state(self, state):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(state, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.state_path)
+
+    def _fingerprint(self, stage, digests):
+        return {p: digests.digest(p) for p in stage.resolved_inputs()}
+
+    def _is_stale(self, stage, record, digests):
+        if record is None or record.get("version") != stage.version:
+            return True
+        if any(not os.path.exists(p) for p in stage.outputs):
+            return True
+        return record.get("inputs") != self._fingerprint(stage, digests)
+
+    def _selection(self, targets):
+        """Requested stages plus everything upstream of them."""
+        if not targets:
+            return set(self.stages)
+        selected, todo = set(), list(targets)
+        while todo:
+            name = todo.pop()
+            if name not in self.stages:
+                raise KeyError(f"Unknown stage: {name}")
+            if name not in selected:
+                selected.add(name)
+                todo.extend(self.graph[name])
+        return selected
+
+    # ---- Execution ----
+    def run(self, targets=None, force=False, max_workers=None, dry_run=False):
+        """Run stale stages in dependency order; returns {stage: status}."""
+        selected = self._selection(targets)
+        state = self._load_state()
+        digests = FileDigests(state.get("digests"))
+        state_lock = threading.Lock()
+
+        sorter = TopologicalSorter({n: self.graph[n] & selected for n in selected})
+        sorter.prepare()
+
+        status, timings = {}, []
+        run_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+
+        def execute(name):
+            stage = self.stages[name]
+            started = time.perf_counter()
+            print(f"▶ {name}")
+            stage.func()
+            missing = [p for p in stage.outputs if not os.path.exists(p)]
+            if missing:
+                raise FileNotFoundError(f"{name} did not produce: {missing}")
+            record = {
+                "version": stage.version,
+                "inputs": self._fingerprint(stage, digests),
+                "outputs": {p: digests.digest(p) for p in stage.outputs},
+            }
+            with state_lock:
+                state["stages"][name] = record
+                # Snapshot: other stages keep adding digests while the state is written
+                with digests.lock:
+                    state["digests"] = dict(digests.cache)
+                self._save_state(state)
+            return time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            running = {}
+            while sorter.is_active():
+                for name in sorter.get_ready():
+                    stage = self.stages[name]
+                    upstream = self.graph[name] & selected
+                    if any(status[d] in ("failed", "blocked") for d in upstream):
+                        status[name] = "blocked"
+                        sorter.done(name)
+                        continue
+                    rerun_upstream = any(status[d] in ("ran", "would run") for d in upstream)
+                    stale = (force or (rerun_upstream and dry_run)
+                             or self._is_stale(stage, state["stages"].get(name), digests))
+                    if not stale:
+                        status[name] = "up to date"
+                        timings.append((name, "up to date", 0.0))
+                        sorter.done(name)
+                    elif dry_run:
+                        status[name] = "would run"
+                        sorter.done(name)
+                    else:
+                        running[pool.submit(execute, name)] = name
+
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    name = running.pop(fut)
+                    try:
+                        seconds = fut.result()
+                        status[name] = "ran"
+                        timings.append((name, "ran", seconds))
+                        print(f"✅ {name} ({seconds:.1f}s)")
+                    except Exception:
+                        status[name] = "failed"
+                        timings.append((name, "failed", 0.0))
+                        print(f"❌ {name} failed\n{traceback.format_exc()}")
+                    sorter.done(name)
+
+        if not dry_run:
+            self._write_timings(run_id, timings)
+        return status
+
+    def _write_timings(self, run_id, timings):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        new_file = not self.timings_path.exists()
+        with open(self.timings_path, "a", newline="") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(["run_id", "stage", "status", "seconds"])
+            for name, stage_status, seconds in timings:
+                writer.writerow([run_id, name, stage_status, f"{seconds:.3f}"])
@@ -0,0 +1,196 @@
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]  # repo root
+sys.path.insert(0, str(ROOT / "src"))
+
+from pipeline.paths import PROCESSED_DIR
+
+# Relational layer over the five cleaned FARS tables.
+#
+# At ingest every table gets integer keys
+#     crash_key   = YEAR * 10^7 + ST_CASE
+#     vehicle_key = crash_key * 1000 + VEH_NO
+# and is stored sorted on them, so a one-to-many lookup is two binary searches
+# and a join is a single searchsorted pass instead of a pandas merge.
+#
+#   python src/pipeline/fars_join.py            # build data/processed/fars_index/
+#
+#   tables = FarsTables.load()
+#   tables.lookup("person", 2019, 480123)       # all drivers of one crash
+#   tables.vehicle_view()                       # vehicle + driver + factors + accident
+
+TABLES = {
+    "accident": "accident_2017to2023.csv",
+    "vehicle": "vehicle_2017to2023.csv",
+    "person": "person_2017to2023.csv",
+    "factor": "factor_2017to2023.csv",
+    "cevent": "cevent_2017to2023.csv",
+}
+VEHICLE_LEVEL = {"vehicle", "person", "factor"}
+INDEX_DIR = PROCESSED_DIR / "fars_index"
+
+
+def crash_key(year, st_case):
+    return np.asarray(year, dtype=np.int64) * 10_000_000 + np.asarray(st_case, dtype=np.int64)
+
+
+def vehicle_key(year, st_case, veh_no):
+    return crash_key(year, st_case) * 1000 + np.asarray(veh_no, dtype=np.int64)
+
+
+def _keyed(df, vehicle_level):
+    """Add integer keys and sort on them (stable, so row order within a key is kept)."""
+    year = pd.to_numeric(df["YEAR"], errors="coerce").fillna(0)
+    st_case = pd.to_numeric(df["ST_CASE"], errors="coerce").fillna(0)
+    df = df.assign(crash_key=crash_key(year, st_case))
+    if vehicle_level:
+        veh_no = pd.to_numeric(df["VEH_NO"], errors="coerce").fillna(0)
+        df["vehicle_key"] = vehicle_key(year, st_case, veh_no)
+        key = "vehicle_key"
+    else:
+        key = "crash_key"
+    return df.sort_values(key, kind="stable", ignore_index=True)
+
+
+def _first_match(sorted_keys, keys):
+    """Row of the first occurrence of each key in sorted_keys, -1 if absent."""
+    pos = np.searchsorted(sorted_keys, keys, side="left")
+    pos_c = np.minimum(pos, len(sorted_keys) - 1)
+    hit = (pos < len(sorted_keys)) & (sorted_keys[pos_c] == keys) if len(sorted_keys) else np.zeros(len(keys), bool)
+    return np.where(hit, pos, -1)
+
+
+def _take(df, rows, columns, prefix=""):
+    """Columns of df at rows, aligned with rows; NA where rows == -1."""
+    if not len(df):
+        return pd.DataFrame(np.nan, index=range(len(rows)), columns=columns).add_prefix(prefix)
+    out = df[columns].iloc[np.maximum(rows, 0)].reset_index(drop=True)
+    if (rows < 0).any():
+        out = out.where(pd.Series(rows >= 0), axis=0)
+    return out.add_prefix(prefix)
+
+
+class FarsTables:
+    def __init__(self, tables):
+        self.tables = tables
+        self.keys = {
+            name: df["vehicle_key" if name in VEHICLE_LEVEL else "crash_key"].to_numpy()
+            for name, df in tables.items()
+        }
+
+    # ---- Ingest / persistence ----
+    @classmethod
+    def from_csv(cls, folder=PROCESSED_DIR, sep="|"):
+        tables = {}
+        for name, file_name in TABLES.items():
+            path = Path(folder) / file_name
+            if path.exists():
+                tables[name] = _keyed(pd.read_csv(path, sep=sep, low_memory=False), name in VEHICLE_LEVEL)
+        return cls(tables)
+
+    def save(self, index_dir=INDEX_DIR):
+        index_dir = Path(index_dir)
+        index_dir.mkdir(parents=True, exist_ok=True)
+        for name, df in self.tables.items():
+            df.to_pickle(index_dir / f"{name}.pkl")
+
+    @classmethod
+    def load(cls, index_dir=INDEX_DIR):
+        return cls({p.stem: pd.read_pickle(p) for p in sorted(Path(index_dir).glob("*.pkl"))
+                    if p.stem in TABLES})
+
+    # ---- Lookups ----
+    def lookup(self, table, year, st_case, veh_no=None):
+        """All rows of `table` for one crash (or one vehicle of it)."""
+        df, keys = self.tables[table], self.keys[table]
+        if table in VEHICLE_LEVEL:
+            if veh_no is None:
+                lo_key, hi_key = vehicle_key(year, st_case, 0), vehicle_key(year, st_case, 999)
+            else:
+                lo_key = hi_key = vehicle_key(year, st_case, veh_no)
+        else:
+            lo_key = hi_key = crash_key(year, st_case)
+        lo = np.searchsorted(keys, lo_key, side="left")
+        hi = np.searchsorted(keys, hi_key, side="right")
+        return df.iloc[lo:hi]
+
+    def _crash_keys(self, table):
+        return self.tables[table]["crash_key"].to_numpy()
+
+    # ---- Prejoined views ----
+    def factor_lists(self, level="vehicle"):
+        """'; '-joined MFACTORNAME per vehicle (or per crash), keyed and sorted."""
+        factor = self.tables["factor"]
+        key = "vehicle_key" if level == "vehicle" else "crash_key"
+        names = factor.loc[~factor["MFACTORNAME"].isin(["None", "Not Reported"]), [key, "MFACTORNAME"]].dropna()
+        grouped = names.groupby(key, sort=False)["MFACTORNAME"].agg(lambda s: "; ".join(dict.fromkeys(s)))
+        return grouped.index.to_numpy(), grouped.to_numpy()
+
+    def vehicle_view(self, accident_columns=None, person_columns=None):
+        """One row per vehicle: vehicle + its driver + factor list + crash columns."""
+        vehicle = self.tables["vehicle"]
+        vkeys = self.keys["vehicle"]
+        out = vehicle.reset_index(drop=True)
+
+        if "person" in self.tables:
+            person = self.tables["person"]
+            cols = person_columns or [c for c in ("AGE", "SEX", "DRINKING", "REST_USE", "REST_MIS") if c in person.columns]
+            out = pd.concat([out, _take(person, _first_match(self.keys["person"], vkeys), cols, "DRIVER_")], axis=1)
+
+        if "factor" in self.tables:
+            fkeys, flists = self.factor_lists("vehicle")
+            rows = _first_match(fkeys, vkeys)
+            out["FACTORS"] = np.where(rows >= 0, flists[np.maximum(rows, 0)] if len(flists) else "", "")
+
+        if "accident" in self.tables:
+            accident = self.tables["accident"]
+            cols = accident_columns or [c for c in accident.columns
+                                        if c not in out.columns and c not in ("crash_key",)]
+            rows = _first_match(self.keys["accident"], vehicle["crash_key"].to_numpy())
+            out = pd.concat([out, _take(accident, rows, cols)], axis=1)
+        return out
+
+    def crash_view(self):
+        """One row per crash: accident + vehicle/driver counts + crash factor list."""
+        accident = self.tables["accident"].reset_index(drop=True)
+        akeys = self.keys["accident"]
+        out = accident.copy()
+
+        for table, col in (("vehicle", "N_VEHICLES"), ("person", "N_DRIVERS"), ("factor", "N_FACTOR_ROWS"),
+                           ("cevent", "N_EVENTS")):
+            if table in self.tables:
+                ck = self._crash_keys(table)  # vehicle_key order is crash_key order too
+                lo = np.searchsorted(ck, akeys, side="left")
+                hi = np.searchsorted(ck, akeys, side="right")
+                out[col] = hi - lo
+
+        if "factor" in self.tables:
+            fkeys, flists = self.factor_lists("crash")
+            rows = _first_match(fkeys, akeys)
+            out["FACTORS"] = np.where(rows >= 0, flists[np.maximum(rows, 0)] if len(flists) else "", "")
+        return out
+
+
+def build_index(folder=PROCESSED_DIR, index_dir=INDEX_DIR):
+    tables = FarsTables.from_csv(folder)
+    tables.save(index_dir)
+    for name, df in tables.tables.items():
+        print(f"Indexed {name}: {len(df):,} rows")
+    return tables
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build sorted key indexes for the FARS tables")
+    parser.add_argument("--data", default=str(PROCESSED_DIR))
+    parser.add_argument("--out", default=str(INDEX_DIR))
+    args = parser.parse_args(argv)
+    build_index(args.data, args.out)
+
+
+if __name__ == "__main__":
+    main()
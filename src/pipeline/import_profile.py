@@ -0,0 +1,110 @@
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]  # repo root
+sys.path.insert(0, str(ROOT / "src"))
+
+# Import-time audit for the entry points (CLIs, report scripts, Streamlit apps).
+#
+# Only the module-level import statements of each script are executed, in a
+# fresh interpreter under `python -X importtime`, so nothing is trained or
+# rendered. Time is attributed to top-level packages (self time summed over
+# all their submodules) and imported names the script never uses are flagged.
+#
+#   python src/pipeline/import_profile.py                        # every entry point
+#   python src/pipeline/import_profile.py data/processed/bi_ai_atx.py --top 5
+
+SCRIPT_GLOBS = ["data/*.py", "data/processed/*.py"]          # run top to bottom
+MODULE_GLOBS = ["src/app/*.py", "src/ml/*.py", "src/pipeline/*.py"]
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def entry_points(root=ROOT):
+    """The report scripts plus every src module with a __main__ guard or a Streamlit page."""
+    found = [path for pattern in SCRIPT_GLOBS for path in sorted(root.glob(pattern))]
+    for pattern in MODULE_GLOBS:
+        for path in sorted(root.glob(pattern)):
+            text = path.read_text(encoding="utf-8", errors="replace")
+            if '__name__ == "__main__"' in text or "import streamlit" in text:
+                found.append(path)
+    return found
+
+
+def _module_imports(tree):
+    """Top-level import nodes (including ones inside module-level if/try blocks)."""
+    nodes = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            nodes.append(node)
+        elif isinstance(node, (ast.If, ast.Try)):
+            nodes.extend(_module_imports(ast.Module(body=node.body, type_ignores=[])))
+    return nodes
+
+
+def unused_imports(tree, imports):
+    """Names bound by the imports that are never referenced elsewhere in the script."""
+    used = {n.id for n in ast.walk(tree) if isinstance(n, ast.Name)}
+    unused = []
+    for node in imports:
+        for alias in node.names:
+            bound = alias.asname or alias.name.split(".")[0]
+            if bound != "*" and bound not in used:
+                unused.append(alias.name if isinstance(node, ast.Import) else f"{node.module}.{alias.name}")
+    return unused
+
+
+def profile_imports(script):
+    """(total seconds, {package: self seconds}, unused names) for one script's imports."""
+    script = Path(script).resolve()
+    tree = ast.parse(script.read_text(encoding="utf-8", errors="replace"))
+    imports = _module_imports(tree)
+    code = "\n".join([f"import sys; sys.path[:0] = [{str(ROOT / 'src')!r}, {str(ROOT / 'data')!r}]"]
+                     + [ast.unparse(n) for n in imports])
+    env = dict(os.environ, MPLBACKEND="Agg")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=script.parent,
+                          env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    per_package = defaultdict(float)
+    total = 0.0
+    for line in proc.stderr.splitlines():
+        m = IMPORTTIME_LINE.match(line)
+        if not m:
+            continue
+        self_us, cum_us, indent, name = int(m[1]), int(m[2]), m[3], m[4]
+        per_package[name.split(".")[0]] += self_us / 1e6
+        if len(indent) <= 1:   # outermost imports; their cumulative times add up to the total
+            total += cum_us / 1e6
+    return total, dict(per_package), unused_imports(tree, imports)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-package import cost of each entry point")
+    parser.add_argument("scripts", nargs="*", help="entry points (default: all)")
+    parser.add_argument("--top", type=int, default=8, help="packages to list per script")
+    args = parser.parse_args(argv)
+
+    scripts = [Path(s) for s in args.scripts] or entry_points()
+    for script in scripts:
+        name = Path(script).resolve().relative_to(ROOT)
+        try:
+            total, per_package, unused = profile_imports(script)
+        except RuntimeError as exc:
+            print(f"\n{name}: import failed ({exc})")
+            continue
+        print(f"\n{name}: {total:.2f}s")
+        for package, seconds in sorted(per_package.items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"  {package:<24} {seconds:6.3f}s")
+        if unused:
+            print(f"  unused: {', '.join(unused)}")
+
+
+if __name__ == "__main__":
+    main()
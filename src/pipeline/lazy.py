@@ -0,0 +1,62 @@
+import importlib
+import threading
+
+# Deferred imports for the heavy libraries (sklearn, scipy, seaborn, ...).
+#
+# sklearn alone costs over a second to import, and most entry points only need
+# it on one code path. lazy_import() returns a stand-in that imports the real
+# module on first attribute access, so
+#
+#   ensemble = lazy_import("sklearn.ensemble")
+#   ...
+#   model = ensemble.RandomForestRegressor()     # sklearn is imported here
+#
+# keeps module-level code unchanged apart from the qualified name. load_all()
+# imports every stand-in handed out so far, e.g. before timing code that uses them.
+
+_lock = threading.Lock()
+_stand_ins = []
+
+
+class LazyModule:
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_module"] or importlib.import_module(self._name)
+                self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    """Module `name` if already imported, else a stand-in that imports it on first use."""
+    module = importlib.sys.modules.get(name)
+    if module is not None:
+        return module
+    stand_in = LazyModule(name)
+    _stand_ins.append(stand_in)
+    return stand_in
+
+
+def load_all():
+    """Import the real module behind every lazy_import() stand-in; returns their names."""
+    for stand_in in _stand_ins:
+        stand_in._load()
+    return [s._name for s in _stand_ins]
@@ -0,0 +1,37 @@
+import hashlib
+import os
+from pathlib import Path
+
+# ---- Repo layout ----
+# Every path can be overridden with an environment variable so the same code
+# runs on a laptop and on the Linux batch host.
+ROOT = Path(__file__).resolve().parents[2]  # repo root
+
+DATA_DIR = Path(os.environ.get("PNBI_DATA_DIR", ROOT / "data"))
+PROCESSED_DIR = Path(os.environ.get("PNBI_PROCESSED_DIR", DATA_DIR / "processed"))
+MODELS_DIR = Path(os.environ.get("PNBI_MODELS_DIR", DATA_DIR / "models"))
+
+# Raw FARS yearly extracts (vehicle_2017.csv, accident_2017.csv, ...)
+FARS_RAW_DIR = Path(os.environ.get("FARS_RAW_DIR", DATA_DIR / "raw" / "fars"))
+
+# Austin open-data export and its cleansed/feature version
+AUSTIN_RAW_CSV = Path(os.environ.get("AUSTIN_RAW_CSV", DATA_DIR / "atx_crash_data_2018-2026.csv"))
+AUSTIN_CLEANSED_CSV = DATA_DIR / "atx_crash_data_2018-2026_cleansed.csv"
+# Local road centreline file (GeoJSON, or CSV with a WKT geometry column)
+AUSTIN_SEGMENTS = Path(os.environ.get("AUSTIN_SEGMENTS", DATA_DIR / "austin_street_segments.geojson"))
+
+# Pipeline bookkeeping (fingerprints, timings, per-file sidecars)
+PIPELINE_DIR = Path(os.environ.get("PNBI_PIPELINE_DIR", DATA_DIR / ".pipeline"))
+SIDECAR_DIR = PIPELINE_DIR / "sidecars"
+
+# Small derived artefacts the apps can rebuild at any time (summaries, figure caches)
+CACHE_DIR = Path(os.environ.get("PNBI_CACHE_DIR", DATA_DIR / ".cache"))
+
+
+def sidecar_path(src, suffix):
+    """File derived from `src` (a validation report, coordinate cache, ...), kept out of the data folders.
+
+    Keyed by the source's resolved path, so files with the same name in different folders do not collide.
+    """
+    src = Path(src).resolve()
+    return SIDECAR_DIR / f"{src.stem}.{hashlib.sha1(str(src).encode()).hexdigest()[:8]}{suffix}"
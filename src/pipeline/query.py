@@ -0,0 +1,136 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import duckdb
+
+ROOT = Path(__file__).resolve().parents[2]  # repo root
+sys.path.insert(0, str(ROOT / "src"))
+
+from pipeline.fars_join import TABLES as FARS_TABLES
+from pipeline.paths import AUSTIN_CLEANSED_CSV, PROCESSED_DIR
+
+# In-process SQL over columnar copies of the processed datasets.
+#
+# The CSVs are converted once to Parquet (pipeline stage `parquet`); queries
+# then run in DuckDB, which only reads the columns and row groups a query
+# needs and aggregates on all cores. No database server is involved.
+#
+#   python src/pipeline/query.py --convert
+#   python src/pipeline/query.py "SELECT YEAR, SUM(FATALS) FROM accident GROUP BY 1 ORDER BY 1"
+#
+#   from pipeline.query import query
+#   query("SELECT rpt_street_name, COUNT(*) n FROM austin_crashes WHERE year = ? GROUP BY 1", [2024])
+
+PARQUET_DIR = PROCESSED_DIR / "parquet"
+THREADS = int(os.environ.get("PNBI_QUERY_THREADS", os.cpu_count() or 1))
+
+AUSTIN_SOURCES = {
+    "austin_crashes": AUSTIN_CLEANSED_CSV,
+    "austin_2025": PROCESSED_DIR / "atx_crash_2025.csv",
+}
+
+# Typed helper columns added to the Austin tables so filters push down
+AUSTIN_DERIVED = """
+    try_strptime("Crash timestamp (US/Central)", '%m/%d/%Y %H:%M') AS crash_ts,
+    year(try_strptime("Crash timestamp (US/Central)", '%m/%d/%Y %H:%M')) AS year,
+    hour(try_strptime("Crash timestamp (US/Central)", '%m/%d/%Y %H:%M')) AS hour
+"""
+
+
+def parquet_path(table, parquet_dir=PARQUET_DIR):
+    return Path(parquet_dir) / f"{table}.parquet"
+
+
+def convert_to_parquet(processed_dir=PROCESSED_DIR, parquet_dir=PARQUET_DIR, austin_sources=None):
+    """Write one zstd Parquet file per available dataset; returns the table names."""
+    parquet_dir = Path(parquet_dir)
+    parquet_dir.mkdir(parents=True, exist_ok=True)
+    con = duckdb.connect()
+    con.execute(f"SET threads = {THREADS}")
+    written = []
+
+    for table, file_name in FARS_TABLES.items():
+        src = Path(processed_dir) / file_name
+        if src.exists():
+            con.execute(f"""
+                COPY (SELECT * FROM read_csv_auto(?, delim='|', header=true, sample_size=-1))
+                TO '{parquet_path(table, parquet_dir)}' (FORMAT parquet, COMPRESSION zstd)
+            """, [str(src)])
+            written.append(table)
+
+    for table, src in (austin_sources or AUSTIN_SOURCES).items():
+        if Path(src).exists():
+            con.execute(f"""
+                COPY (SELECT *, {AUSTIN_DERIVED}
+                      FROM read_csv_auto(?, header=true, sample_size=-1))
+                TO '{parquet_path(table, parquet_dir)}' (FORMAT parquet, COMPRESSION zstd)
+            """, [str(src)])
+            written.append(table)
+    con.close()
+    return written
+
+
+def connect(parquet_dir=PARQUET_DIR, threads=THREADS):
+    """DuckDB connection with one view per converted dataset."""
+    con = duckdb.connect()
+    con.execute(f"SET threads = {threads}")
+    for path in sorted(Path(parquet_dir).glob("*.parquet")):
+        con.execute(f"CREATE VIEW {path.stem} AS SELECT * FROM read_parquet('{path}')")
+    return con
+
+
+_connection = None
+
+
+def query(sql, params=None):
+    """Run SQL against the shared connection and return a pandas DataFrame."""
+    global _connection
+    if _connection is None:
+        _connection = connect()
+    # Cursors share the catalog but can be used from several threads
+    return _connection.cursor().execute(sql, params or []).df()
+
+
+# ---- Ready-made queries for the dashboards / report scripts ----
+def fatalities_by_weekday():
+    return query("""
+        SELECT DAY_WEEKNAME, SUM(FATALS) AS FATALS
+        FROM accident GROUP BY DAY_WEEKNAME
+    """)
+
+
+def street_risk_index(years, severities=None, hour_range=(0, 23), limit=10, table="austin_crashes"):
+    """Top streets by incident count for the portal filters."""
+    sev_clause = "AND crash_sev_id IN (SELECT UNNEST(?))" if severities else ""
+    params = [list(years), hour_range[0], hour_range[1]] + ([list(severities)] if severities else []) + [limit]
+    return query(f"""
+        SELECT rpt_street_name AS "Street Name",
+               COUNT(*) AS "Total Incidents",
+               SUM(death_cnt) AS "Death Count",
+               SUM(sus_serious_injry_cnt) AS "Serious Injuries",
+               SUM("Estimated Total Comprehensive Cost") AS "Total Comprehensive Cost"
+        FROM {table}
+        WHERE year IN (SELECT UNNEST(?)) AND hour BETWEEN ? AND ?
+          AND rpt_street_name IS NOT NULL
+          AND NOT regexp_matches(upper(rpt_street_name), 'NOT REPORTED|UNKNOWN')
+          {sev_clause}
+        GROUP BY 1 ORDER BY 2 DESC LIMIT ?
+    """, params)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQL over the processed crash datasets")
+    parser.add_argument("sql", nargs="?", help="query to run")
+    parser.add_argument("--convert", action="store_true", help="(re)build the Parquet copies first")
+    args = parser.parse_args(argv)
+
+    if args.convert:
+        print("Converted:", ", ".join(convert_to_parquet()) or "nothing")
+    if args.sql:
+        print(query(args.sql).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
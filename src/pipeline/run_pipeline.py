@@ -0,0 +1,189 @@
+import argparse
+import functools
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]  # repo root
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "data"))
+
+import clean_data_csvs
+from ml.cost_model import train_cost_model
+from ml.countermeasures import COUNTERMEASURES_PATH
+from ml.countermeasures import refresh as refresh_countermeasures
+from ml.features import COST_FEATURES, TARGET
+from ml.forecast import FORECAST_PATH, STATE_PATH
+from ml.forecast import refresh as refresh_forecast
+from pipeline.cleanse import cleanse_file
+from pipeline.dag import Pipeline, Stage
+from pipeline.fars_join import INDEX_DIR, TABLES, build_index
+from pipeline.paths import (AUSTIN_CLEANSED_CSV, AUSTIN_RAW_CSV, AUSTIN_SEGMENTS, FARS_RAW_DIR,
+                            MODELS_DIR, PIPELINE_DIR, PROCESSED_DIR)
+from pipeline.query import AUSTIN_SOURCES, convert_to_parquet, parquet_path
+from pipeline.spatial import SPATIAL_PATH, build_fars_geo, build_spatial, geo_cache_path
+from pipeline.validate import validate_file, validation_paths
+
+# End-to-end refresh: raw FARS + Austin exports -> cleansed tables -> model -> report images.
+#
+#   python src/pipeline/run_pipeline.py              # run whatever is out of date
+#   python src/pipeline/run_pipeline.py cost_model   # one target and its upstream
+#   python src/pipeline/run_pipeline.py --dry-run    # show what would run
+
+COST_MODEL_PATH = MODELS_DIR / "cost_rf.pkl"
+COST_IMPORTANCE_PATH = MODELS_DIR / "rf_feature_importance.csv"
+
+
+def run_script(script, cwd=PROCESSED_DIR):
+    """Run one of the existing report scripts headless in its own folder."""
+    env = dict(os.environ, MPLBACKEND="Agg")
+    subprocess.run([sys.executable, str(script)], cwd=cwd, env=env, check=True)
+
+
+def clean_fars(name):
+    PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
+    clean_data_csvs.process_dataset(
+        name, clean_data_csvs.datasets[name],
+        input_folder=str(FARS_RAW_DIR), output_folder=str(PROCESSED_DIR),
+    )
+
+
+def cleanse_austin():
+    rows = cleanse_file(AUSTIN_RAW_CSV, AUSTIN_CLEANSED_CSV, dropna_subset=COST_FEATURES + [TARGET])
+    print(f"Cleansed Austin rows: {rows:,}")
+
+
+def validate_austin():
+    report = validate_file(AUSTIN_CLEANSED_CSV)
+    print(f"Validated Austin rows: {report['rows']:,} ({report['errors']} error(s), {report['warnings']} warning(s))")
+
+
+def austin_spatial():
+    keys, _ = build_spatial(AUSTIN_CLEANSED_CSV, AUSTIN_SEGMENTS, SPATIAL_PATH)
+    print(f"Spatial keys: {(keys['cell_id'] >= 0).sum():,} crashes in grid cells, "
+          f"{(keys['segment_id'] >= 0).sum():,} on road segments")
+
+
+def cost_model():
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    train_cost_model(AUSTIN_CLEANSED_CSV, COST_MODEL_PATH, COST_IMPORTANCE_PATH)
+
+
+def build_stages():
+    stages = []
+
+    # ---- FARS cleaning: one independent stage per table ----
+    for name, config in clean_data_csvs.datasets.items():
+        stages.append(Stage(
+            f"fars_{name}", functools.partial(clean_fars, name),
+            inputs=[FARS_RAW_DIR / config["pattern"]],
+            outputs=[PROCESSED_DIR / config["output"]],
+        ))
+
+    # ---- Sorted key indexes over the cleaned FARS tables ----
+    stages.append(Stage(
+        "fars_index", build_index,
+        inputs=[PROCESSED_DIR / file_name for file_name in TABLES.values()],
+        outputs=[INDEX_DIR / f"{name}.pkl" for name in TABLES],
+    ))
+
+    # ---- Parquet copies for the SQL layer ----
+    stages.append(Stage(
+        "parquet", convert_to_parquet,
+        inputs=[PROCESSED_DIR / file_name for file_name in TABLES.values()] + list(AUSTIN_SOURCES.values()),
+        outputs=[parquet_path(name) for name in list(TABLES) + list(AUSTIN_SOURCES)],
+    ))
+
+    # ---- Austin cleansing, features and cost model ----
+    stages.append(Stage(
+        "austin_cleanse", cleanse_austin,
+        inputs=[AUSTIN_RAW_CSV, ROOT / "src" / "pipeline" / "cleanse.py"],
+        outputs=[AUSTIN_CLEANSED_CSV],
+    ))
+    stages.append(Stage(
+        "austin_validate", validate_austin,
+        inputs=[AUSTIN_CLEANSED_CSV, ROOT / "src" / "pipeline" / "validate.py"],
+        outputs=list(validation_paths(AUSTIN_CLEANSED_CSV)),
+    ))
+    stages.append(Stage(
+        "austin_spatial", austin_spatial,
+        inputs=[AUSTIN_CLEANSED_CSV, AUSTIN_SEGMENTS, ROOT / "src" / "pipeline" / "spatial.py"],
+        outputs=[SPATIAL_PATH],
+    ))
+    stages.append(Stage(
+        "cost_model", cost_model,
+        inputs=[AUSTIN_CLEANSED_CSV] + [ROOT / "src" / "ml" / f for f in ("features.py", "cost_model.py", "backends.py")],
+        outputs=[COST_MODEL_PATH, COST_IMPORTANCE_PATH],
+    ))
+
+    stages.append(Stage(
+        "countermeasures", functools.partial(refresh_countermeasures, model_path=COST_MODEL_PATH),
+        inputs=[AUSTIN_CLEANSED_CSV, COST_MODEL_PATH, ROOT / "src" / "ml" / "countermeasures.py"],
+        outputs=[COUNTERMEASURES_PATH],
+    ))
+
+    stages.append(Stage(
+        "forecast", refresh_forecast,
+        inputs=[AUSTIN_CLEANSED_CSV, ROOT / "src" / "ml" / "forecast.py"],
+        outputs=[STATE_PATH, FORECAST_PATH],
+    ))
+
+    # ---- Report images from the existing scripts ----
+    austin_report = PROCESSED_DIR / "bi_ai_atx_analysis1.py"
+    stages.append(Stage(
+        "austin_reports", functools.partial(run_script, austin_report),
+        inputs=[PROCESSED_DIR / "atx_crash_2025.csv", austin_report],
+        outputs=[PROCESSED_DIR / png for png in (
+            "bi_atx_hourly_distribution.png", "bi_atx_severity_pie.png",
+            "ai_atx_hotspots.png", "ai_atx_severity_drivers.png")],
+    ))
+    accident_csv = PROCESSED_DIR / clean_data_csvs.datasets["accident"]["output"]
+    stages.append(Stage(
+        "fars_geo", functools.partial(build_fars_geo, accident_csv),
+        inputs=[accident_csv, ROOT / "src" / "pipeline" / "spatial.py"],
+        outputs=[geo_cache_path(accident_csv)],
+    ))
+    geo_script = PROCESSED_DIR / "geo_spatial.py"
+    stages.append(Stage(
+        "fars_heatmaps", functools.partial(run_script, geo_script),
+        inputs=[accident_csv, geo_cache_path(accident_csv), geo_script],
+        outputs=[PROCESSED_DIR / png for png in (
+            "heatmap_density_2017_2023.png", "heatmap_fatality_2017_2023.png",
+            "heatmap_night_2017_2023.png")],
+    ))
+    geo_bi_script = PROCESSED_DIR / "geo_spatial_bi.py"
+    stages.append(Stage(
+        "fars_bi_reports", functools.partial(run_script, geo_bi_script),
+        inputs=[accident_csv, geo_bi_script],
+        outputs=[PROCESSED_DIR / "bi_day_fatalities.png", PROCESSED_DIR / "bi_route_distribution.png"],
+    ))
+    return stages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incremental data/model/report refresh")
+    parser.add_argument("targets", nargs="*", help="stages to bring up to date (default: all)")
+    parser.add_argument("--force", action="store_true", help="re-run selected stages even if up to date")
+    parser.add_argument("--workers", type=int, default=None, help="max concurrent stages")
+    parser.add_argument("--dry-run", action="store_true", help="only report which stages would run")
+    parser.add_argument("--list", action="store_true", help="list stages and their dependencies")
+    args = parser.parse_args(argv)
+
+    pipeline = Pipeline(build_stages(), PIPELINE_DIR)
+
+    if args.list:
+        for name, deps in pipeline.graph.items():
+            print(f"{name:<18} <- {', '.join(sorted(deps)) or '-'}")
+        return 0
+
+    status = pipeline.run(args.targets, force=args.force, max_workers=args.workers, dry_run=args.dry_run)
+
+    print("\nStage summary")
+    for name, stage_status in status.items():
+        print(f"  {name:<18} {stage_status}")
+    return 1 if any(s in ("failed", "blocked") for s in status.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
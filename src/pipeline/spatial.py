@@ -0,0 +1,307 @@
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]  # repo root
+sys.path.insert(0, str(ROOT / "src"))
+
+from app.crash_data import COST_COL
+from pipeline.lazy import lazy_import
+from pipeline.paths import AUSTIN_CLEANSED_CSV, AUSTIN_SEGMENTS, sidecar_path
+from pipeline.query import parquet_path
+from pipeline.validate import AUSTIN_BOUNDS
+
+spatial = lazy_import("scipy.spatial")
+
+# Spatial keys for Austin crashes, assigned once at ingest.
+#
+# Coordinates come from latitude/longitude, or from the `point` WKT where those
+# are missing. Each crash gets
+#   cell_id     a fixed 250 m grid cell over the Austin area (-1 outside it)
+#   segment_id  the nearest road segment from a local centreline file, via a
+#               KD-tree over short segment pieces (-1 if none within 100 m)
+# Both are integers, so cell- and segment-level risk is a plain groupby. The
+# keys are written to parquet/austin_spatial.parquet next to the DuckDB tables,
+# joinable on `Crash ID`.
+#
+# FARS accident coordinates get the same treatment at ingest (stage fars_geo):
+# validated float32 LAT/LON, equal-area x/y and a validity mask, cached next
+# to the cleaned accident file for the geo reports.
+#
+#   python src/pipeline/spatial.py                                  # cleansed file + AUSTIN_SEGMENTS
+#   python src/pipeline/spatial.py data/atx_crash_2025.csv --segments streets.geojson
+
+SPATIAL_PATH = parquet_path("austin_spatial")
+CELL_M = 250
+MAX_SNAP_M = 100
+MAX_PIECE_M = 50       # segment pieces longer than this are split before indexing
+K_CANDIDATES = 8
+
+# Local equirectangular projection anchored at the south-west corner of the
+# Austin bounds; distortion over the metro area is well under 1%
+ORIGIN_LAT, ORIGIN_LON = AUSTIN_BOUNDS["latitude"][0], AUSTIN_BOUNDS["longitude"][0]
+M_PER_DEG_LAT = 110_574
+M_PER_DEG_LON = 111_320 * np.cos(np.radians(sum(AUSTIN_BOUNDS["latitude"]) / 2))
+
+# Contiguous US, as filtered in geo_spatial.py; also drops FARS's 77.7777/88.8888/99.9999 codes
+CONUS_BOUNDS = {"LATITUDE": (24, 50), "LONGITUD": (-125, -66)}
+# Albers equal-area conic with the USA Contiguous (EPSG:5070) parameters, on the authalic sphere
+ALBERS = {"lat1": 29.5, "lat2": 45.5, "lat0": 23.0, "lon0": -96.0, "radius": 6_371_007.2}
+
+POINT_RE = r"POINT\s*\(\s*(-?[\d.]+)\s+(-?[\d.]+)\s*\)"
+COORD_RE = re.compile(r"(-?[\d.]+)\s+(-?[\d.]+)")
+
+
+def local_xy(lat, lon):
+    """Metres east/north of the grid origin."""
+    x = (np.asarray(lon, dtype=np.float64) - ORIGIN_LON) * M_PER_DEG_LON
+    y = (np.asarray(lat, dtype=np.float64) - ORIGIN_LAT) * M_PER_DEG_LAT
+    return x, y
+
+
+def crash_coordinates(df):
+    """(lat, lon) float arrays, filled from the `point` WKT where latitude/longitude are missing."""
+    lat = pd.to_numeric(df["latitude"], errors="coerce") if "latitude" in df.columns else pd.Series(np.nan, index=df.index)
+    lon = pd.to_numeric(df["longitude"], errors="coerce") if "longitude" in df.columns else pd.Series(np.nan, index=df.index)
+    if "point" in df.columns:
+        need = lat.isna() | lon.isna()
+        if need.any():
+            xy = df.loc[need, "point"].astype(str).str.extract(POINT_RE).astype(float)
+            lon = lon.fillna(xy[0])
+            lat = lat.fillna(xy[1])
+    return lat.to_numpy(), lon.to_numpy()
+
+
+# ---- Grid cells ----
+def _grid_shape(cell_m=CELL_M):
+    (lat0, lat1), (lon0, lon1) = AUSTIN_BOUNDS["latitude"], AUSTIN_BOUNDS["longitude"]
+    x1, y1 = local_xy(lat1, lon1)
+    return int(np.ceil(y1 / cell_m)), int(np.ceil(x1 / cell_m))
+
+
+def grid_cells(lat, lon, cell_m=CELL_M):
+    """Row-major cell index on the fixed Austin grid; -1 for missing or out-of-area points."""
+    rows, cols = _grid_shape(cell_m)
+    x, y = local_xy(lat, lon)
+    with np.errstate(invalid="ignore"):
+        ix, iy = np.floor(x / cell_m), np.floor(y / cell_m)
+        inside = (ix >= 0) & (ix < cols) & (iy >= 0) & (iy < rows)
+    return np.where(inside, iy * cols + ix, -1).astype(np.int64)
+
+
+def cell_centres(cells, cell_m=CELL_M):
+    """(lat, lon) of the centre of each cell id."""
+    _, cols = _grid_shape(cell_m)
+    cells = np.asarray(cells)
+    x = (cells % cols + 0.5) * cell_m
+    y = (cells // cols + 0.5) * cell_m
+    return ORIGIN_LAT + y / M_PER_DEG_LAT, ORIGIN_LON + x / M_PER_DEG_LON
+
+
+# ---- Road segments ----
+def _lines_from_wkt(text):
+    """[[(lon, lat), ...], ...] for a LINESTRING/MULTILINESTRING WKT."""
+    return [[(float(x), float(y)) for x, y in COORD_RE.findall(part)] for part in str(text).split("),")]
+
+
+def read_segments(path, id_field="segment_id", name_field="name"):
+    """(segment ids, names, list of polylines per segment) from GeoJSON or a CSV with a WKT column."""
+    path = Path(path)
+    ids, names, lines = [], [], []
+    if path.suffix.lower() in (".geojson", ".json"):
+        features = json.loads(path.read_text())["features"]
+        for i, feature in enumerate(features):
+            geom, props = feature["geometry"], feature.get("properties") or {}
+            parts = [geom["coordinates"]] if geom["type"] == "LineString" else geom["coordinates"]
+            ids.append(props.get(id_field, i))
+            names.append(props.get(name_field, ""))
+            lines.append([[tuple(c[:2]) for c in part] for part in parts])
+    else:
+        table = pd.read_csv(path)
+        geom_col = next(c for c in table.columns if c.lower() in ("geometry", "the_geom", "wkt"))
+        ids = table[id_field].tolist() if id_field in table.columns else list(range(len(table)))
+        names = table[name_field].fillna("").tolist() if name_field in table.columns else [""] * len(table)
+        lines = [_lines_from_wkt(text) for text in table[geom_col]]
+    return np.asarray(ids, dtype=np.int64), names, lines
+
+
+class SegmentIndex:
+    """Nearest road segment for many points, through a KD-tree over short segment pieces."""
+
+    def __init__(self, ids, names, lines, max_piece_m=MAX_PIECE_M):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.names = pd.Series(names, index=self.ids, name="segment_name")
+        starts, ends, owner = [], [], []
+        for seg, polylines in enumerate(lines):
+            for part in polylines:
+                coords = np.asarray(part, dtype=np.float64)
+                if len(coords) < 2:
+                    continue
+                x, y = local_xy(coords[:, 1], coords[:, 0])
+                xy = np.column_stack([x, y])
+                starts.append(xy[:-1])
+                ends.append(xy[1:])
+                owner.append(np.full(len(xy) - 1, seg))
+        a, b, owner = np.concatenate(starts), np.concatenate(ends), np.concatenate(owner)
+
+        # Split long pieces so a piece's midpoint is never far from its closest point
+        splits = np.maximum(1, np.ceil(np.hypot(*(b - a).T) / max_piece_m)).astype(int)
+        piece = np.repeat(np.arange(len(a)), splits)
+        step = np.arange(len(piece)) - np.repeat(np.cumsum(splits) - splits, splits)
+        t0, t1 = step / splits[piece], (step + 1) / splits[piece]
+        d = b[piece] - a[piece]
+        self.a = a[piece] + t0[:, None] * d
+        self.b = a[piece] + t1[:, None] * d
+        self.owner = owner[piece]
+        self.max_piece_m = max_piece_m
+        self.tree = spatial.cKDTree((self.a + self.b) / 2)
+
+    @classmethod
+    def from_file(cls, path, **fields):
+        return cls(*read_segments(path, **fields))
+
+    def nearest(self, lat, lon, max_m=MAX_SNAP_M, k=K_CANDIDATES):
+        """(segment id, distance in metres) per point; -1 / NaN beyond `max_m` or for missing points."""
+        x, y = local_xy(lat, lon)
+        p = np.column_stack([x, y])
+        ok = np.isfinite(p).all(axis=1)
+        seg = np.full(len(p), -1, dtype=np.int64)
+        dist = np.full(len(p), np.nan, dtype=np.float32)
+        if not ok.any():
+            return seg, dist
+
+        # Candidate pieces by midpoint, then exact point-to-piece distances
+        _, idx = self.tree.query(p[ok], k=k, distance_upper_bound=max_m + self.max_piece_m / 2)
+        idx = idx.reshape(len(idx), -1)
+        found = idx < len(self.a)
+        idx = np.where(found, idx, 0)
+        a, ab = self.a[idx], self.b[idx] - self.a[idx]
+        t = np.clip(((p[ok][:, None, :] - a) * ab).sum(-1) / np.maximum((ab ** 2).sum(-1), 1e-9), 0, 1)
+        d = np.hypot(*(p[ok][:, None, :] - a - t[..., None] * ab).transpose(2, 0, 1))
+        d = np.where(found, d, np.inf)
+        best = d.argmin(axis=1)
+        best_d = d[np.arange(len(d)), best]
+        hit = best_d <= max_m
+        seg[np.flatnonzero(ok)[hit]] = self.ids[self.owner[idx[np.arange(len(d)), best]][hit]]
+        dist[np.flatnonzero(ok)[hit]] = best_d[hit]
+        return seg, dist
+
+
+# ---- FARS coordinates ----
+def albers_xy(lat, lon, lat1=ALBERS["lat1"], lat2=ALBERS["lat2"], lat0=ALBERS["lat0"], lon0=ALBERS["lon0"],
+              radius=ALBERS["radius"]):
+    """Equal-area x/y in metres: equal areas on the map are equal areas on the ground."""
+    phi, phi1, phi2, phi0 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat, lat1, lat2, lat0))
+    n = (np.sin(phi1) + np.sin(phi2)) / 2
+    c = np.cos(phi1) ** 2 + 2 * n * np.sin(phi1)
+    rho = radius * np.sqrt(c - 2 * n * np.sin(phi)) / n
+    rho0 = radius * np.sqrt(c - 2 * n * np.sin(phi0)) / n
+    theta = n * np.radians(np.asarray(lon, dtype=np.float64) - lon0)
+    return rho * np.sin(theta), rho0 - rho * np.cos(theta)
+
+
+def fars_geo(df):
+    """LAT/LON (float32), equal-area X/Y (metres, float32) and a `geo_valid` mask for FARS accident rows."""
+    lat = pd.to_numeric(df["LATITUDE"], errors="coerce").to_numpy(dtype=np.float64)
+    lon = pd.to_numeric(df["LONGITUD"], errors="coerce").to_numpy(dtype=np.float64)
+    (lat_lo, lat_hi), (lon_lo, lon_hi) = CONUS_BOUNDS["LATITUDE"], CONUS_BOUNDS["LONGITUD"]
+    with np.errstate(invalid="ignore"):
+        valid = (lat > lat_lo) & (lat < lat_hi) & (lon > lon_lo) & (lon < lon_hi)
+    x, y = albers_xy(np.where(valid, lat, np.nan), np.where(valid, lon, np.nan))
+    return pd.DataFrame({"LAT": lat.astype(np.float32), "LON": lon.astype(np.float32),
+                         "X": x.astype(np.float32), "Y": y.astype(np.float32), "geo_valid": valid}, index=df.index)
+
+
+def geo_cache_path(accident_csv):
+    return sidecar_path(accident_csv, ".geo.npz")
+
+
+def _stamp(path):
+    st = Path(path).stat()
+    return np.array([st.st_size, st.st_mtime_ns], dtype=np.int64)
+
+
+def build_fars_geo(accident_csv):
+    """Compute fars_geo() for the cleaned accident file and cache it under the pipeline directory."""
+    df = pd.read_csv(accident_csv, sep="|", usecols=["LATITUDE", "LONGITUD"], dtype=str)
+    geo = fars_geo(df)
+    path = geo_cache_path(accident_csv)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(path, stamp=_stamp(accident_csv),
+             **{c: geo[c].to_numpy() for c in geo.columns})
+    return geo
+
+
+def load_fars_geo(accident_csv):
+    """Cached fars_geo() rows in file order; rebuilt if the accident file changed since."""
+    path = geo_cache_path(accident_csv)
+    if path.exists():
+        with np.load(path) as cached:
+            if np.array_equal(cached["stamp"], _stamp(accident_csv)):
+                return pd.DataFrame({c: cached[c] for c in ("LAT", "LON", "X", "Y", "geo_valid")})
+    return build_fars_geo(accident_csv)
+
+
+# ---- Ingest ----
+def assign(df, segments=None, cell_m=CELL_M, max_m=MAX_SNAP_M):
+    """Frame of integer spatial keys aligned with `df` (plus the snap distance)."""
+    lat, lon = crash_coordinates(df)
+    out = pd.DataFrame({"cell_id": grid_cells(lat, lon, cell_m)}, index=df.index)
+    if segments is not None:
+        out["segment_id"], out["segment_dist_m"] = segments.nearest(lat, lon, max_m)
+    else:
+        out["segment_id"], out["segment_dist_m"] = np.int64(-1), np.float32(np.nan)
+    return out
+
+
+def build_spatial(src=AUSTIN_CLEANSED_CSV, segments_path=AUSTIN_SEGMENTS, out=SPATIAL_PATH):
+    df = pd.read_csv(src, usecols=lambda c: c in ("ID", "Crash ID", "latitude", "longitude", "point"),
+                     low_memory=False)
+    segments = SegmentIndex.from_file(segments_path) if Path(segments_path).exists() else None
+    keys = assign(df, segments)
+    keys.insert(0, "Crash ID", df["Crash ID"] if "Crash ID" in df.columns else df["ID"])
+    Path(out).parent.mkdir(parents=True, exist_ok=True)
+    keys.to_parquet(out, index=False)
+    return keys, segments
+
+
+def risk_by(df, keys, key="segment_id"):
+    """Crashes, deaths and comprehensive cost per spatial key (rows of df aligned with keys)."""
+    grouped = df.assign(**{key: keys[key].to_numpy()}).loc[lambda d: d[key] >= 0].groupby(key)
+    return pd.DataFrame({
+        "crashes": grouped.size(),
+        "deaths": grouped["death_cnt"].sum(),
+        "cost": grouped[COST_COL].sum(),
+    }).sort_values("cost", ascending=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Assign Austin crashes to grid cells and road segments")
+    parser.add_argument("source", nargs="?", default=str(AUSTIN_CLEANSED_CSV))
+    parser.add_argument("--segments", default=str(AUSTIN_SEGMENTS), help="GeoJSON or CSV with a WKT geometry column")
+    parser.add_argument("--out", default=str(SPATIAL_PATH))
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    keys, segments = build_spatial(args.source, args.segments, args.out)
+    print(f"{len(keys):,} crashes: {(keys['cell_id'] >= 0).mean():.1%} in a grid cell, "
+          f"{(keys['segment_id'] >= 0).mean():.1%} snapped to a segment -> {args.out}")
+
+    df = pd.read_csv(args.source, usecols=["death_cnt", COST_COL], low_memory=False)
+    cells = risk_by(df, keys, "cell_id").head(args.top)
+    cells["lat"], cells["lon"] = cell_centres(cells.index)
+    print(f"\nCostliest {CELL_M} m cells:")
+    print(cells.to_string(float_format="{:,.4f}".format))
+    if segments is not None:
+        top = risk_by(df, keys, "segment_id").head(args.top).join(segments.names)
+        print("\nCostliest segments:")
+        print(top.to_string())
+
+
+if __name__ == "__main__":
+    main()
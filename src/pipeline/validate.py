@@ -0,0 +1,209 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]  # repo root
+sys.path.insert(0, str(ROOT / "src"))
+
+from app.crash_data import COST_COL, SEV_MAP, TIMESTAMP_COL
+from pipeline.paths import AUSTIN_CLEANSED_CSV, sidecar_path
+
+# Data-quality checks for the Austin crash export, run once at ingest.
+#
+# Every check is a vectorised mask over the whole frame. The results are
+# written under data/.pipeline/sidecars/, keyed by the dataset's path:
+#   <name>.<key>.validation.json  summary per check, with the file's size/mtime stamp
+#   <name>.<key>.flags.npy        one uint32 per row, bit i set when the row failed check i
+#                                 (for any column)
+# The dashboards read these instead of re-checking (or silently coercing) on
+# load; a stale or missing sidecar is rebuilt on first use.
+#
+#   python src/pipeline/validate.py                      # cleansed 2018-2026 file
+#   python src/pipeline/validate.py data/atx_crash_2025.csv
+
+# Columns the portals cannot work without, and the type each must parse as
+SCHEMA = {
+    "Crash ID": "int",
+    TIMESTAMP_COL: "datetime",
+    "crash_sev_id": "int",
+    "latitude": "float",
+    "longitude": "float",
+    "rpt_street_name": "str",
+    "death_cnt": "int",
+    "pedestrian_death_count": "int",
+    "bicycle_death_count": "int",
+    "motorcycle_death_count": "int",
+    COST_COL: "float",
+}
+# Optional columns that are type-checked when present
+OPTIONAL_SCHEMA = {
+    "tot_injry_cnt": "int",
+    "sus_serious_injry_cnt": "int",
+    "crash_speed_limit": "int",
+    "hour_of_day": "int",
+    "motor_vehicle_death_count": "int",
+    "other_death_count": "int",
+    "micromobility_death_count": "int",
+}
+# Austin metro area (Travis, Williamson and Hays county lines, rounded out)
+AUSTIN_BOUNDS = {"latitude": (29.9, 30.75), "longitude": (-98.2, -97.3)}
+SEVERITY_IDS = sorted(SEV_MAP)
+MODE_DEATH_COLUMNS = ["motor_vehicle_death_count", "bicycle_death_count", "pedestrian_death_count",
+                      "motorcycle_death_count", "other_death_count", "micromobility_death_count"]
+EXAMPLES = 5
+
+
+def validation_paths(src):
+    return sidecar_path(src, ".validation.json"), sidecar_path(src, ".flags.npy")
+
+
+def _stamp(path):
+    st = Path(path).stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _parse(s, kind):
+    if kind == "datetime":
+        return pd.to_datetime(s, errors="coerce")
+    if kind in ("int", "float"):
+        return pd.to_numeric(s, errors="coerce")
+    return s
+
+
+# ---- Checks ----
+def row_checks(df):
+    """[(name, column, level, failing-row mask)] for every check that applies to `df`."""
+    checks = []
+    parsed = {}
+    for col, kind in {**SCHEMA, **OPTIONAL_SCHEMA}.items():
+        if col not in df.columns:
+            continue
+        parsed[col] = values = _parse(df[col], kind)
+        # Present but unparsable ('N/A', 'unknown', ...), rather than coerced to NaN/0 later
+        bad = df[col].notna() & values.isna()
+        if kind == "int":
+            bad |= values.notna() & (values % 1 != 0)
+        checks.append((f"dtype:{kind}", col, "error" if col in SCHEMA else "warning", bad))
+
+    for col, (lo, hi) in AUSTIN_BOUNDS.items():
+        if col in parsed:
+            checks.append(("austin_bounds", col, "warning", parsed[col].notna() & ~parsed[col].between(lo, hi)))
+    if TIMESTAMP_COL in parsed:
+        checks.append(("missing_timestamp", TIMESTAMP_COL, "warning", parsed[TIMESTAMP_COL].isna()))
+    if "hour_of_day" in parsed:
+        checks.append(("hour_0_23", "hour_of_day", "warning",
+                       parsed["hour_of_day"].notna() & ~parsed["hour_of_day"].between(0, 23)))
+
+    counts = [c for c in parsed if c.endswith(("_cnt", "_count"))]
+    for col in counts:
+        checks.append(("non_negative", col, "warning", parsed[col] < 0))
+    if COST_COL in parsed:
+        checks.append(("non_negative", COST_COL, "warning", parsed[COST_COL] < 0))
+    if "crash_sev_id" in parsed:
+        sev = parsed["crash_sev_id"]
+        checks.append(("severity_id", "crash_sev_id", "warning", ~sev.isin(SEVERITY_IDS)))
+    if "Crash ID" in parsed:
+        ids = parsed["Crash ID"]
+        checks.append(("duplicate_id", "Crash ID", "warning", ids.notna() & ids.duplicated(keep=False)))
+
+    modes = [c for c in MODE_DEATH_COLUMNS if c in parsed]
+    if "death_cnt" in parsed and modes:
+        mode_total = pd.concat([parsed[c] for c in modes], axis=1).sum(axis=1, min_count=1)
+        checks.append(("deaths_by_mode", "death_cnt", "warning",
+                       parsed["death_cnt"].notna() & mode_total.notna() & (parsed["death_cnt"] != mode_total)))
+    return checks
+
+
+def validate(df):
+    """(report dict, per-row uint32 flags) for one crash frame."""
+    missing = [c for c in SCHEMA if c not in df.columns]
+    checks = row_checks(df)
+    bits = {name: i for i, name in enumerate(dict.fromkeys(name for name, *_ in checks))}
+
+    flags = np.zeros(len(df), dtype=np.uint32)
+    results = []
+    key = df["Crash ID"] if "Crash ID" in df.columns else pd.Series(df.index, index=df.index)
+    for name, col, level, mask in checks:
+        bit = bits[name]
+        mask = mask.fillna(False).to_numpy(dtype=bool)
+        flags[mask] |= np.uint32(1 << bit)
+        failed = int(mask.sum())
+        results.append({"bit": bit, "check": name, "column": col, "level": level, "failed": failed,
+                        "share": failed / max(len(df), 1),
+                        "examples": key[mask].head(EXAMPLES).astype(str).tolist()})
+    report = {
+        "rows": len(df),
+        "missing": missing,
+        "errors": len(missing) + sum(r["failed"] > 0 for r in results if r["level"] == "error"),
+        "warnings": sum(r["failed"] > 0 for r in results if r["level"] == "warning"),
+        "checks": results,
+    }
+    return report, flags
+
+
+# ---- Sidecar files ----
+def validate_file(src):
+    """Validate a CSV and write the sidecar files."""
+    # Only empty fields are missing; 'N/A' and the like must reach the dtype checks
+    df = pd.read_csv(src, low_memory=False, keep_default_na=False, na_values=[""])
+    report, flags = validate(df)
+    report = {"source": Path(src).name, "stamp": _stamp(src), **report}
+    json_path, flags_path = validation_paths(src)
+    json_path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(flags_path, flags)
+    json_path.write_text(json.dumps(report, indent=2))
+    return report
+
+
+def load_report(src):
+    """The stored report for `src`, or None when it is missing or older than the file."""
+    json_path, flags_path = validation_paths(src)
+    try:
+        report = json.loads(json_path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if report.get("stamp") != _stamp(src) or not flags_path.exists():
+        return None
+    return report
+
+
+def ensure_report(src):
+    return load_report(src) or validate_file(src)
+
+
+def failed_rows(src, report, checks):
+    """Row mask (file order) of rows failing any of the named checks."""
+    bits = {r["bit"] for r in report["checks"] if r["check"] in checks}
+    flags = np.load(validation_paths(src)[1])
+    return (flags & np.uint32(sum(1 << b for b in bits))) != 0
+
+
+def issues(report):
+    """Failing checks as a small frame for display."""
+    rows = [r for r in report["checks"] if r["failed"]]
+    out = pd.DataFrame(rows, columns=["check", "column", "level", "failed", "share", "examples"])
+    missing = pd.DataFrame({"check": "missing_column", "column": report["missing"], "level": "error",
+                            "failed": report["rows"], "share": 1.0, "examples": [[]] * len(report["missing"])})
+    return pd.concat([missing, out], ignore_index=True) if len(missing) else out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate an Austin crash CSV and store the results under the pipeline directory")
+    parser.add_argument("source", nargs="?", default=str(AUSTIN_CLEANSED_CSV))
+    args = parser.parse_args(argv)
+
+    report = validate_file(args.source)
+    print(f"{report['rows']:,} rows: {report['errors']} error(s), {report['warnings']} warning(s)")
+    table = issues(report)
+    if len(table):
+        with pd.option_context("display.width", 200, "display.max_colwidth", 60):
+            print(table.to_string(index=False, formatters={"share": "{:.2%}".format}))
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
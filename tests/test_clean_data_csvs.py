@@ -0,0 +1,30 @@
+import importlib.util
+from pathlib import Path
+
+import pandas as pd
+
+spec = importlib.util.spec_from_file_location(
+    "clean_data_csvs", Path(__file__).resolve().parents[1] / "data" / "clean_data_csvs.py")
+clean_data_csvs = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(clean_data_csvs)
+
+
+def test_late_leading_zero_code_keeps_its_text(tmp_path):
+    # DR_ZIP is a plain integer for the first 500 rows, zero-padded after that
+    zips = ["78701"] * 500 + ["07030"] * 1000
+    lines = ["STATE,ST_CASE,VEH_NO,DR_ZIP"] + [f"48,{i},1,{z}" for i, z in enumerate(zips)]
+    (tmp_path / "vehicle_2020.csv").write_text("\n".join(lines) + "\n")
+
+    out = clean_data_csvs.process_dataset("vehicle", clean_data_csvs.datasets["vehicle"], str(tmp_path))
+    exported = pd.read_csv(out, sep="|", dtype=str)
+    assert (exported["DR_ZIP"] == "07030").sum() == 1000
+    assert exported["ST_CASE"].tolist() == [str(i) for i in range(len(zips))]
+
+
+def test_ragged_rows_are_padded_and_truncated(tmp_path):
+    src = tmp_path / "accident_2020.csv"
+    src.write_text("STATE,ST_CASE,FATALS\n48,1,1\n48,2\n48,3,1,extra\n")
+    df, report = clean_data_csvs.read_repaired(src)
+    assert (report["padded"], report["truncated"]) == (1, 1)
+    assert df["ST_CASE"].tolist() == [1, 2, 3]
+    assert df["FATALS"].isna().tolist() == [False, True, False]
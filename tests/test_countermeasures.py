@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from ml.countermeasures import counterfactual_savings, rank_countermeasures
+from ml.features import COST_FEATURES, TARGET
+
+
+class SpeedBlindModel:
+    """Predicts from latitude only, so editing the speed limit never changes a prediction."""
+
+    def predict(self, X):
+        return np.asarray(X["latitude"], dtype=np.float64) * 1000
+
+
+def crash_frame(n=60):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(0.0, index=range(n), columns=COST_FEATURES)
+    df["latitude"] = 30.2 + rng.random(n) / 10
+    df["longitude"] = -97.7 - rng.random(n) / 10
+    df["crash_speed_limit"] = np.where(np.arange(n) % 2, 45.0, 15.0)   # half above the 20 mph floor
+    df["hour_of_day"] = 12.0
+    df[TARGET] = 1000.0
+    df["rpt_street_name"] = np.where(np.arange(n) % 3, "N LAMAR BLVD", "S CONGRESS AVE")
+    return df
+
+
+def test_edited_rows_count_as_affected_even_when_prediction_is_unchanged():
+    df = crash_frame()
+    X = df[COST_FEATURES].astype("float32")
+    _, savings, edited = counterfactual_savings(SpeedBlindModel(), X)
+    assert edited[:, 0].sum() == 30
+    assert not savings[:, 0].any()
+
+    ranking = rank_countermeasures(df, SpeedBlindModel(), hotspots=2)
+    speed = ranking[(ranking["unit_type"] == "Corridor") & ranking["intervention"].str.startswith("Speed")]
+    assert speed["affected_crashes"].sum() == 30
+    assert (speed["expected_reduction"] == 0).all()
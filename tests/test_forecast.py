@@ -0,0 +1,21 @@
+from pathlib import Path
+
+import pandas as pd
+
+from ml.forecast import TIMESTAMP_COL, CrashSeries, severity_group
+
+EXPORT = Path(__file__).resolve().parents[1] / "data" / "atx_crash_2025.csv"
+
+
+def test_fatal_and_serious_crashes_are_ksi():
+    assert list(severity_group([4, 1, 2, 3, 5, 0])) == ["KSI", "KSI", "Other", "Other", "Other", "Other"]
+
+
+def test_death_record_lands_in_ksi():
+    cols = [TIMESTAMP_COL, "rpt_street_name", "crash_sev_id", "death_cnt"]
+    export = pd.read_csv(EXPORT, usecols=cols, low_memory=False)
+    fatal = export[export["death_cnt"] > 0].head(1)
+    series = CrashSeries.from_frame(fatal.drop(columns="death_cnt"), history_days=7)
+    totals = series.rolling((7,))["last_7d"]
+    assert totals[("All Corridors", "KSI")] == 1
+    assert totals[("All Corridors", "Other")] == 0
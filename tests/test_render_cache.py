@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from app.render_cache import RenderCache
+
+
+def test_frame_and_dict_states_are_charged_their_memory():
+    frame = pd.DataFrame({"street": ["N LAMAR BLVD"] * 100_000, "cost": np.arange(100_000, dtype=np.float64)})
+    expected = int(frame.memory_usage(deep=True).sum())
+    cache = RenderCache()
+    view = cache.at_version(1)
+
+    view.get_or_build("frame", lambda: frame)
+    assert cache._bytes == expected
+    view.get_or_build("state", lambda: {"risk": frame, "kpis": "x" * 10})
+    assert cache._bytes == 2 * expected + 10
+
+
+def test_large_states_are_evicted_by_bytes():
+    frame = pd.DataFrame({"cost": np.arange(100_000, dtype=np.float64)})
+    cache = RenderCache(max_bytes=1.5 * frame.memory_usage(deep=True).sum())
+    view = cache.at_version(1)
+    view.get_or_build("a", lambda: frame)
+    view.get_or_build("b", lambda: frame.copy())
+    assert cache.stats()["entries"] == 1
+
+
+def test_sessions_on_different_versions_do_not_share_results():
+    cache = RenderCache()
+    old, new = cache.at_version(5), cache.at_version(6)
+    assert old.get_or_build("state", lambda: "v5") == "v5"
+    assert new.get_or_build("state", lambda: "v6") == "v6"